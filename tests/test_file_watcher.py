@@ -0,0 +1,85 @@
+"""
+Tests for the shared polling file watcher.
+
+Run with: pytest tests/test_file_watcher.py -v
+"""
+
+import os
+
+from utilities.file_watcher import FileWatcher
+
+
+def bump(path, text):
+    """Rewrite a file and move its mtime forward so the change is visible."""
+    path.write_text(text)
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+class TestFileWatcher:
+    """Tests for utilities.file_watcher.FileWatcher."""
+    
+    def test_poll_detects_changes(self, tmp_path):
+        """Verify added, modified and removed files are reported."""
+        (tmp_path / "a.ksy").write_text("a")
+        (tmp_path / "b.ksy").write_text("b")
+        (tmp_path / "notes.txt").write_text("x")
+        watcher = FileWatcher([tmp_path], patterns=["*.ksy"])
+        
+        assert watcher.poll() == set()
+        
+        bump(tmp_path / "a.ksy", "a2")
+        (tmp_path / "b.ksy").unlink()
+        (tmp_path / "c.ksy").write_text("c")
+        bump(tmp_path / "notes.txt", "y")
+        
+        assert {os.path.basename(p) for p in watcher.poll()} == {"a.ksy", "b.ksy", "c.ksy"}
+    
+    def test_watch_single_file(self, tmp_path):
+        """Verify a single file path can be watched directly."""
+        path = tmp_path / "deck.yaml"
+        path.write_text("title: x\n")
+        watcher = FileWatcher([path])
+        
+        bump(path, "title: y\n")
+        
+        assert watcher.poll() == {str(path)}
+    
+    def test_watch_debounces_bursts(self, tmp_path):
+        """Verify a burst of edits is delivered as one batch after it settles."""
+        path = tmp_path / "a.ksy"
+        path.write_text("0")
+        watcher = FileWatcher([tmp_path], interval=0.1, debounce=0.1)
+        batches = []
+        edits = iter(["1", "2", "3"])
+        
+        def fake_sleep(seconds):
+            text = next(edits, None)
+            if text is not None:
+                bump(path, text)
+        
+        watcher.watch(batches.append, max_events=1, sleep=fake_sleep)
+        
+        assert batches == [{str(path)}]
+    
+    def test_callback_errors_do_not_stop_watching(self, tmp_path):
+        """Verify a failing rebuild is logged and watching continues."""
+        path = tmp_path / "a.ksy"
+        path.write_text("0")
+        watcher = FileWatcher([tmp_path], interval=0.1, debounce=0.1)
+        calls = []
+        edits = iter(["1", None, "2", None])
+        
+        def fake_sleep(seconds):
+            text = next(edits, None)
+            if text is not None:
+                bump(path, text)
+        
+        def rebuild(changed):
+            calls.append(changed)
+            if len(calls) == 1:
+                raise ValueError("broken edit")
+        
+        watcher.watch(rebuild, max_events=2, sleep=fake_sleep)
+        
+        assert len(calls) == 2
@@ -0,0 +1,31 @@
+"""
+Tests for the shared YAML loader.
+
+Run with: pytest tests/test_yaml_loader.py -v
+"""
+
+import yaml
+
+from utilities import yaml_loader
+
+
+class TestYamlLoader:
+    """Tests for utilities.yaml_loader."""
+    
+    def test_loader_matches_pure_python(self):
+        """Verify the selected loader produces the same data as SafeLoader."""
+        text = "a: 0x10\nb: [1, 2.5, 'x']\nc: {d: null, e: true}\n"
+        
+        assert yaml_loader.safe_load(text) == yaml.load(text, Loader=yaml.SafeLoader)
+    
+    def test_has_libyaml_flag(self):
+        """Verify HAS_LIBYAML reflects the loader in use."""
+        assert yaml_loader.HAS_LIBYAML == (yaml_loader.SafeLoader is yaml.CSafeLoader
+                                           if hasattr(yaml, 'CSafeLoader') else False)
+    
+    def test_load_yaml_file(self, tmp_path):
+        """Verify files are read as UTF-8."""
+        path = tmp_path / "data.yaml"
+        path.write_text("title: Überblick\n", encoding='utf-8')
+        
+        assert yaml_loader.load_yaml_file(path) == {'title': 'Überblick'}
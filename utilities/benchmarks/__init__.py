@@ -0,0 +1 @@
+"""Micro-benchmarks for the utilities packages (run each module with python -m)."""
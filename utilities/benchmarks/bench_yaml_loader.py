@@ -0,0 +1,72 @@
+"""
+Benchmark the libyaml CSafeLoader against PyYAML's pure-Python SafeLoader.
+
+Usage:
+    python -m utilities.benchmarks.bench_yaml_loader
+    python -m utilities.benchmarks.bench_yaml_loader path/to/file.ksy --repeat 20
+
+With no paths, benchmarks the largest presentation YAML and KSY files
+tracked in the repository.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import yaml
+
+from utilities.yaml_loader import HAS_LIBYAML, SafeLoader
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+def default_inputs() -> List[Path]:
+    """Return the largest report YAML and KSY files in the repository."""
+    candidates = []
+    for pattern in ('reports/**/*.yaml', 'examples/*.yaml', 'datamodel/**/*.ksy',
+                    'utilities/ksy_parser/tests/fixtures/*.ksy'):
+        candidates.extend(REPO_ROOT.glob(pattern))
+    yaml_files = sorted((p for p in candidates if p.suffix == '.yaml'),
+                        key=lambda p: p.stat().st_size, reverse=True)
+    ksy_files = sorted((p for p in candidates if p.suffix == '.ksy'),
+                       key=lambda p: p.stat().st_size, reverse=True)
+    return yaml_files[:3] + ksy_files[:3]
+
+
+def time_load(text: str, loader, repeat: int) -> float:
+    """Return the best-of-repeat seconds to load text with loader."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        yaml.load(text, Loader=loader)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(args=None):
+    """Run the benchmark and print a per-file comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('paths', nargs='*', type=Path, help='YAML/KSY files to load')
+    parser.add_argument('--repeat', '-r', type=int, default=5, help='Runs per loader (best is kept)')
+    parsed_args = parser.parse_args(args)
+
+    if not HAS_LIBYAML:
+        print("PyYAML was built without libyaml; CSafeLoader is unavailable.", file=sys.stderr)
+        return 1
+
+    paths = parsed_args.paths or default_inputs()
+    print(f"{'File':60s} {'KiB':>7s} {'Python ms':>10s} {'libyaml ms':>11s} {'Speedup':>8s}")
+    for path in paths:
+        text = path.read_text(encoding='utf-8')
+        py_time = time_load(text, yaml.SafeLoader, parsed_args.repeat)
+        c_time = time_load(text, SafeLoader, parsed_args.repeat)
+        name = str(path.relative_to(REPO_ROOT)) if path.is_absolute() and REPO_ROOT in path.parents else str(path)
+        print(f"{name[-60:]:60s} {len(text) / 1024:7.1f} {py_time * 1e3:10.2f} "
+              f"{c_time * 1e3:11.2f} {py_time / c_time:7.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Shared file watching for the utilities command-line tools.
+
+Polls file stat data (mtime and size) with only the standard library, so
+it works the same on every platform and on network filesystems where
+inotify events are unreliable. Bursts of changes (editor save sequences,
+git checkouts) are debounced into one callback once the files have been
+quiet for a short period.
+
+Usage:
+    >>> from utilities.file_watcher import FileWatcher
+    >>> watcher = FileWatcher(["datamodel/"], patterns=["*.ksy"])
+    >>> watcher.watch(lambda changed: print(sorted(changed)))
+"""
+
+import fnmatch
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 0.5
+DEFAULT_DEBOUNCE = 0.3
+
+
+class FileWatcher:
+    """Polling watcher over files and directory trees."""
+
+    def __init__(self, paths: Iterable[Union[str, Path]], patterns: Optional[Iterable[str]] = None,
+                 interval: float = DEFAULT_INTERVAL, debounce: float = DEFAULT_DEBOUNCE):
+        self.paths = [Path(p) for p in paths]
+        self.patterns = list(patterns) if patterns else None
+        self.interval = interval
+        self.debounce = debounce
+        self._state = self.snapshot()
+
+    def _matches(self, name: str) -> bool:
+        return self.patterns is None or any(fnmatch.fnmatch(name, p) for p in self.patterns)
+
+    def snapshot(self) -> Dict[str, Tuple[int, int]]:
+        """Return path -> (mtime_ns, size) for every watched file."""
+        state: Dict[str, Tuple[int, int]] = {}
+        for path in self.paths:
+            if path.is_dir():
+                for root, dirs, files in os.walk(path):
+                    dirs[:] = [d for d in dirs if not d.startswith('.')]
+                    for name in files:
+                        if self._matches(name):
+                            self._stat(os.path.join(root, name), state)
+            else:
+                self._stat(str(path), state)
+        return state
+
+    @staticmethod
+    def _stat(path: str, state: Dict[str, Tuple[int, int]]) -> None:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        state[path] = (st.st_mtime_ns, st.st_size)
+
+    def poll(self) -> Set[str]:
+        """Return files added, modified or removed since the last poll."""
+        current = self.snapshot()
+        changed = {p for p, sig in current.items() if self._state.get(p) != sig}
+        changed.update(p for p in self._state if p not in current)
+        self._state = current
+        return changed
+
+    def watch(self, callback: Callable[[Set[str]], None], max_events: Optional[int] = None,
+              sleep: Callable[[float], None] = time.sleep) -> None:
+        """
+        Poll until interrupted, calling callback with each debounced batch.
+
+        Args:
+            callback: Called with the set of changed paths
+            max_events: Return after this many callbacks (for tests and
+                scripted use); None watches forever
+            sleep: Sleep function (injectable for tests)
+        """
+        events = 0
+        pending: Set[str] = set()
+        while max_events is None or events < max_events:
+            sleep(self.interval)
+            changed = self.poll()
+            if changed:
+                pending |= changed
+                continue  # wait until the files stop changing
+            if not pending:
+                continue
+            if self.debounce > self.interval:
+                sleep(self.debounce - self.interval)
+                late = self.poll()
+                if late:
+                    pending |= late
+                    continue
+            batch, pending = pending, set()
+            logger.debug(f"Detected changes: {sorted(batch)}")
+            try:
+                callback(batch)
+            except Exception as e:
+                # Keep watching: a broken edit should not end the session
+                logger.error(f"Rebuild failed: {e}")
+            events += 1
+
+
+def watch_paths(paths: Iterable[Union[str, Path]], callback: Callable[[Set[str]], None],
+                patterns: Optional[Iterable[str]] = None, interval: float = DEFAULT_INTERVAL,
+                debounce: float = DEFAULT_DEBOUNCE) -> None:
+    """
+    Watch paths and call callback on debounced changes until Ctrl-C.
+
+    Args:
+        paths: Files and/or directories to watch
+        callback: Called with the set of changed paths
+        patterns: Filename globs for files inside watched directories
+        interval: Seconds between polls
+        debounce: Quiet time before a batch of changes is delivered
+    """
+    watcher = FileWatcher(paths, patterns, interval, debounce)
+    logger.info(f"Watching {', '.join(str(p) for p in watcher.paths)} (Ctrl-C to stop)")
+    try:
+        watcher.watch(callback)
+    except KeyboardInterrupt:
+        logger.info("Stopped watching")
@@ -1,7 +1,68 @@
 from utilities.ksy_parser.parser import KsyParser, KsyField, KsyHeader, KsyInstance
+from utilities.ksy_parser.tree import parse_tree, parse_files, map_files, ParseTreeResult
+from utilities.ksy_parser.index import DatamodelIndex, FieldRef
+from utilities.ksy_parser.capture import CaptureReader, Frame, iter_frames, decode_capture
+from utilities.ksy_parser.stack import ProtocolStack, StackLink, Layer, DecodedFrame
+from utilities.ksy_parser.efficiency import (
+    StackProfile,
+    stack_profile,
+    profiles_from_stack,
+    EfficiencySweep,
+    efficiency_sweep,
+    generate_efficiency_table,
+    generate_goodput_table
+)
 from utilities.ksy_parser.diagram import PacketDiagram
+from utilities.ksy_parser.decoder import compile_decoder, FieldPlan
+from utilities.ksy_parser.batch import compile_batch_decoder, decode_batch
+from utilities.ksy_parser.encoder import compile_encoder, compile_batch_encoder
+from utilities.ksy_parser.codegen import (
+    generate_module_source,
+    write_generated_module,
+    load_generated_module
+)
+from utilities.ksy_parser.columnar import (
+    PacketColumnWriter,
+    write_packet_file,
+    read_packet_table,
+    iter_packet_batches
+)
+from utilities.ksy_parser.expressions import compile_expression, compile_instances, tokenize, ExpressionError
+from utilities.ksy_parser.constraints import (
+    Constraint,
+    ConstraintValidator,
+    ValidationReport,
+    compile_validator,
+    validate_packets,
+    generate_violation_table
+)
 from utilities.ksy_parser.report import generate_header_section
-from utilities.ksy_parser.enums import extract_enums, EnumDef, EnumValue, generate_enum_table
+from utilities.ksy_parser.build import ReportBuilder, BuildResult, build_report_sections
+from utilities.ksy_parser.diff import (
+    Change,
+    HeaderDiff,
+    DatamodelDiff,
+    diff_headers,
+    diff_datamodels,
+    generate_diff_sections
+)
+from utilities.ksy_parser.lint import LintIssue, LintResult, lint_header, lint_tree
+from utilities.ksy_parser.catalog import (
+    DatamodelCatalog,
+    CatalogField,
+    SizeAggregate,
+    RefreshResult,
+    build_catalog
+)
+from utilities.ksy_parser.enums import (
+    extract_enums,
+    EnumDef,
+    EnumValue,
+    EnumTable,
+    generate_enum_table,
+    build_enum_tables,
+    decode_enum
+)
 from utilities.ksy_parser.state_machine import (
     extract_state_machine, 
     StateMachine, 
@@ -10,22 +71,131 @@ from utilities.ksy_parser.state_machine import (
     generate_state_table,
     generate_transition_diagram
 )
+from utilities.ksy_parser.executor import (
+    StateMachineExecutor,
+    IllegalTransition,
+    ReplayResult,
+    compile_state_machine
+)
+from utilities.ksy_parser.state_graph import (
+    StateGraph,
+    StateMachineAnalysis,
+    build_state_graph,
+    analyze_state_machine,
+    strongly_connected_components,
+    generate_analysis_table
+)
+from utilities.ksy_parser.product import (
+    ProductMachine,
+    ExplorationResult,
+    compose_state_machines
+)
+from utilities.ksy_parser.conformance import (
+    TraceChecker,
+    ConformanceReport,
+    EntityStateStore,
+    check_trace,
+    generate_conformance_tables
+)
 
 __all__ = [
     "KsyParser",
     "KsyField",
     "KsyHeader",
     "KsyInstance",
+    "parse_tree",
+    "parse_files",
+    "map_files",
+    "ParseTreeResult",
+    "DatamodelIndex",
+    "FieldRef",
+    "CaptureReader",
+    "Frame",
+    "iter_frames",
+    "decode_capture",
+    "ProtocolStack",
+    "StackLink",
+    "Layer",
+    "DecodedFrame",
+    "StackProfile",
+    "stack_profile",
+    "profiles_from_stack",
+    "EfficiencySweep",
+    "efficiency_sweep",
+    "generate_efficiency_table",
+    "generate_goodput_table",
     "PacketDiagram",
+    "compile_decoder",
+    "FieldPlan",
+    "compile_batch_decoder",
+    "decode_batch",
+    "compile_encoder",
+    "compile_batch_encoder",
+    "generate_module_source",
+    "write_generated_module",
+    "load_generated_module",
+    "PacketColumnWriter",
+    "write_packet_file",
+    "read_packet_table",
+    "iter_packet_batches",
+    "compile_expression",
+    "compile_instances",
+    "tokenize",
+    "ExpressionError",
+    "Constraint",
+    "ConstraintValidator",
+    "ValidationReport",
+    "compile_validator",
+    "validate_packets",
+    "generate_violation_table",
     "generate_header_section",
+    "ReportBuilder",
+    "BuildResult",
+    "build_report_sections",
+    "Change",
+    "HeaderDiff",
+    "DatamodelDiff",
+    "diff_headers",
+    "diff_datamodels",
+    "generate_diff_sections",
+    "LintIssue",
+    "LintResult",
+    "lint_header",
+    "lint_tree",
+    "DatamodelCatalog",
+    "CatalogField",
+    "SizeAggregate",
+    "RefreshResult",
+    "build_catalog",
     "extract_enums",
     "EnumDef",
     "EnumValue",
+    "EnumTable",
     "generate_enum_table",
+    "build_enum_tables",
+    "decode_enum",
     "extract_state_machine",
     "StateMachine",
     "State",
     "Transition",
     "generate_state_table",
     "generate_transition_diagram",
+    "StateMachineExecutor",
+    "IllegalTransition",
+    "ReplayResult",
+    "compile_state_machine",
+    "StateGraph",
+    "StateMachineAnalysis",
+    "build_state_graph",
+    "analyze_state_machine",
+    "strongly_connected_components",
+    "generate_analysis_table",
+    "ProductMachine",
+    "ExplorationResult",
+    "compose_state_machines",
+    "TraceChecker",
+    "ConformanceReport",
+    "EntityStateStore",
+    "check_trace",
+    "generate_conformance_tables",
 ]
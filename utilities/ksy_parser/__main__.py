@@ -0,0 +1,12 @@
+"""
+Entry point for running ksy_parser as a module.
+
+Usage:
+    python -m utilities.ksy_parser --help
+    python -m utilities.ksy_parser parse-tree datamodel/ --workers 8
+"""
+
+from utilities.ksy_parser.cli import main
+
+if __name__ == '__main__':
+    main()
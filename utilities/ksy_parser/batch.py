@@ -0,0 +1,157 @@
+"""
+KSY Batch Decoder - Vectorized NumPy decoding of fixed-size headers.
+
+Provides utilities for:
+- Viewing a buffer of N back-to-back headers as an N x stride uint8 array
+- Extracting every field into its own NumPy column with vectorized
+  shifts and masks
+
+The result is a dict of equal-length 1-D arrays (2-D for raw byte fields),
+which pandas.DataFrame and pyarrow.table accept directly.
+
+NumPy is an optional dependency; it is only required when a batch decoder
+is compiled.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, TYPE_CHECKING
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+if TYPE_CHECKING:
+    from utilities.ksy_parser.parser import KsyHeader
+
+from utilities.ksy_parser.decoder import FieldPlan, build_field_plan, layout_size_bytes
+
+
+def require_numpy():
+    """Return the numpy module or raise ImportError with an install hint."""
+    if np is None:
+        raise ImportError("numpy is required for batch decoding (pip install numpy)")
+    return np
+
+
+def unsigned_dtype(size_bits: int):
+    """Return the smallest unsigned NumPy dtype holding size_bits bits."""
+    for bits, dtype in ((8, 'u1'), (16, 'u2'), (32, 'u4'), (64, 'u8')):
+        if size_bits <= bits:
+            return np.dtype(dtype)
+    raise ValueError(f"Field of {size_bits} bits does not fit a NumPy integer")
+
+
+def as_packet_array(data: Any, stride: int):
+    """
+    View packet data as a 2-D (N, stride) uint8 array without copying.
+
+    Args:
+        data: bytes-like buffer of back-to-back packets, or an existing
+            2-D uint8 array with at least stride columns
+        stride: Bytes per packet
+
+    Returns:
+        2-D uint8 NumPy array
+
+    Raises:
+        ValueError: If the buffer length is not a multiple of stride
+    """
+    require_numpy()
+    if isinstance(data, np.ndarray) and data.ndim == 2:
+        if data.shape[1] < stride:
+            raise ValueError(f"Packet array has {data.shape[1]} columns, need {stride}")
+        return data.astype(np.uint8, copy=False)
+
+    flat = np.frombuffer(data, dtype=np.uint8) if not isinstance(data, np.ndarray) else data.ravel()
+    if flat.size % stride:
+        raise ValueError(f"Buffer of {flat.size} bytes is not a multiple of {stride}-byte packets")
+    return flat.reshape(-1, stride)
+
+
+def _extract_column(packets, plan: FieldPlan):
+    """Extract one field column from an (N, stride) uint8 array."""
+    if plan.kind == 'byte':
+        return packets[:, plan.byte_start].copy()
+
+    if plan.kind == 'bytes':
+        return np.ascontiguousarray(packets[:, plan.byte_start:plan.byte_end])
+
+    if plan.kind == 'int':
+        order = '<' if plan.endian == 'le' else '>'
+        code = 'i' if plan.signed else 'u'
+        width = plan.byte_end - plan.byte_start
+        raw = np.ascontiguousarray(packets[:, plan.byte_start:plan.byte_end])
+        return raw.view(f'{order}{code}{width}').reshape(-1).astype(f'={code}{width}')
+
+    # Bit field: assemble only the covering bytes into a uint64 accumulator
+    span = plan.byte_end - plan.byte_start
+    if span > 8:
+        raise ValueError(f"Bit field '{plan.name}' spans {span} bytes; at most 8 supported")
+    acc = np.zeros(packets.shape[0], dtype=np.uint64)
+    for i, col in enumerate(range(plan.byte_start, plan.byte_end)):
+        byte = packets[:, col].astype(np.uint64)
+        if plan.endian == 'le':
+            acc |= byte << np.uint64(8 * i)
+        else:
+            acc = (acc << np.uint64(8)) | byte
+    if plan.endian == 'le':
+        shift = plan.offset_bits - plan.byte_start * 8
+    else:
+        shift = plan.byte_end * 8 - plan.offset_bits - plan.size_bits
+    values = (acc >> np.uint64(shift)) & np.uint64(plan.mask)
+
+    if plan.signed:
+        signed = values.astype(np.int64)
+        sign_bit = 1 << (plan.size_bits - 1)
+        return np.where(signed & sign_bit, signed - (1 << plan.size_bits), signed)
+    return values.astype(unsigned_dtype(plan.size_bits))
+
+
+def compile_batch_decoder(header: "KsyHeader",
+                          stride: Optional[int] = None) -> Callable[..., Dict[str, Any]]:
+    """
+    Compile a vectorized decoder for back-to-back packets of one header type.
+
+    The returned callable takes a bytes-like buffer (or an (N, stride) uint8
+    array) and returns a dict mapping field name to a NumPy array of N values.
+    Integer columns use the smallest unsigned dtype that fits the field
+    (native-endian signed dtypes for sN types); 'size'-only fields return an
+    (N, width) uint8 array.
+
+    Args:
+        header: KsyHeader to compile
+        stride: Bytes per packet; defaults to the larger of header.size_bytes
+            and the span of the field layout
+
+    Returns:
+        Batch decoder callable
+    """
+    require_numpy()
+    plans: List[FieldPlan] = build_field_plan(header)
+    if stride is None:
+        stride = max(header.size_bytes, layout_size_bytes(header))
+
+    def decode_batch(data: Any) -> Dict[str, Any]:
+        packets = as_packet_array(data, stride)
+        return {plan.name: _extract_column(packets, plan) for plan in plans}
+
+    decode_batch.plans = plans
+    decode_batch.stride = stride
+    return decode_batch
+
+
+def decode_batch(header: "KsyHeader", data: Any, stride: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Decode N back-to-back packets of one header type into columnar arrays.
+
+    Convenience wrapper around compile_batch_decoder for one-off use.
+
+    Args:
+        header: KsyHeader describing the packets
+        data: bytes-like buffer or (N, stride) uint8 array
+        stride: Bytes per packet (see compile_batch_decoder)
+
+    Returns:
+        Dict of field name to NumPy array
+    """
+    return compile_batch_decoder(header, stride)(data)
@@ -0,0 +1,259 @@
+"""
+KSY Report Build - Incremental report section generation with dependency tracking.
+
+Provides utilities for:
+- Hashing each .ksy input together with the report generator's qualified
+  name and version
+- Storing the generated section list per header in a build state directory
+- Rebuilding only headers whose input, generator, or related
+  headers changed, and dropping headers whose files were removed
+
+A header depends on the headers named in its x-protocol.related_messages
+(matched by normalized meta.id or title). When a related header's file
+changes, or a related name starts resolving to a different file, the
+dependent header is rebuilt too.
+
+Unchanged files are not parsed: their header id, title and related names
+are kept in the build manifest alongside the content hash.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from utilities.ksy_parser.parser import KsyHeader
+
+from utilities.ksy_parser.cache import file_digest
+from utilities.ksy_parser.report import REPORT_GENERATOR_VERSION, generate_header_section
+from utilities.ksy_parser.tree import discover_ksy_files
+
+
+# Bump when the manifest layout changes
+BUILD_STATE_VERSION = 1
+
+MANIFEST_NAME = 'manifest.json'
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a header id, title or related message name for matching."""
+    return re.sub(r'[^a-z0-9]+', '_', str(name).lower()).strip('_')
+
+
+def _related_names(header: "KsyHeader") -> List[str]:
+    related = (header.x_protocol or {}).get('related_messages') or []
+    names = [msg.get('name', '') if isinstance(msg, dict) else msg for msg in related]
+    return sorted({normalize_name(n) for n in names if n})
+
+
+@dataclass
+class BuildResult:
+    """Outcome of an incremental build.
+
+    sections maps header id to its generated section list in sorted path
+    order; rebuilt maps rebuilt header ids to the reason ('new', 'changed',
+    'generator' or 'dependency').
+    """
+    sections: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    rebuilt: Dict[str, str] = field(default_factory=dict)
+    reused: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    def all_sections(self) -> List[Dict[str, Any]]:
+        """Return every header's sections concatenated in build order."""
+        return [section for sections in self.sections.values() for section in sections]
+
+
+class ReportBuilder:
+    """Incremental generator of per-header report sections.
+
+    Usage:
+        builder = ReportBuilder(".ksy_build")
+        result = builder.build("datamodel/")
+        sections = result.all_sections()
+    """
+
+    def __init__(self, state_dir: Union[str, Path],
+                 generator: Callable[["KsyHeader"], List[Dict[str, Any]]] = generate_header_section,
+                 generator_version: Any = REPORT_GENERATOR_VERSION,
+                 cache_dir: Optional[str] = None):
+        self.state_dir = Path(state_dir)
+        self.sections_dir = self.state_dir / 'sections'
+        self.sections_dir.mkdir(parents=True, exist_ok=True)
+        self.generator = generator
+        # Outputs are only reused for the same generator function and version
+        name = getattr(generator, '__qualname__', type(generator).__qualname__)
+        self.generator_version = f"{getattr(generator, '__module__', None)}.{name}:{generator_version}"
+        self.cache_dir = cache_dir
+        self.manifest = self._load_manifest()
+        # Sections kept in memory between builds of one long-lived builder
+        # (watch mode), keyed by source and build key
+        self._memo: Dict[str, Any] = {}
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        try:
+            with open(self.state_dir / MANIFEST_NAME) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if manifest.get('version') != BUILD_STATE_VERSION:
+            return {}
+        return manifest.get('entries', {})
+
+    def _write_json(self, path: Path, data: Any) -> None:
+        """Atomically write JSON so an interrupted build never leaves partial state."""
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f, default=str)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _sections_path(self, source: str) -> Path:
+        return self.sections_dir / (hashlib.sha1(source.encode('utf-8')).hexdigest() + '.json')
+
+    def build(self, inputs: Union[str, Path, Iterable[Union[str, Path]]]) -> BuildResult:
+        """
+        Bring the generated sections up to date with the inputs.
+
+        Args:
+            inputs: Datamodel directory, a .ksy file, or an iterable of .ksy
+                files
+
+        Returns:
+            BuildResult
+        """
+        from utilities.ksy_parser.parser import KsyParser
+
+        if isinstance(inputs, (str, Path)):
+            paths = discover_ksy_files(inputs)
+        else:
+            paths = sorted(Path(p) for p in inputs)
+        sources = [str(p.resolve()) for p in paths]
+
+        parser = KsyParser(cache_dir=self.cache_dir)
+        result = BuildResult()
+        digests: Dict[str, str] = {}
+        meta: Dict[str, Dict[str, Any]] = {}
+        parsed: Dict[str, "KsyHeader"] = {}
+
+        # Pass 1: hash every input; parse only files whose content changed
+        for source in sources:
+            try:
+                digest = file_digest(source)
+            except OSError as e:
+                result.errors[source] = f"{type(e).__name__}: {e}"
+                continue
+            digests[source] = digest
+            entry = self.manifest.get(source)
+            if entry and entry.get('digest') == digest:
+                meta[source] = entry
+                continue
+            try:
+                header = parser.parse(source)
+            except Exception as e:
+                result.errors[source] = f"{type(e).__name__}: {e}"
+                continue
+            parsed[source] = header
+            meta[source] = {'id': header.id, 'title': header.title, 'related': _related_names(header)}
+
+        # Resolve related-message names to source files
+        by_name: Dict[str, str] = {}
+        for source, info in meta.items():
+            for name in (info['id'], info.get('title') or ''):
+                key = normalize_name(name)
+                if key:
+                    by_name.setdefault(key, source)
+
+        # Pass 2: compare build keys and regenerate what changed
+        entries: Dict[str, Dict[str, Any]] = {}
+        for source, info in meta.items():
+            if info['id'] in result.sections:
+                result.errors[source] = f"Duplicate header id '{info['id']}'"
+                continue
+            deps = sorted({by_name[n] for n in info['related'] if n in by_name} - {source})
+            dep_key = hashlib.sha256('\n'.join(f"{d}:{digests[d]}" for d in deps).encode()).hexdigest()
+            entry = self.manifest.get(source)
+            sections_path = self._sections_path(source)
+
+            reason = None
+            if entry is None:
+                reason = 'new'
+            elif entry.get('digest') != digests[source]:
+                reason = 'changed'
+            elif entry.get('generator') != self.generator_version:
+                reason = 'generator'
+            elif entry.get('deps') != dep_key:
+                reason = 'dependency'
+            elif not sections_path.exists():
+                reason = 'new'
+
+            build_key = (digests[source], self.generator_version, dep_key)
+            if reason is None:
+                memo = self._memo.get(source)
+                if memo is not None and memo[0] == build_key:
+                    sections = memo[1]
+                else:
+                    with open(sections_path) as f:
+                        sections = json.load(f)
+                result.reused.append(info['id'])
+            else:
+                header = parsed.get(source)
+                if header is None:
+                    try:
+                        header = parser.parse(source)
+                    except Exception as e:
+                        result.errors[source] = f"{type(e).__name__}: {e}"
+                        continue
+                sections = self.generator(header)
+                self._write_json(sections_path, sections)
+                result.rebuilt[info['id']] = reason
+            self._memo[source] = (build_key, sections)
+
+            result.sections[info['id']] = sections
+            entries[source] = {
+                'id': info['id'], 'title': info.get('title'), 'related': info['related'],
+                'digest': digests[source], 'generator': self.generator_version, 'deps': dep_key,
+            }
+
+        for source, entry in self.manifest.items():
+            if source not in entries and source not in result.errors:
+                result.removed.append(entry['id'])
+                self._memo.pop(source, None)
+                try:
+                    self._sections_path(source).unlink()
+                except FileNotFoundError:
+                    pass
+
+        # Keep entries of files that failed this time so a fix is seen as a change
+        for source in result.errors:
+            if source in self.manifest:
+                entries[source] = self.manifest[source]
+
+        self.manifest = entries
+        self._write_json(self.state_dir / MANIFEST_NAME, {'version': BUILD_STATE_VERSION, 'entries': entries})
+        return result
+
+
+def build_report_sections(inputs: Union[str, Path, Iterable[Union[str, Path]]],
+                          state_dir: Union[str, Path], **builder_options) -> BuildResult:
+    """
+    Incrementally build report sections for a datamodel.
+
+    Args:
+        inputs: Datamodel directory, .ksy file, or iterable of .ksy files
+        state_dir: Build state directory (manifest and cached sections)
+        **builder_options: Passed to ReportBuilder
+
+    Returns:
+        BuildResult
+    """
+    return ReportBuilder(state_dir, **builder_options).build(inputs)
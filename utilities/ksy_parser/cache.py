@@ -0,0 +1,155 @@
+"""
+KSY Parse Cache - Persistent on-disk cache of parsed KSY headers.
+
+Provides utilities for:
+- Storing parsed KsyHeader objects (including raw_data) as pickles
+- Validating entries by file size and mtime, falling back to a content
+  hash when the stat data changed but the bytes did not
+- Size-bounded least-recently-used eviction
+
+The cache directory is trusted local state: entries are unpickled, so it
+must not be shared with untrusted writers.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Optional, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from utilities.ksy_parser.parser import KsyHeader
+
+
+# Bump when KsyHeader/KsyField layout or parse semantics change
+CACHE_VERSION = 2
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def file_digest(path: Union[str, Path]) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class ParseCache:
+    """Directory of pickled KsyHeader entries keyed by source file path."""
+
+    def __init__(self, cache_dir: Union[str, Path], max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _entry_path(self, source: Path) -> Path:
+        key = hashlib.sha1(str(source).encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{key}.pkl"
+
+    def get(self, filepath: Union[str, Path]) -> Optional["KsyHeader"]:
+        """
+        Return the cached header for a file, or None if missing or stale.
+
+        Args:
+            filepath: Path to the .ksy source file
+
+        Returns:
+            KsyHeader or None
+        """
+        source = Path(filepath).resolve()
+        entry_path = self._entry_path(source)
+        try:
+            with open(entry_path, 'rb') as f:
+                entry = pickle.load(f)
+            st = source.stat()
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+
+        if entry.get('version') != CACHE_VERSION or entry.get('source') != str(source):
+            return None
+
+        if (entry['size'], entry['mtime_ns']) != (st.st_size, st.st_mtime_ns):
+            # Touched but possibly unchanged: confirm against the content hash
+            if entry['size'] != st.st_size or entry['digest'] != file_digest(source):
+                return None
+            entry['mtime_ns'] = st.st_mtime_ns
+            self._write(entry_path, entry)
+
+        # Record the hit for LRU eviction; a read-only cache still serves hits
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        return entry['header']
+
+    def put(self, filepath: Union[str, Path], header: "KsyHeader") -> None:
+        """
+        Store a parsed header for a file and evict old entries if over budget.
+
+        Args:
+            filepath: Path to the .ksy source file
+            header: Parsed header to cache
+        """
+        source = Path(filepath).resolve()
+        st = source.stat()
+        entry = {
+            'version': CACHE_VERSION,
+            'source': str(source),
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+            'digest': file_digest(source),
+            'header': header,
+        }
+        self._write(self._entry_path(source), entry)
+        self.evict()
+
+    def invalidate(self, filepath: Union[str, Path]) -> None:
+        """Remove the cached entry for a file, if any."""
+        try:
+            self._entry_path(Path(filepath).resolve()).unlink()
+        except FileNotFoundError:
+            pass
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        for entry_path in self.cache_dir.glob('*.pkl'):
+            entry_path.unlink(missing_ok=True)
+
+    def evict(self) -> int:
+        """
+        Delete least-recently-used entries until the cache fits max_bytes.
+
+        Returns:
+            Number of entries removed
+        """
+        entries = []
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.pkl') and entry.is_file():
+                st = entry.stat()
+                entries.append((st.st_mtime_ns, st.st_size, entry.path))
+                total += st.st_size
+
+        removed = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+    def _write(self, entry_path: Path, entry: dict) -> None:
+        """Atomically write an entry so concurrent readers never see partial data."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, entry_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
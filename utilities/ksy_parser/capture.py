@@ -0,0 +1,260 @@
+"""
+KSY Capture Reader - Stream pcap/pcapng frames through KSY decoders.
+
+Provides utilities for:
+- Memory-mapping pcap and pcapng files and iterating frames as zero-copy
+  memoryview slices (no per-frame bytes objects)
+- Decoding each frame lazily through a fixed stack of KsyHeader decoders
+
+Only frame payloads that are actually decoded are touched, so multi-GB
+captures can be scanned without loading them into memory. Frame data is a
+view into the mapping and is only valid while the reader is open.
+"""
+
+import mmap
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from utilities.ksy_parser.parser import KsyHeader
+    from utilities.ksy_parser.stack import ProtocolStack
+
+
+PCAP_MAGIC_US = 0xA1B2C3D4
+PCAP_MAGIC_NS = 0xA1B23C4D
+PCAPNG_SHB = 0x0A0D0D0A
+PCAPNG_BYTE_ORDER_MAGIC = 0x1A2B3C4D
+PCAPNG_IDB = 0x00000001
+PCAPNG_SPB = 0x00000003
+PCAPNG_EPB = 0x00000006
+
+LINKTYPE_ETHERNET = 1
+
+
+@dataclass(slots=True)
+class Frame:
+    """One captured frame; data is a memoryview into the mapped file."""
+    index: int
+    timestamp_ns: int
+    linktype: int
+    data: memoryview
+    orig_len: int
+    interface: int = 0
+
+
+class CaptureReader:
+    """Memory-mapped reader for pcap and pcapng capture files.
+
+    Usage:
+        with CaptureReader("capture.pcapng") as reader:
+            for frame in reader:
+                ...
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Empty capture file: {self.path}") from None
+        self._view = memoryview(self._map)
+        self.format = self._detect_format()
+
+    def _detect_format(self) -> str:
+        if len(self._map) < 12:
+            raise ValueError(f"Truncated capture file: {self.path}")
+        magic_le = struct.unpack_from('<I', self._map, 0)[0]
+        magic_be = struct.unpack_from('>I', self._map, 0)[0]
+        if magic_le == PCAPNG_SHB:
+            return 'pcapng'
+        if PCAP_MAGIC_US in (magic_le, magic_be) or PCAP_MAGIC_NS in (magic_le, magic_be):
+            return 'pcap'
+        raise ValueError(f"Not a pcap/pcapng file: {self.path}")
+
+    def __enter__(self) -> "CaptureReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the mapping; frames still referencing it keep it alive until freed."""
+        try:
+            self._view.release()
+            self._map.close()
+        except BufferError:
+            # Caller still holds frame views; the mapping is freed with them
+            pass
+        self._file.close()
+
+    def __iter__(self) -> Iterator[Frame]:
+        if self.format == 'pcap':
+            return self._iter_pcap()
+        return self._iter_pcapng()
+
+    def _iter_pcap(self) -> Iterator[Frame]:
+        buf = self._map
+        view = self._view
+        if len(buf) < 24:
+            raise ValueError(f"Truncated pcap header: {self.path}")
+        magic = struct.unpack_from('<I', buf, 0)[0]
+        order = '<' if magic in (PCAP_MAGIC_US, PCAP_MAGIC_NS) else '>'
+        nanos = struct.unpack_from(order + 'I', buf, 0)[0] == PCAP_MAGIC_NS
+        linktype = struct.unpack_from(order + 'I', buf, 20)[0] & 0x0FFFFFFF
+        record = struct.Struct(order + 'IIII')
+        frac_scale = 1 if nanos else 1000
+
+        pos, end, index = 24, len(buf), 0
+        while pos + 16 <= end:
+            ts_sec, ts_frac, incl_len, orig_len = record.unpack_from(buf, pos)
+            pos += 16
+            if pos + incl_len > end:
+                break
+            yield Frame(index, ts_sec * 1_000_000_000 + ts_frac * frac_scale, linktype,
+                        view[pos:pos + incl_len], orig_len)
+            pos += incl_len
+            index += 1
+
+    def _iter_pcapng(self) -> Iterator[Frame]:
+        buf = self._map
+        view = self._view
+        end = len(buf)
+        pos, index = 0, 0
+        order = '<'
+        interfaces: List[tuple] = []  # (linktype, snaplen, ticks_per_s)
+
+        while pos + 12 <= end:
+            block_type = struct.unpack_from(order + 'I', buf, pos)[0]
+            if block_type == PCAPNG_SHB:
+                bom = struct.unpack_from('<I', buf, pos + 8)[0]
+                order = '<' if bom == PCAPNG_BYTE_ORDER_MAGIC else '>'
+                interfaces = []
+            block_len = struct.unpack_from(order + 'I', buf, pos + 4)[0]
+            if block_len < 12 or pos + block_len > end:
+                break
+            body = pos + 8
+
+            if block_type == PCAPNG_IDB:
+                linktype, _, snaplen = struct.unpack_from(order + 'HHI', buf, body)
+                interfaces.append((linktype, snaplen,
+                                   _tsresol(buf, body + 8, pos + block_len - 4, order)))
+            elif block_type == PCAPNG_EPB:
+                iface, ts_hi, ts_lo, cap_len, orig_len = struct.unpack_from(order + 'IIIII', buf, body)
+                data_start = body + 20
+                linktype, _, ticks_per_s = interfaces[iface] if iface < len(interfaces) else (0, 0, 10 ** 6)
+                ticks = (ts_hi << 32) | ts_lo
+                yield Frame(index, ticks * 1_000_000_000 // ticks_per_s, linktype,
+                            view[data_start:data_start + cap_len], orig_len, iface)
+                index += 1
+            elif block_type == PCAPNG_SPB:
+                orig_len = struct.unpack_from(order + 'I', buf, body)[0]
+                linktype, snaplen, _ = interfaces[0] if interfaces else (0, 0, 10 ** 6)
+                cap_len = min(orig_len, snaplen) if snaplen else orig_len
+                data_start = body + 4
+                yield Frame(index, 0, linktype, view[data_start:data_start + cap_len], orig_len)
+                index += 1
+
+            pos += block_len
+
+
+def _tsresol(buf, pos: int, end: int, order: str) -> int:
+    """Return ticks per second from an IDB's if_tsresol option (default 1e6)."""
+    while pos + 4 <= end:
+        code, length = struct.unpack_from(order + 'HH', buf, pos)
+        if code == 0:
+            break
+        if code == 9 and length >= 1:
+            value = buf[pos + 4]
+            return 2 ** (value & 0x7F) if value & 0x80 else 10 ** value
+        pos += 4 + ((length + 3) & ~3)
+    return 10 ** 6
+
+
+def iter_frames(path: Union[str, Path]) -> Iterator[Frame]:
+    """
+    Iterate frames of a pcap/pcapng file.
+
+    The mapping stays open for the lifetime of the generator.
+
+    Args:
+        path: Capture file path
+
+    Yields:
+        Frame objects
+    """
+    with CaptureReader(path) as reader:
+        yield from reader
+
+
+def decode_capture(path: Union[str, Path], stack: Union[Sequence["KsyHeader"], "ProtocolStack"],
+                   offset: int = 0, strict: bool = False,
+                   linktypes: Optional[Sequence[int]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Decode every frame of a capture through a fixed stack of headers.
+
+    A sequence of headers is decoded back to back starting at offset; a
+    ProtocolStack follows its selector fields from the root header. Each
+    yielded record maps header id to its decoded field dict, plus 'frame'
+    (the Frame) and 'payload_offset' (the first byte after the headers).
+
+    Args:
+        path: Capture file path
+        stack: Headers in wire order, e.g. [eth, ipv6, udp, pds], or a
+            ProtocolStack
+        offset: Byte offset of the first header within each frame
+        strict: Raise on frames too short for the stack instead of
+            skipping them
+        linktypes: Only decode frames with these link types
+
+    Yields:
+        Decoded record dicts
+    """
+    if hasattr(stack, 'decode'):
+        yield from _decode_with_stack(path, stack, offset, strict, linktypes)
+        return
+
+    decoders = []
+    for header in stack:
+        decode = header.compile_decoder()
+        decoders.append((header.id, decode, max(header.size_bytes, decode.size_bytes)))
+    wanted = set(linktypes) if linktypes is not None else None
+
+    for frame in iter_frames(path):
+        if wanted is not None and frame.linktype not in wanted:
+            continue
+        record: Dict[str, Any] = {'frame': frame}
+        pos = offset
+        try:
+            for header_id, decode, size in decoders:
+                record[header_id] = decode(frame.data, pos)
+                pos += size
+        except ValueError:
+            if strict:
+                raise
+            continue
+        record['payload_offset'] = pos
+        yield record
+
+
+def _decode_with_stack(path, stack: "ProtocolStack", offset: int, strict: bool,
+                       linktypes: Optional[Sequence[int]]) -> Iterator[Dict[str, Any]]:
+    """decode_capture for a ProtocolStack: one dispatch pass per frame."""
+    wanted = set(linktypes) if linktypes is not None else None
+    for frame in iter_frames(path):
+        if wanted is not None and frame.linktype not in wanted:
+            continue
+        try:
+            decoded = stack.decode(frame.data, offset)
+        except ValueError:
+            if strict:
+                raise
+            continue
+        record: Dict[str, Any] = {'frame': frame}
+        for layer in decoded.layers:
+            record[layer.header_id] = layer.fields
+        record['payload_offset'] = decoded.payload_offset
+        yield record
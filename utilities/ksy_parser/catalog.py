@@ -0,0 +1,447 @@
+"""
+KSY Datamodel Catalog - Persistent SQLite catalog of a parsed datamodel.
+
+Provides utilities for:
+- Loading headers, fields, enums, instances, state machines and spec
+  citations into an indexed SQLite database
+- Incremental refresh: files are checked by size/mtime, then by content
+  hash, and only changed files are re-parsed and rewritten
+- A small query API (field lookups, spec-ref searches, size aggregates)
+  so tools can answer datamodel questions without parsing any YAML
+
+The database uses WAL journaling so several readers can query while a
+refresh runs. Citation keys use the same normalization as
+utilities.ksy_parser.index, so "Section 3.5" prefix-matches "Section 3.5.8".
+"""
+
+import json
+import os
+import sqlite3
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from utilities.ksy_parser.parser import KsyHeader
+
+from utilities.ksy_parser.cache import file_digest
+from utilities.ksy_parser.enums import extract_enums
+from utilities.ksy_parser.index import normalize_citation
+from utilities.ksy_parser.state_machine import extract_state_machine
+from utilities.ksy_parser.tree import discover_ksy_files, parse_files
+
+
+# Bump when the table layout changes; older databases are rebuilt
+CATALOG_SCHEMA_VERSION = 1
+
+SIZE_GROUPS = ('layer', 'sublayer', 'category')
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE files (
+    path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, digest TEXT, error TEXT
+);
+CREATE TABLE headers (
+    pk INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE REFERENCES files(path) ON DELETE CASCADE,
+    header_id TEXT NOT NULL, title TEXT, size_bytes INTEGER, layout_bits INTEGER,
+    endian TEXT, bit_endian TEXT, layer TEXT, sublayer TEXT, category TEXT,
+    doc TEXT, x_spec TEXT, x_packet TEXT
+);
+CREATE TABLE fields (
+    header_pk INTEGER NOT NULL REFERENCES headers(pk) ON DELETE CASCADE,
+    position INTEGER, name TEXT, type TEXT, size_bits INTEGER, offset_bits INTEGER,
+    enum_type TEXT, x_required INTEGER, x_constraint TEXT, x_spec_ref TEXT, description TEXT
+);
+CREATE TABLE enum_values (
+    header_pk INTEGER NOT NULL REFERENCES headers(pk) ON DELETE CASCADE,
+    enum_name TEXT, value INTEGER, label TEXT, doc TEXT
+);
+CREATE TABLE instances (
+    header_pk INTEGER NOT NULL REFERENCES headers(pk) ON DELETE CASCADE,
+    name TEXT, value TEXT, description TEXT
+);
+CREATE TABLE states (
+    header_pk INTEGER NOT NULL REFERENCES headers(pk) ON DELETE CASCADE,
+    machine TEXT, name TEXT, is_terminal INTEGER, is_initial INTEGER
+);
+CREATE TABLE transitions (
+    header_pk INTEGER NOT NULL REFERENCES headers(pk) ON DELETE CASCADE,
+    machine TEXT, from_state TEXT, to_state TEXT, trigger TEXT,
+    condition TEXT, action TEXT, spec_ref TEXT
+);
+CREATE TABLE citations (
+    header_pk INTEGER NOT NULL REFERENCES headers(pk) ON DELETE CASCADE,
+    field_name TEXT, key TEXT
+);
+CREATE INDEX headers_id ON headers(header_id);
+CREATE INDEX fields_header ON fields(header_pk);
+CREATE INDEX fields_name ON fields(name);
+CREATE INDEX fields_enum ON fields(enum_type);
+CREATE INDEX enum_values_name ON enum_values(enum_name, value);
+CREATE INDEX enum_values_header ON enum_values(header_pk);
+CREATE INDEX instances_header ON instances(header_pk);
+CREATE INDEX states_header ON states(header_pk);
+CREATE INDEX transitions_header ON transitions(header_pk);
+CREATE INDEX citations_key ON citations(key);
+CREATE INDEX citations_header ON citations(header_pk);
+"""
+
+_TABLES = ('citations', 'transitions', 'states', 'instances', 'enum_values', 'fields',
+           'headers', 'files', 'meta')
+
+
+@dataclass
+class CatalogField:
+    """A field row from the catalog."""
+    header_id: str
+    name: str
+    type: str
+    size_bits: int
+    offset_bits: int
+    enum_type: Optional[str]
+    x_spec_ref: Optional[str]
+    description: str
+
+
+@dataclass
+class SizeAggregate:
+    """Header count and size statistics for one group."""
+    group: Optional[str]
+    headers: int
+    total_bytes: int
+    min_bytes: int
+    max_bytes: int
+    avg_bytes: float
+
+
+@dataclass
+class RefreshResult:
+    """Outcome of a catalog refresh, as lists of file paths."""
+    added: List[str] = field(default_factory=list)
+    updated: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+
+_FIELD_COLUMNS = "h.header_id, f.name, f.type, f.size_bits, f.offset_bits, f.enum_type, f.x_spec_ref, f.description"
+
+
+class DatamodelCatalog:
+    """SQLite catalog of a datamodel with incremental refresh.
+
+    Usage:
+        catalog = DatamodelCatalog("datamodel.db")
+        catalog.refresh("datamodel/")
+        catalog.fields_named("psn")
+        catalog.fields_citing("Section 3.5", prefix=True)
+        catalog.size_summary("layer")
+    """
+
+    def __init__(self, db_path: Union[str, Path]):
+        self.db_path = str(db_path)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        if self.db_path != ':memory:':
+            self.conn.execute("PRAGMA journal_mode = WAL")
+        self._ensure_schema()
+
+    def __enter__(self) -> "DatamodelCatalog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.conn.close()
+
+    def _ensure_schema(self) -> None:
+        try:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        except sqlite3.OperationalError:
+            row = None
+        if row is not None and row[0] == str(CATALOG_SCHEMA_VERSION):
+            return
+        with self.conn:
+            for table in _TABLES:
+                self.conn.execute(f"DROP TABLE IF EXISTS {table}")
+            self.conn.executescript(_SCHEMA)
+            self.conn.execute("INSERT INTO meta VALUES ('schema_version', ?)", (str(CATALOG_SCHEMA_VERSION),))
+
+    # -- refresh ---------------------------------------------------------
+
+    def refresh(self, root: Union[str, Path], workers: Optional[int] = None,
+                cache_dir: Optional[str] = None) -> RefreshResult:
+        """
+        Bring the catalog up to date with the .ksy files under root.
+
+        Files whose size and mtime are unchanged are skipped without being
+        read; touched files are hashed and only re-parsed when their content
+        changed. Catalogued files under root that no longer exist are
+        removed. A file whose header id is already catalogued from another
+        file is reported as an error and its header is not stored.
+
+        Args:
+            root: Datamodel directory or a single .ksy file
+            workers: Processes for re-parsing changed files; None uses
+                os.cpu_count()
+            cache_dir: Optional parse cache directory
+
+        Returns:
+            RefreshResult
+        """
+        result = RefreshResult()
+        known = {row[0]: row[1:] for row in self.conn.execute(
+            "SELECT path, size, mtime_ns, digest, error FROM files")}
+
+        stale: List[Tuple[str, int, int, str]] = []
+        touched: List[Tuple[str, int, int]] = []
+        current = set()
+        for p in discover_ksy_files(root):
+            path = str(p.resolve())
+            current.add(path)
+            st = os.stat(path)
+            entry = known.get(path)
+            # Files with errors are always retried: a duplicate id may have
+            # been resolved by a change to another file
+            if entry is not None and entry[3] is None and \
+                    entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+                result.unchanged.append(path)
+                continue
+            digest = file_digest(path)
+            if entry is not None and entry[2] == digest and entry[3] is None:
+                touched.append((path, st.st_size, st.st_mtime_ns))
+                result.unchanged.append(path)
+                continue
+            stale.append((path, st.st_size, st.st_mtime_ns, digest))
+
+        root_path = Path(root).resolve()
+        prefix = str(root_path) + os.sep if root_path.is_dir() else str(root_path)
+        gone = [path for path in known if path not in current and (path == prefix or path.startswith(prefix))]
+
+        outcomes = parse_files([path for path, *_ in stale], workers, cache_dir, keep_raw_data=False)
+        with self.conn:
+            for path, size, mtime_ns in touched:
+                self.conn.execute("UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?",
+                                  (size, mtime_ns, path))
+            for path in gone:
+                self.conn.execute("DELETE FROM files WHERE path = ?", (path,))
+                result.removed.append(path)
+            self.conn.executemany("DELETE FROM files WHERE path = ?", [(path,) for path, *_ in stale])
+            for (path, size, mtime_ns, digest), (_, header, error) in zip(stale, outcomes):
+                if error is None:
+                    header_id = header.id or Path(path).stem
+                    owner = self.conn.execute("SELECT path FROM headers WHERE header_id = ?",
+                                              (header_id,)).fetchone()
+                    if owner is not None:
+                        error = f"Duplicate id '{header_id}' (also in {owner[0]})"
+                self.conn.execute("INSERT INTO files VALUES (?, ?, ?, ?, ?)",
+                                  (path, size, mtime_ns, digest, error))
+                if error is not None:
+                    result.errors[path] = error
+                    continue
+                self._insert_header(path, header)
+                (result.updated if path in known else result.added).append(path)
+        return result
+
+    def _insert_header(self, path: str, header: "KsyHeader") -> None:
+        x_packet = header.x_packet or {}
+        # State machine headers carry layer/sublayer under x-protocol instead
+        placement = {**(header.x_protocol or {}), **x_packet}
+        cur = self.conn.execute(
+            "INSERT INTO headers (path, header_id, title, size_bytes, layout_bits, endian, bit_endian, "
+            "layer, sublayer, category, doc, x_spec, x_packet) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (path, header.id or Path(path).stem, header.title, header.size_bytes,
+             sum(f.size_bits for f in header.fields), header.endian, header.bit_endian,
+             placement.get('layer'), placement.get('sublayer'), placement.get('category'), header.doc,
+             json.dumps(header.x_spec, default=str) if header.x_spec else None,
+             json.dumps(x_packet, default=str) if x_packet else None))
+        pk = cur.lastrowid
+
+        self.conn.executemany(
+            "INSERT INTO fields VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(pk, i, f.name, f.type_str, f.size_bits, f.offset_bits, f.enum_type,
+              None if f.x_required is None else int(bool(f.x_required)),
+              None if f.x_constraint is None else str(f.x_constraint),
+              None if f.x_spec_ref is None else str(f.x_spec_ref), f.description)
+             for i, f in enumerate(header.fields)])
+
+        if header.enums:
+            self.conn.executemany(
+                "INSERT INTO enum_values VALUES (?, ?, ?, ?, ?)",
+                [(pk, e.name, v.value, v.id, v.doc)
+                 for e in extract_enums({'enums': header.enums}) for v in e.values])
+
+        if header.instances:
+            self.conn.executemany("INSERT INTO instances VALUES (?, ?, ?, ?)",
+                                  [(pk, i.name, i.value, i.description) for i in header.instances])
+
+        sm = extract_state_machine(header.x_protocol) if header.x_protocol else None
+        if sm is not None:
+            self.conn.executemany(
+                "INSERT INTO states VALUES (?, ?, ?, ?, ?)",
+                [(pk, sm.name, s.name, int(bool(s.is_terminal)), int(s.name == sm.initial_state))
+                 for s in sm.states])
+            self.conn.executemany(
+                "INSERT INTO transitions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(pk, sm.name, t.from_state, t.to_state, t.trigger, t.condition, t.action, t.spec_ref)
+                 for t in sm.transitions])
+
+        citations = set()
+        for f in header.fields:
+            if f.x_spec_ref:
+                citations.update((f.name, key) for key in normalize_citation(str(f.x_spec_ref)))
+        for part in ('table', 'section', 'figure'):
+            if header.x_spec and header.x_spec.get(part):
+                citations.update((None, key) for key in normalize_citation(str(header.x_spec[part])))
+        self.conn.executemany("INSERT INTO citations VALUES (?, ?, ?)",
+                              [(pk, name, key) for name, key in sorted(citations, key=str)])
+
+    # -- queries ---------------------------------------------------------
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> List[Tuple[Any, ...]]:
+        """Run a read-only SQL query against the catalog tables."""
+        return self.conn.execute(sql, params).fetchall()
+
+    def header_ids(self) -> List[str]:
+        """Return every catalogued header id, sorted."""
+        return [row[0] for row in self.conn.execute("SELECT header_id FROM headers ORDER BY header_id")]
+
+    def header_path(self, header_id: str) -> Optional[str]:
+        """Return the source file of a header, or None."""
+        row = self.conn.execute("SELECT path FROM headers WHERE header_id = ? ORDER BY path LIMIT 1",
+                                (header_id,)).fetchone()
+        return row[0] if row else None
+
+    def fields_of(self, header_id: str) -> List[CatalogField]:
+        """Return a header's fields in wire order."""
+        rows = self.conn.execute(
+            f"SELECT {_FIELD_COLUMNS} FROM fields f JOIN headers h ON h.pk = f.header_pk "
+            "WHERE h.header_id = ? ORDER BY f.position", (header_id,))
+        return [CatalogField(*row) for row in rows]
+
+    def fields_named(self, name: str) -> List[CatalogField]:
+        """Return every occurrence of a field name across headers."""
+        rows = self.conn.execute(
+            f"SELECT {_FIELD_COLUMNS} FROM fields f JOIN headers h ON h.pk = f.header_pk "
+            "WHERE f.name = ? ORDER BY h.header_id, f.position", (name,))
+        return [CatalogField(*row) for row in rows]
+
+    def headers_with_field(self, name: str) -> List[str]:
+        """Return ids of headers containing a field with this name."""
+        return [row[0] for row in self.conn.execute(
+            "SELECT DISTINCT h.header_id FROM fields f JOIN headers h ON h.pk = f.header_pk "
+            "WHERE f.name = ? ORDER BY h.header_id", (name,))]
+
+    def headers_using_enum(self, enum_name: str) -> List[str]:
+        """Return ids of headers with at least one field typed by this enum."""
+        return [row[0] for row in self.conn.execute(
+            "SELECT DISTINCT h.header_id FROM fields f JOIN headers h ON h.pk = f.header_pk "
+            "WHERE f.enum_type = ? ORDER BY h.header_id", (enum_name,))]
+
+    def enum_values(self, enum_name: str, header_id: Optional[str] = None) -> Dict[int, str]:
+        """
+        Return value -> id for an enum.
+
+        Args:
+            enum_name: Enum name
+            header_id: Restrict to the header defining it (default: any)
+
+        Returns:
+            Dict of value to enum id
+        """
+        sql = ("SELECT e.value, e.label FROM enum_values e JOIN headers h ON h.pk = e.header_pk "
+               "WHERE e.enum_name = ?")
+        params: List[Any] = [enum_name]
+        if header_id is not None:
+            sql += " AND h.header_id = ?"
+            params.append(header_id)
+        return {value: label for value, label in self.conn.execute(sql + " ORDER BY e.value", params)}
+
+    def _citation_clause(self, reference: str, prefix: bool) -> Tuple[str, List[str]]:
+        clauses, params = [], []
+        for key in normalize_citation(reference):
+            if prefix:
+                # Sub-sections share the key followed by '.' or '-'
+                clauses.append("(c.key = ? OR c.key GLOB ? OR c.key GLOB ?)")
+                escaped = key.replace('[', '[[]').replace('*', '[*]').replace('?', '[?]')
+                params.extend([key, escaped + '.*', escaped + '-*'])
+            else:
+                clauses.append("c.key = ?")
+                params.append(key)
+        return ' OR '.join(clauses) or '0', params
+
+    def fields_citing(self, reference: str, prefix: bool = False) -> List[CatalogField]:
+        """
+        Return fields whose x-spec-ref cites a spec table/section/figure.
+
+        Args:
+            reference: Citation such as "Table 5-21" or "Section 3.5.8"
+            prefix: Also match sub-sections ("Section 3.5" matches
+                "Section 3.5.8")
+
+        Returns:
+            List of CatalogField
+        """
+        where, params = self._citation_clause(reference, prefix)
+        rows = self.conn.execute(
+            f"SELECT DISTINCT {_FIELD_COLUMNS}, f.position FROM citations c "
+            "JOIN headers h ON h.pk = c.header_pk "
+            "JOIN fields f ON f.header_pk = c.header_pk AND f.name = c.field_name "
+            f"WHERE ({where}) ORDER BY h.header_id, f.position", params)
+        return [CatalogField(*row[:-1]) for row in rows]
+
+    def headers_citing(self, reference: str, prefix: bool = False) -> List[str]:
+        """Return ids of headers whose x-spec table/section/figure cites reference."""
+        where, params = self._citation_clause(reference, prefix)
+        return [row[0] for row in self.conn.execute(
+            "SELECT DISTINCT h.header_id FROM citations c JOIN headers h ON h.pk = c.header_pk "
+            f"WHERE c.field_name IS NULL AND ({where}) ORDER BY h.header_id", params)]
+
+    def transitions_of(self, header_id: str) -> List[Tuple[str, str, str]]:
+        """Return a header's state machine transitions as (from, trigger, to)."""
+        return [tuple(row) for row in self.conn.execute(
+            "SELECT t.from_state, t.trigger, t.to_state FROM transitions t "
+            "JOIN headers h ON h.pk = t.header_pk WHERE h.header_id = ? ORDER BY t.rowid", (header_id,))]
+
+    def size_summary(self, group_by: Optional[str] = None) -> List[SizeAggregate]:
+        """
+        Aggregate header sizes, optionally grouped by an x-packet attribute.
+
+        Args:
+            group_by: None, or one of 'layer', 'sublayer', 'category'
+
+        Returns:
+            List of SizeAggregate sorted by group
+
+        Raises:
+            ValueError: If group_by is not a supported column
+        """
+        if group_by is not None and group_by not in SIZE_GROUPS:
+            raise ValueError(f"group_by must be one of {SIZE_GROUPS}, got {group_by!r}")
+        column = group_by or 'NULL'
+        rows = self.conn.execute(
+            f"SELECT {column}, COUNT(*), SUM(size_bytes), MIN(size_bytes), MAX(size_bytes), "
+            f"AVG(size_bytes) FROM headers GROUP BY {column} ORDER BY {column}")
+        return [SizeAggregate(*row) for row in rows if row[1]]
+
+
+def build_catalog(root: Union[str, Path], db_path: Union[str, Path],
+                  workers: Optional[int] = None) -> DatamodelCatalog:
+    """
+    Open (or create) a catalog and refresh it from a datamodel directory.
+
+    Args:
+        root: Datamodel directory
+        db_path: SQLite database file
+        workers: Processes for re-parsing changed files; None uses
+            os.cpu_count()
+
+    Returns:
+        Refreshed DatamodelCatalog
+    """
+    catalog = DatamodelCatalog(db_path)
+    catalog.refresh(root, workers=workers)
+    return catalog
@@ -0,0 +1,294 @@
+"""
+Command-line interface for KSY datamodel tooling.
+
+Usage:
+    python -m utilities.ksy_parser parse-tree datamodel/ --workers 8
+    python -m utilities.ksy_parser parse-tree datamodel/ --json
+    python -m utilities.ksy_parser report datamodel/ -o sections.yaml
+    python -m utilities.ksy_parser report datamodel/ -o sections.yaml --watch
+    python -m utilities.ksy_parser codegen datamodel/ -o generated/
+    python -m utilities.ksy_parser diff datamodel-1.0/ datamodel-1.0.1/ -o changes.yaml
+    python -m utilities.ksy_parser lint datamodel/ --json
+    python -m utilities.ksy_parser catalog datamodel/ -o datamodel.db
+    python -m utilities.ksy_parser --help
+
+Design:
+    Each subcommand is a thin wrapper around a library function in
+    utilities.ksy_parser, so the same functionality is available to
+    scripts without going through the CLI.
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+from utilities.ksy_parser.parser import KsyParser
+
+logger = logging.getLogger(__name__)
+
+
+def cmd_parse_tree(args: argparse.Namespace) -> int:
+    """Parse a datamodel directory and print a per-header summary."""
+    parser = KsyParser(cache_dir=args.cache_dir)
+    start = time.perf_counter()
+    result = parser.parse_tree(str(args.root), workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps({
+            'headers': {
+                header_id: {
+                    'path': result.paths[header_id],
+                    'title': header.title,
+                    'size_bytes': header.size_bytes,
+                    'fields': len(header.fields),
+                }
+                for header_id, header in result.headers.items()
+            },
+            'errors': result.errors,
+        }, indent=2))
+    else:
+        for header_id, header in result.headers.items():
+            print(f"{header_id:40s} {header.size_bytes:6d} bytes {len(header.fields):4d} fields  "
+                  f"{result.paths[header_id]}")
+        for path, error in result.errors.items():
+            print(f"ERROR {path}: {error}", file=sys.stderr)
+
+    logger.info(f"Parsed {len(result.headers)} headers ({len(result.errors)} errors) in {elapsed:.2f}s")
+    return 1 if result.errors else 0
+
+
+def cmd_report(args: argparse.Namespace) -> int:
+    """Incrementally generate report sections for a datamodel as YAML."""
+    from utilities.ksy_parser.build import ReportBuilder
+
+    builder = ReportBuilder(args.state_dir, cache_dir=args.cache_dir)
+    status = _write_report(builder, args)
+    if not args.watch:
+        return status
+
+    from utilities.file_watcher import watch_paths
+    watch_paths([args.root], lambda changed: _write_report(builder, args), patterns=['*.ksy'])
+    return 0
+
+
+def _write_report(builder, args: argparse.Namespace) -> int:
+    """Run one incremental build and write the YAML document."""
+    import yaml
+
+    start = time.perf_counter()
+    result = builder.build(args.root)
+    elapsed = time.perf_counter() - start
+
+    document = {'sections': result.all_sections()}
+    if args.title:
+        document = {'title': args.title, **document}
+    text = yaml.safe_dump(document, sort_keys=False, allow_unicode=True)
+    if args.output:
+        args.output.write_text(text)
+    else:
+        print(text, end='')
+
+    for path, error in result.errors.items():
+        print(f"ERROR {path}: {error}", file=sys.stderr)
+    logger.info(f"Rebuilt {len(result.rebuilt)}, reused {len(result.reused)}, "
+                f"removed {len(result.removed)} headers in {elapsed:.2f}s")
+    return 1 if result.errors else 0
+
+
+def cmd_codegen(args: argparse.Namespace) -> int:
+    """Write a generated struct/ctypes module for every header under a path."""
+    from utilities.ksy_parser.codegen import write_generated_module
+
+    parser = KsyParser(cache_dir=args.cache_dir)
+    if args.root.is_dir():
+        result = parser.parse_tree(str(args.root))
+        headers, errors = list(result.headers.values()), dict(result.errors)
+    else:
+        headers, errors = [parser.parse(str(args.root))], {}
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    written = 0
+    for header in headers:
+        if not any(f.size_bits > 0 for f in header.fields):
+            logger.info(f"Skipping {header.id}: no sized fields")
+            continue
+        try:
+            path = write_generated_module(header, args.output)
+        except ValueError as e:
+            errors[header.source_path or header.id] = str(e)
+            continue
+        logger.debug(f"Wrote {path}")
+        written += 1
+
+    for path, error in errors.items():
+        print(f"ERROR {path}: {error}", file=sys.stderr)
+    logger.info(f"Generated {written} modules in {args.output}")
+    return 1 if errors else 0
+
+
+def cmd_diff(args: argparse.Namespace) -> int:
+    """Compare two datamodel versions and write the change report as YAML."""
+    import yaml
+    from utilities.ksy_parser.diff import diff_datamodels, generate_diff_sections
+
+    old = KsyParser(cache_dir=args.cache_dir).parse_tree(str(args.old), workers=args.workers)
+    new = KsyParser(cache_dir=args.cache_dir).parse_tree(str(args.new), workers=args.workers)
+    start = time.perf_counter()
+    diff = diff_datamodels(old, new)
+    elapsed = time.perf_counter() - start
+
+    subtitle = args.subtitle if args.subtitle is not None else f"{args.old} -> {args.new}"
+    document = {'sections': generate_diff_sections(diff, subtitle=subtitle)}
+    if args.title:
+        document = {'title': args.title, **document}
+    text = yaml.safe_dump(document, sort_keys=False, allow_unicode=True)
+    if args.output:
+        args.output.write_text(text)
+    else:
+        print(text, end='')
+
+    errors = {**old.errors, **new.errors}
+    for path, error in errors.items():
+        print(f"ERROR {path}: {error}", file=sys.stderr)
+    logger.info(f"{len(diff.added)} added, {len(diff.removed)} removed, {len(diff.changed)} changed, "
+                f"{len(diff.unchanged)} unchanged headers (diff {elapsed:.2f}s)")
+    return 1 if errors else 0
+
+
+def cmd_lint(args: argparse.Namespace) -> int:
+    """Lint every header under a directory; exit non-zero on errors."""
+    from utilities.ksy_parser.lint import lint_tree
+
+    start = time.perf_counter()
+    result = lint_tree(args.root, workers=args.workers,
+                       cache_dir=str(args.cache_dir) if args.cache_dir else None)
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps(result.to_dict(), indent=2))
+    else:
+        for issue in result.issues:
+            print(issue.format())
+
+    logger.info(f"Linted {result.files} files in {elapsed:.2f}s: {len(result.errors)} errors, "
+                f"{len(result.issues) - len(result.errors)} warnings")
+    return 0 if result.ok else 1
+
+
+def cmd_catalog(args: argparse.Namespace) -> int:
+    """Create or incrementally refresh a SQLite catalog of a datamodel."""
+    from utilities.ksy_parser.catalog import DatamodelCatalog
+
+    start = time.perf_counter()
+    with DatamodelCatalog(args.output) as catalog:
+        result = catalog.refresh(args.root, workers=args.workers,
+                                 cache_dir=str(args.cache_dir) if args.cache_dir else None)
+    elapsed = time.perf_counter() - start
+
+    for path, error in result.errors.items():
+        print(f"ERROR {path}: {error}", file=sys.stderr)
+    logger.info(f"Refreshed {args.output} in {elapsed:.2f}s: {len(result.added)} added, "
+                f"{len(result.updated)} updated, {len(result.removed)} removed, "
+                f"{len(result.unchanged)} unchanged")
+    return 1 if result.errors else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser with all subcommands."""
+    parser = argparse.ArgumentParser(
+        prog='python -m utilities.ksy_parser',
+        description='Tools for Kaitai Struct (.ksy) packet datamodels.',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        '--verbose', '-v',
+        action='store_true',
+        help='Enable verbose output'
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    tree = subparsers.add_parser('parse-tree', help='Parse every .ksy file under a directory')
+    tree.add_argument('root', type=Path, help='Datamodel directory')
+    tree.add_argument('--workers', '-j', type=int, default=None,
+                      help='Worker processes (default: CPU count, 1 = serial)')
+    tree.add_argument('--cache-dir', type=Path, default=None,
+                      help='Persistent parse cache directory')
+    tree.add_argument('--json', action='store_true', help='Emit machine-readable JSON')
+    tree.set_defaults(func=cmd_parse_tree)
+
+    report = subparsers.add_parser('report', help='Incrementally generate report sections')
+    report.add_argument('root', type=Path, help='Datamodel directory or .ksy file')
+    report.add_argument('--output', '-o', type=Path, default=None,
+                        help='Output YAML file (default: stdout)')
+    report.add_argument('--title', default=None, help='Report title')
+    report.add_argument('--state-dir', type=Path, default=Path('.ksy_build'),
+                        help='Build state directory (default: .ksy_build)')
+    report.add_argument('--cache-dir', type=Path, default=None,
+                        help='Persistent parse cache directory')
+    report.add_argument('--watch', '-w', action='store_true',
+                        help='Keep running and rebuild when .ksy files change')
+    report.set_defaults(func=cmd_report)
+
+    codegen = subparsers.add_parser('codegen', help='Generate struct/ctypes modules for headers')
+    codegen.add_argument('root', type=Path, help='Datamodel directory or .ksy file')
+    codegen.add_argument('--output', '-o', type=Path, required=True,
+                         help='Directory to write <header id>.py modules into')
+    codegen.add_argument('--cache-dir', type=Path, default=None,
+                         help='Persistent parse cache directory')
+    codegen.set_defaults(func=cmd_codegen)
+
+    diff = subparsers.add_parser('diff', help='Report structural changes between two datamodels')
+    diff.add_argument('old', type=Path, help='Old datamodel directory or .ksy file')
+    diff.add_argument('new', type=Path, help='New datamodel directory or .ksy file')
+    diff.add_argument('--output', '-o', type=Path, default=None,
+                      help='Output YAML file (default: stdout)')
+    diff.add_argument('--title', default=None, help='Report title')
+    diff.add_argument('--subtitle', default=None,
+                      help='Section subtitle (default: "<old> -> <new>")')
+    diff.add_argument('--workers', '-j', type=int, default=None,
+                      help='Worker processes for parsing (default: CPU count)')
+    diff.add_argument('--cache-dir', type=Path, default=None,
+                      help='Persistent parse cache directory')
+    diff.set_defaults(func=cmd_diff)
+
+    lint = subparsers.add_parser('lint', help='Check every header for layout and reference errors')
+    lint.add_argument('root', type=Path, help='Datamodel directory or .ksy file')
+    lint.add_argument('--workers', '-j', type=int, default=None,
+                      help='Worker processes (default: CPU count, 1 = serial)')
+    lint.add_argument('--cache-dir', type=Path, default=None,
+                      help='Persistent parse cache directory')
+    lint.add_argument('--json', action='store_true', help='Emit machine-readable JSON')
+    lint.set_defaults(func=cmd_lint)
+
+    catalog = subparsers.add_parser('catalog', help='Create or refresh a SQLite catalog of a datamodel')
+    catalog.add_argument('root', type=Path, help='Datamodel directory or .ksy file')
+    catalog.add_argument('--output', '-o', type=Path, required=True, help='SQLite database file')
+    catalog.add_argument('--workers', '-j', type=int, default=None,
+                         help='Worker processes for re-parsing (default: CPU count, 1 = serial)')
+    catalog.add_argument('--cache-dir', type=Path, default=None,
+                         help='Persistent parse cache directory')
+    catalog.set_defaults(func=cmd_catalog)
+
+    return parser
+
+
+def main(args=None):
+    """Main CLI entry point."""
+    parser = build_parser()
+    parsed_args = parser.parse_args(args)
+
+    log_level = logging.DEBUG if parsed_args.verbose else logging.INFO
+    logging.basicConfig(
+        level=log_level,
+        format='%(levelname)s: %(message)s'
+    )
+
+    sys.exit(parsed_args.func(parsed_args))
+
+
+if __name__ == '__main__':
+    main()
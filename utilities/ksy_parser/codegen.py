@@ -0,0 +1,414 @@
+"""
+KSY Code Generation - Emit importable struct/ctypes modules for header layouts.
+
+Provides utilities for:
+- Generating a Python module per KsyHeader holding a ctypes Structure that
+  overlays one header in place on a writable buffer (bytearray, mmap,
+  NumPy array) and a precompiled struct.Struct for byte-aligned layouts
+- Writing generated modules into a package, or loading them from a
+  directory cache keyed by the hash of the .ksy input
+
+Bit fields are exposed as properties over whole-byte storage members
+rather than as ctypes bitfields: ctypes allocates packed bitfields by C
+compiler rules, which do not follow Kaitai's wire order for fields that
+share bytes. Byte-aligned fields in the structure's byte order are native
+ctypes members, so reading them from a view costs no copy.
+"""
+
+import hashlib
+import importlib.util
+import keyword
+import os
+import tempfile
+import types
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from utilities.ksy_parser.parser import KsyHeader
+
+from utilities.ksy_parser.cache import file_digest
+from utilities.ksy_parser.decoder import FieldPlan, build_field_plan, layout_size_bytes
+
+
+# Bump when the generated module layout changes
+CODEGEN_VERSION = 2
+
+_CTYPES_INT = {
+    (8, False): 'c_uint8', (16, False): 'c_uint16', (32, False): 'c_uint32', (64, False): 'c_uint64',
+    (8, True): 'c_int8', (16, True): 'c_int16', (32, True): 'c_int32', (64, True): 'c_int64',
+}
+
+_STRUCT_INT = {
+    (8, False): 'B', (16, False): 'H', (32, False): 'I', (64, False): 'Q',
+    (8, True): 'b', (16, True): 'h', (32, True): 'i', (64, True): 'q',
+}
+
+# Loaded modules by (cache key, cache_dir), so repeated loads in one process are free
+_loaded: Dict[Tuple[str, Optional[str]], types.ModuleType] = {}
+
+
+@dataclass
+class StorageUnit:
+    """One ctypes member of a generated structure.
+
+    ctype is the ctypes type name for native members, or None for byte
+    arrays (raw 'size' fields, bit groups of 3/5/6/7 bytes, and integers
+    whose byte order differs from the structure's). fields holds the bit
+    field plans decoded out of a bit group.
+    """
+    member: str
+    byte_start: int
+    byte_end: int
+    ctype: Optional[str]
+    endian: str
+    plan: Optional[FieldPlan] = None
+    fields: List[FieldPlan] = field(default_factory=list)
+
+    @property
+    def size(self) -> int:
+        return self.byte_end - self.byte_start
+
+
+def class_name(header_id: str) -> str:
+    """Return the CamelCase structure class name for a header id."""
+    name = ''.join(part[:1].upper() + part[1:] for part in header_id.split('_') if part)
+    if not name.isidentifier():
+        name = 'Header'
+    return name
+
+
+def _check_name(name: str) -> None:
+    if not name.isidentifier() or keyword.iskeyword(name) or name.startswith('_'):
+        raise ValueError(f"Field name '{name}' cannot be used as a generated attribute")
+
+
+def build_storage_units(header: "KsyHeader") -> List[StorageUnit]:
+    """
+    Map a header's field plans onto whole-byte ctypes members.
+
+    Consecutive bit fields are grouped until the group ends on a byte
+    boundary; each group becomes one storage member.
+
+    Args:
+        header: KsyHeader with computed offsets
+
+    Returns:
+        List of StorageUnit in wire order
+
+    Raises:
+        ValueError: If a field name is not a usable Python attribute
+    """
+    units: List[StorageUnit] = []
+    group: List[FieldPlan] = []
+
+    def close_group() -> None:
+        start = group[0].offset_bits // 8
+        end = (group[-1].offset_bits + group[-1].size_bits) // 8
+        native = end - start == 1 or (end - start in (2, 4, 8) and header.bit_endian == header.endian)
+        ctype = _CTYPES_INT[((end - start) * 8, False)] if native else None
+        units.append(StorageUnit(f"_bits{len(units)}", start, end, ctype, header.bit_endian,
+                                 fields=list(group)))
+        group.clear()
+
+    for plan in build_field_plan(header):
+        _check_name(plan.name)
+        if plan.kind == 'bits':
+            group.append(plan)
+            if (plan.offset_bits + plan.size_bits) % 8 == 0:
+                close_group()
+            continue
+        if plan.kind == 'bytes':
+            units.append(StorageUnit(plan.name, plan.byte_start, plan.byte_end, None, header.endian, plan))
+            continue
+        native = plan.size_bits == 8 or plan.endian == header.endian
+        if native:
+            units.append(StorageUnit(plan.name, plan.byte_start, plan.byte_end,
+                                     _CTYPES_INT[(plan.size_bits, plan.signed)], plan.endian, plan))
+        else:
+            units.append(StorageUnit(f"_raw_{plan.name}", plan.byte_start, plan.byte_end,
+                                     None, plan.endian, plan))
+    if group:
+        # A trailing partial byte still occupies a whole storage byte
+        last = group[-1]
+        start, end = group[0].offset_bits // 8, (last.offset_bits + last.size_bits + 7) // 8
+        units.append(StorageUnit(f"_bits{len(units)}", start, end, None, header.bit_endian,
+                                 fields=list(group)))
+    return units
+
+
+def struct_format(header: "KsyHeader") -> Optional[str]:
+    """
+    Return a struct format for a byte-aligned layout, or None.
+
+    A layout qualifies when it has no bit fields and all multi-byte
+    integers share one byte order.
+
+    Args:
+        header: KsyHeader
+
+    Returns:
+        struct format string (with byte order prefix) or None
+    """
+    plans = build_field_plan(header)
+    if not plans or any(p.kind == 'bits' for p in plans):
+        return None
+    orders = {p.endian for p in plans if p.kind == 'int' and p.size_bits > 8}
+    if len(orders) > 1:
+        return None
+    order = '<' if (orders.pop() if orders else header.endian) == 'le' else '>'
+    codes = []
+    for plan in plans:
+        if plan.kind == 'bytes':
+            codes.append(f"{plan.byte_end - plan.byte_start}s")
+        else:
+            codes.append(_STRUCT_INT[(plan.size_bits, plan.signed)])
+    return order + ''.join(codes)
+
+
+def _endian_word(endian: str) -> str:
+    return 'little' if endian == 'le' else 'big'
+
+
+def _bits_property(unit: StorageUnit, plan: FieldPlan) -> List[str]:
+    group_start, group_end = unit.byte_start * 8, unit.byte_end * 8
+    if unit.endian == 'le':
+        shift = plan.offset_bits - group_start
+    else:
+        shift = group_end - plan.offset_bits - plan.size_bits
+    if unit.ctype:
+        storage = f"self.{unit.member}"
+    else:
+        storage = f"int.from_bytes(bytes(self.{unit.member}), '{_endian_word(unit.endian)}')"
+    mask = (1 << plan.size_bits) - 1
+    value = f"({storage} >> {shift}) & {mask:#x}" if shift else f"{storage} & {mask:#x}"
+    lines = ["    @property", f"    def {plan.name}(self):"]
+    if plan.signed:
+        lines.append(f"        v = {value}")
+        lines.append(f"        return v - {1 << plan.size_bits:#x} if v & {1 << (plan.size_bits - 1):#x} else v")
+    else:
+        lines.append(f"        return {value}")
+    return lines
+
+
+def generate_module_source(header: "KsyHeader") -> str:
+    """
+    Generate the source of an importable module for a header layout.
+
+    The module defines SIZE, FIELDS, the overlay structure class (also
+    bound to the name Header), view(), view_array(), decode() and
+    iter_decode(). Byte-aligned layouts additionally get STRUCT, a
+    precompiled struct.Struct used by decode().
+
+    Args:
+        header: KsyHeader to generate
+
+    Returns:
+        Python source code
+
+    Raises:
+        ValueError: If the layout is empty (e.g. a state-machine-only
+            header) or a field name is not a usable Python attribute
+    """
+    size = layout_size_bytes(header)
+    if size <= 0:
+        raise ValueError(f"Header '{header.id}' has no sized fields to overlay")
+    units = build_storage_units(header)
+    names = [p.name for p in build_field_plan(header)]
+    fmt = struct_format(header)
+    cls = class_name(header.id)
+    base = 'LittleEndianStructure' if header.endian == 'le' else 'BigEndianStructure'
+
+    lines = [
+        f'"""Generated from KSY header {header.id!r} by utilities.ksy_parser.codegen. Do not edit."""',
+        "",
+        "import ctypes",
+    ]
+    if fmt:
+        lines.append("import struct")
+    lines += [
+        "",
+        f"CODEGEN_VERSION = {CODEGEN_VERSION}",
+        f"HEADER_ID = {header.id!r}",
+        f"SIZE = {size}",
+        f"FIELDS = {tuple(names)!r}",
+        "",
+        "",
+        f"class {cls}(ctypes.{base}):",
+        f"    {(header.title or header.id)!r}",
+        "    _pack_ = 1",
+        "    _fields_ = [",
+    ]
+    for unit in units:
+        ctype = f"ctypes.{unit.ctype}" if unit.ctype else f"ctypes.c_uint8 * {unit.size}"
+        lines.append(f"        ({unit.member!r}, {ctype}),")
+    lines.append("    ]")
+
+    for unit in units:
+        if unit.fields:
+            for plan in unit.fields:
+                lines.append("")
+                lines.extend(_bits_property(unit, plan))
+        elif unit.ctype is None and unit.plan.kind == 'int':
+            lines += [
+                "",
+                "    @property",
+                f"    def {unit.plan.name}(self):",
+                f"        return int.from_bytes(bytes(self.{unit.member}), "
+                f"'{_endian_word(unit.endian)}', signed={unit.plan.signed})",
+            ]
+
+    lines += [
+        "",
+        "",
+        f"Header = {cls}",
+        "assert ctypes.sizeof(Header) == SIZE, 'generated layout does not match SIZE'",
+        "",
+        "",
+        "def view(buf, offset=0):",
+        '    """Overlay a Header on buf at offset (copied only if buf is read-only)."""',
+        "    try:",
+        "        return Header.from_buffer(buf, offset)",
+        "    except TypeError:",
+        "        return Header.from_buffer_copy(buf, offset)",
+        "",
+        "",
+        "def view_array(buf, offset=0, count=None):",
+        '    """Overlay count back-to-back Headers on a writable buffer without copying."""',
+        "    if count is None:",
+        "        count = (memoryview(buf).nbytes - offset) // SIZE",
+        "    return (Header * count).from_buffer(buf, offset)",
+        "",
+    ]
+
+    if fmt:
+        lines += [
+            "",
+            f"STRUCT = struct.Struct({fmt!r})",
+            "_unpack_from = STRUCT.unpack_from",
+            "",
+            "",
+            "def decode(buf, offset=0):",
+            '    """Decode one header into a dict of field values."""',
+            "    return dict(zip(FIELDS, _unpack_from(buf, offset)))",
+        ]
+    else:
+        lines += [
+            "",
+            "def decode(buf, offset=0):",
+            '    """Decode one header into a dict of field values."""',
+            "    h = view(buf, offset)",
+            "    return {",
+        ]
+        for unit in units:
+            if unit.fields:
+                lines.extend(f"        {p.name!r}: h.{p.name}," for p in unit.fields)
+            elif unit.plan.kind == 'bytes':
+                lines.append(f"        {unit.plan.name!r}: bytes(h.{unit.plan.name}),")
+            else:
+                lines.append(f"        {unit.plan.name!r}: h.{unit.plan.name},")
+        lines.append("    }")
+
+    lines += [
+        "",
+        "",
+        "def iter_decode(buf, stride=SIZE):",
+        '    """Yield decoded dicts for back-to-back headers stride bytes apart."""',
+        "    if stride <= 0:",
+        "        raise ValueError('stride must be positive')",
+        "    end = memoryview(buf).nbytes - SIZE",
+        "    for offset in range(0, end + 1, stride):",
+        "        yield decode(buf, offset)",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def module_cache_key(header: "KsyHeader") -> str:
+    """
+    Return the cache key of a header's generated module.
+
+    Headers parsed from a file are keyed by the file's content hash so a
+    cached module is reused without regenerating it; in-memory headers are
+    keyed by their generated source.
+
+    Args:
+        header: KsyHeader
+
+    Returns:
+        Hex digest
+    """
+    h = hashlib.sha256(f"{CODEGEN_VERSION}:{header.id}:".encode('utf-8'))
+    if header.source_path and os.path.exists(header.source_path):
+        h.update(file_digest(header.source_path).encode('ascii'))
+    else:
+        h.update(generate_module_source(header).encode('utf-8'))
+    return h.hexdigest()
+
+
+def write_generated_module(header: "KsyHeader", path: Union[str, Path]) -> Path:
+    """
+    Write a header's generated module to a file.
+
+    Args:
+        header: KsyHeader
+        path: Output .py file, or a directory to write <header id>.py into
+
+    Returns:
+        Path of the written file
+    """
+    path = Path(path)
+    if path.is_dir():
+        path = path / f"{header.id}.py"
+    source = generate_module_source(header)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(source)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return path
+
+
+def load_generated_module(header: "KsyHeader",
+                          cache_dir: Optional[Union[str, Path]] = None) -> types.ModuleType:
+    """
+    Return the generated module for a header, generating it if needed.
+
+    With cache_dir, modules are written as ksy_<id>_<key>.py and imported
+    from there, so later processes reuse both the source and Python's
+    bytecode cache. Without it the module is built in memory.
+
+    Args:
+        header: KsyHeader
+        cache_dir: Directory of generated modules
+
+    Returns:
+        Module object
+    """
+    key = module_cache_key(header)
+    memo_key = (key, str(Path(cache_dir).resolve()) if cache_dir is not None else None)
+    module = _loaded.get(memo_key)
+    if module is not None:
+        return module
+
+    safe_id = header.id if header.id.isidentifier() else 'header'
+    name = f"ksy_{safe_id}_{key[:16]}"
+    if cache_dir is None:
+        module = types.ModuleType(name)
+        exec(compile(generate_module_source(header), f"<ksy codegen {header.id}>", 'exec'),
+             module.__dict__)
+    else:
+        cache_dir = Path(cache_dir)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        path = cache_dir / f"{name}.py"
+        if not path.exists():
+            write_generated_module(header, path)
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+
+    _loaded[memo_key] = module
+    return module
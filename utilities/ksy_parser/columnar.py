@@ -0,0 +1,385 @@
+"""
+KSY Columnar Storage - Persist decoded packets as Arrow IPC or Parquet.
+
+Provides utilities for:
+- Building an Arrow schema from a header's field layout, with enum fields
+  dictionary-encoded against KsyHeader.enums
+- Streaming decoded batches (column dicts from compile_batch_decoder, raw
+  packet buffers, or per-packet record dicts) into Arrow IPC or Parquet
+  files in bounded-memory row groups
+- Reading files back with column projection, so a query touches only the
+  fields it selects
+
+Enum dictionaries are fixed per header (the enum ids in definition order
+plus the unknown label), so every batch shares one dictionary and files
+stay valid Arrow IPC files. Undefined enum codes get the unknown label, so
+each enum field is followed by a '<field>_code' column holding the raw
+integer code; no decoded value is lost.
+
+pyarrow is an optional dependency; it is only required when a writer or
+reader is used.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Union, TYPE_CHECKING
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - exercised only without pyarrow
+    pa = None
+
+if TYPE_CHECKING:
+    from utilities.ksy_parser.parser import KsyHeader
+
+from utilities.ksy_parser.decoder import FieldPlan, build_field_plan
+from utilities.ksy_parser.enums import UNKNOWN_LABEL, build_enum_tables
+
+
+DEFAULT_ROW_GROUP_SIZE = 64 * 1024
+ENUM_CODE_SUFFIX = '_code'
+
+_FORMATS = {
+    '.parquet': 'parquet', '.pq': 'parquet',
+    '.arrow': 'arrow', '.feather': 'arrow', '.ipc': 'arrow',
+}
+
+
+def require_pyarrow():
+    """Return the pyarrow module or raise ImportError with an install hint."""
+    if pa is None:
+        raise ImportError("pyarrow is required for Arrow/Parquet storage (pip install pyarrow)")
+    return pa
+
+
+def detect_format(path: Union[str, Path], format: Optional[str] = None) -> str:
+    """
+    Return 'parquet' or 'arrow' for a path.
+
+    Args:
+        path: Output or input file path
+        format: Explicit format; overrides the suffix
+
+    Raises:
+        ValueError: If the format is unknown or cannot be inferred
+    """
+    fmt = format or _FORMATS.get(Path(path).suffix.lower())
+    if fmt not in ('parquet', 'arrow'):
+        raise ValueError(f"Cannot determine columnar format for {path} "
+                         f"(use .parquet or .arrow, or pass format)")
+    return fmt
+
+
+def _int_type(plan: FieldPlan):
+    for bits in (8, 16, 32, 64):
+        if plan.size_bits <= bits:
+            return getattr(pa, f"{'int' if plan.signed else 'uint'}{bits}")()
+    raise ValueError(f"Field '{plan.name}' of {plan.size_bits} bits does not fit an Arrow integer")
+
+
+def _enum_fields(header: "KsyHeader", tables: Mapping[str, Any]) -> Dict[str, str]:
+    return {f.name: f.enum_type for f in header.fields if f.enum_type in tables}
+
+
+def header_schema(header: "KsyHeader", fields: Optional[Sequence[str]] = None,
+                  encode_enums: bool = True):
+    """
+    Build the Arrow schema for a header's decoded fields.
+
+    Integer fields map to the smallest fitting Arrow integer, 'size'-only
+    fields to fixed-size binary, and enum fields (when encode_enums) to
+    dictionary<int16, string> followed by a '<field>_code' integer column
+    with the raw value. Field metadata records the KSY type and enum name;
+    schema metadata records the header id.
+
+    Args:
+        header: KsyHeader
+        fields: Field names to include (default: every sized field)
+        encode_enums: Dictionary-encode enum fields as their ids
+
+    Returns:
+        pyarrow.Schema
+
+    Raises:
+        ValueError: If an enum's code column name collides with a field
+    """
+    require_pyarrow()
+    plans = _select_plans(header, fields)
+    enum_fields = _enum_fields(header, build_enum_tables(header)) if encode_enums else {}
+    types_by_name = {f.name: f.type_str for f in header.fields}
+
+    arrow_fields = []
+    for plan in plans:
+        metadata = {'ksy.type': types_by_name.get(plan.name, '')}
+        if plan.kind == 'bytes':
+            arrow_type = pa.binary(plan.byte_end - plan.byte_start)
+        elif plan.name in enum_fields:
+            metadata['ksy.enum'] = enum_fields[plan.name]
+            arrow_fields.append(pa.field(plan.name, pa.dictionary(pa.int16(), pa.string()),
+                                         nullable=False, metadata=metadata))
+            code_name = plan.name + ENUM_CODE_SUFFIX
+            if code_name in types_by_name:
+                raise ValueError(f"Enum code column '{code_name}' collides with a field of '{header.id}'")
+            arrow_type = _int_type(plan)
+            metadata = {'ksy.type': metadata['ksy.type'], 'ksy.code_of': plan.name}
+            arrow_fields.append(pa.field(code_name, arrow_type, nullable=False, metadata=metadata))
+            continue
+        else:
+            arrow_type = _int_type(plan)
+        arrow_fields.append(pa.field(plan.name, arrow_type, nullable=False, metadata=metadata))
+    return pa.schema(arrow_fields, metadata={'ksy.header': header.id})
+
+
+def _select_plans(header: "KsyHeader", fields: Optional[Sequence[str]]) -> List[FieldPlan]:
+    plans = build_field_plan(header)
+    if fields is None:
+        return plans
+    by_name = {p.name: p for p in plans}
+    missing = [name for name in fields if name not in by_name]
+    if missing:
+        raise KeyError(f"Header '{header.id}' has no sized fields {missing}")
+    return [by_name[name] for name in fields]
+
+
+class PacketColumnWriter:
+    """Streaming writer of decoded packets to one Arrow IPC or Parquet file.
+
+    Rows are buffered until row_group_size is reached and then written as
+    one record batch (Arrow) or row group (Parquet), so memory stays
+    bounded however many packets are written.
+
+    Usage:
+        with PacketColumnWriter(header, "rud.parquet") as writer:
+            for chunk in chunks:
+                writer.write_packets(chunk)
+    """
+
+    def __init__(self, header: "KsyHeader", path: Union[str, Path], format: Optional[str] = None,
+                 fields: Optional[Sequence[str]] = None, encode_enums: bool = True,
+                 row_group_size: int = DEFAULT_ROW_GROUP_SIZE, compression: Optional[str] = None,
+                 stride: Optional[int] = None):
+        require_pyarrow()
+        if row_group_size <= 0:
+            raise ValueError("row_group_size must be positive")
+        self.header = header
+        self.path = Path(path)
+        self.format = detect_format(path, format)
+        self.row_group_size = row_group_size
+        self.stride = stride
+        self.plans = _select_plans(header, fields)
+        self.schema = header_schema(header, [p.name for p in self.plans], encode_enums)
+        self.rows = 0
+
+        tables = build_enum_tables(header) if encode_enums else {}
+        self._enums = {name: tables[enum] for name, enum in _enum_fields(header, tables).items()
+                       if name in self.schema.names}
+        self._dictionaries = {name: pa.array(list(table.labels) + [UNKNOWN_LABEL], pa.string())
+                              for name, table in self._enums.items()}
+        self._pending: List[Any] = []
+        self._pending_rows = 0
+        self._batch_decoder = None
+
+        if self.format == 'parquet':
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(str(self.path), self.schema,
+                                            compression=compression or 'snappy')
+        else:
+            import pyarrow.ipc as ipc
+            options = ipc.IpcWriteOptions(compression=compression) if compression else None
+            self._sink = pa.OSFile(str(self.path), 'wb')
+            self._writer = ipc.new_file(self._sink, self.schema, options=options)
+
+    def __enter__(self) -> "PacketColumnWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _column(self, plan: FieldPlan, values: Any):
+        if plan.kind == 'bytes':
+            width = plan.byte_end - plan.byte_start
+            if hasattr(values, 'ndim') and values.ndim == 2:
+                import numpy as np
+                data = np.ascontiguousarray(values, dtype=np.uint8)
+                return pa.FixedSizeBinaryArray.from_buffers(pa.binary(width), len(data),
+                                                            [None, pa.py_buffer(data)])
+            return pa.array([bytes(v) for v in values], pa.binary(width))
+
+        table = self._enums.get(plan.name)
+        if table is None:
+            return pa.array(values, self.schema.field(plan.name).type)
+        if hasattr(values, 'dtype'):
+            indices, _ = table.categorize(values)
+        else:
+            missing = len(table.labels)
+            index = {label: i for i, label in enumerate(table.labels)}
+            indices = [index.get(table.name_of(v), missing) for v in values]
+        return pa.DictionaryArray.from_arrays(pa.array(indices, pa.int16()),
+                                              self._dictionaries[plan.name])
+
+    def write_columns(self, columns: Mapping[str, Any]) -> None:
+        """
+        Append a batch of decoded columns.
+
+        Args:
+            columns: Field name -> column of equal length, e.g. the output of
+                compile_batch_decoder (NumPy arrays) or plain lists; enum
+                columns hold integer codes
+        """
+        arrays = []
+        for plan in self.plans:
+            values = columns[plan.name]
+            arrays.append(self._column(plan, values))
+            if plan.name in self._enums:
+                code_name = plan.name + ENUM_CODE_SUFFIX
+                arrays.append(pa.array(values, self.schema.field(code_name).type))
+        batch = pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+        self._append(batch)
+
+    def write_packets(self, data: Any) -> None:
+        """
+        Batch-decode back-to-back raw packets and append them.
+
+        Requires NumPy (see compile_batch_decoder).
+
+        Args:
+            data: bytes-like buffer of packets, or an (N, stride) uint8 array
+        """
+        if self._batch_decoder is None:
+            from utilities.ksy_parser.batch import compile_batch_decoder
+            self._batch_decoder = compile_batch_decoder(self.header, self.stride)
+        self.write_columns(self._batch_decoder(data))
+
+    def write_records(self, records: Iterable[Mapping[str, Any]]) -> None:
+        """
+        Append per-packet field dicts, e.g. from a compiled decoder.
+
+        Records are converted to columns one row group at a time.
+
+        Args:
+            records: Iterable of field name -> value dicts
+        """
+        names = [plan.name for plan in self.plans]
+        chunk: Dict[str, List[Any]] = {name: [] for name in names}
+        count = 0
+        for record in records:
+            for name in names:
+                chunk[name].append(record[name])
+            count += 1
+            if count == self.row_group_size:
+                self.write_columns(chunk)
+                chunk = {name: [] for name in names}
+                count = 0
+        if count:
+            self.write_columns(chunk)
+
+    def _append(self, batch) -> None:
+        while batch.num_rows:
+            room = self.row_group_size - self._pending_rows
+            head, batch = batch.slice(0, room), batch.slice(room)
+            self._pending.append(head)
+            self._pending_rows += head.num_rows
+            if self._pending_rows >= self.row_group_size:
+                self.flush()
+
+    def flush(self) -> None:
+        """Write buffered rows as one row group / record batch."""
+        if not self._pending_rows:
+            return
+        table = pa.Table.from_batches(self._pending, self.schema).combine_chunks()
+        if self.format == 'parquet':
+            self._writer.write_table(table, row_group_size=self._pending_rows)
+        else:
+            for batch in table.to_batches():
+                self._writer.write_batch(batch)
+        self.rows += self._pending_rows
+        self._pending = []
+        self._pending_rows = 0
+
+    def close(self) -> None:
+        """Flush buffered rows and finalize the file."""
+        if self._writer is None:
+            return
+        self.flush()
+        self._writer.close()
+        if self.format == 'arrow':
+            self._sink.close()
+        self._writer = None
+
+
+def write_packet_file(header: "KsyHeader", path: Union[str, Path], batches: Iterable[Any],
+                      **writer_options) -> int:
+    """
+    Write decoded batches to a columnar file.
+
+    Args:
+        header: KsyHeader describing the packets
+        path: Output .parquet or .arrow file
+        batches: Iterable of column dicts (from compile_batch_decoder) or
+            raw packet buffers
+        **writer_options: Passed to PacketColumnWriter
+
+    Returns:
+        Number of rows written
+    """
+    with PacketColumnWriter(header, path, **writer_options) as writer:
+        for batch in batches:
+            if isinstance(batch, Mapping):
+                writer.write_columns(batch)
+            else:
+                writer.write_packets(batch)
+    return writer.rows
+
+
+def iter_packet_batches(path: Union[str, Path], fields: Optional[Sequence[str]] = None,
+                        format: Optional[str] = None) -> Iterator[Any]:
+    """
+    Stream record batches from a columnar file, reading only selected fields.
+
+    Args:
+        path: .parquet or .arrow file written by PacketColumnWriter
+        fields: Field names to read (default: all)
+        format: Explicit format; overrides the suffix
+
+    Yields:
+        pyarrow.RecordBatch objects
+    """
+    require_pyarrow()
+    columns = list(fields) if fields is not None else None
+    if detect_format(path, format) == 'parquet':
+        import pyarrow.parquet as pq
+        yield from pq.ParquetFile(str(path)).iter_batches(columns=columns)
+        return
+
+    import pyarrow.ipc as ipc
+    # The map stays open while batches reference it; it closes when collected
+    reader = ipc.open_file(pa.memory_map(str(path), 'r'))
+    for i in range(reader.num_record_batches):
+        batch = reader.get_batch(i)
+        yield batch.select(columns) if columns is not None else batch
+
+
+def read_packet_table(path: Union[str, Path], fields: Optional[Sequence[str]] = None,
+                      format: Optional[str] = None):
+    """
+    Read a columnar packet file into a pyarrow.Table.
+
+    Parquet reads only the selected column chunks; Arrow IPC files are
+    memory-mapped, so unselected columns are never touched.
+
+    Args:
+        path: .parquet or .arrow file written by PacketColumnWriter
+        fields: Field names to read (default: all)
+        format: Explicit format; overrides the suffix
+
+    Returns:
+        pyarrow.Table
+    """
+    require_pyarrow()
+    columns = list(fields) if fields is not None else None
+    if detect_format(path, format) == 'parquet':
+        import pyarrow.parquet as pq
+        return pq.read_table(str(path), columns=columns)
+
+    import pyarrow.ipc as ipc
+    table = ipc.open_file(pa.memory_map(str(path), 'r')).read_all()
+    return table.select(columns) if columns is not None else table
@@ -0,0 +1,480 @@
+"""
+KSY Trace Conformance - Check event logs against KSY state machines.
+
+Provides utilities for:
+- Reading event logs incrementally from CSV, JSONL or fixed-size binary
+  records
+- Tracking the current state of millions of entities (VCs, PDCs, ...) in
+  compact typed arrays instead of per-entity objects
+- Reporting illegal transitions, terminal states never reached, entities
+  left in non-terminal states, and per-state dwell-time statistics
+- Generating report-ready table sections
+
+Each entity starts in the machine's initial state when first seen. Small
+integer ids index the state arrays directly; sparse or hashed 64-bit ids
+and non-integer ids go through an open-addressing table in typed arrays,
+so no per-entity Python objects are kept (see EntityStateStore).
+"""
+
+import csv
+import hashlib
+import json
+import math
+import struct
+from array import array
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+from utilities.ksy_parser.executor import NO_TRANSITION, CONDITIONAL, StateMachineExecutor, compile_state_machine
+from utilities.ksy_parser.state_machine import StateMachine
+
+
+UNSEEN = -1
+DEFAULT_BINARY_FORMAT = '<QIq'  # entity id, trigger code, timestamp
+DEFAULT_MAX_EXAMPLES = 20
+_CHUNK_RECORDS = 65536
+DIRECT_IDS = 1 << 16  # integer ids always indexed directly below this bound
+_MASK64 = (1 << 64) - 1
+
+
+class _IdTable:
+    """Open-addressing map of 64-bit keys to slots, held in two typed arrays.
+
+    Linear probing with a load factor of at most 3/4 costs 21-43 bytes per
+    key, against roughly 100 for a dict entry plus its boxed key.
+    """
+
+    def __init__(self, bits: int = 10):
+        self._bits = bits
+        self.keys = array('Q', [0]) * (1 << bits)
+        self.values = array('q', [-1]) * (1 << bits)
+        self.size = 0
+
+    def _index(self, key: int) -> int:
+        # splitmix64 finalizer: spreads sequential and strided ids alike
+        key = ((key ^ (key >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+        key = ((key ^ (key >> 27)) * 0x94D049BB133111EB) & _MASK64
+        return (key ^ (key >> 31)) >> (64 - self._bits)
+
+    def get(self, key: int) -> int:
+        """Return the slot stored for key, or -1."""
+        keys, values = self.keys, self.values
+        mask = len(keys) - 1
+        i = self._index(key)
+        while True:
+            value = values[i]
+            if value < 0 or keys[i] == key:
+                return value
+            i = (i + 1) & mask
+
+    def put(self, key: int, value: int) -> None:
+        """Store a new key (which must not be present)."""
+        if (self.size + 1) * 4 > len(self.keys) * 3:
+            old_keys, old_values = self.keys, self.values
+            self.__init__(self._bits + 1)
+            for k, v in zip(old_keys, old_values):
+                if v >= 0:
+                    self.put(k, v)
+        keys, values = self.keys, self.values
+        mask = len(keys) - 1
+        i = self._index(key)
+        while values[i] >= 0:
+            i = (i + 1) & mask
+        keys[i] = key
+        values[i] = value
+        self.size += 1
+
+    @property
+    def nbytes(self) -> int:
+        """Array memory in bytes."""
+        return self.keys.itemsize * len(self.keys) + self.values.itemsize * len(self.values)
+
+
+def _id_digest(entity: Any) -> int:
+    if isinstance(entity, str):
+        data = b's' + entity.encode('utf-8')
+    elif isinstance(entity, bytes):
+        data = b'b' + entity
+    else:
+        data = b'r' + repr(entity).encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+
+class EntityStateStore:
+    """Array-backed current state and state-entry time per entity.
+
+    Non-negative integer ids below max(DIRECT_IDS, 2 * entities) index the
+    state/entered arrays directly (9 bytes per possible id). Other ids get
+    dense slots in mapped_state/mapped_entered through an _IdTable: integer
+    ids up to 64 bits are keyed by value, anything else by a 64-bit BLAKE2b
+    digest of the id.
+    """
+
+    def __init__(self, num_states: int):
+        self._typecode = 'b' if num_states < 127 else 'h' if num_states < 32767 else 'i'
+        self.state = array(self._typecode)
+        self.entered = array('d')
+        self.mapped_state = array(self._typecode)
+        self.mapped_entered = array('d')
+        self._ints = _IdTable()
+        self._others = _IdTable()
+        self.entities = 0
+
+    def locate(self, entity: Any) -> Tuple[array, array, int]:
+        """
+        Return (state array, entered array, index) for an entity.
+
+        A new entity's state is UNSEEN; the caller is expected to set it.
+
+        Args:
+            entity: Entity id (any hashable; integers are cheapest)
+
+        Returns:
+            The state and entry-time arrays holding the entity, and its index
+        """
+        if isinstance(entity, int) and 0 <= entity <= _MASK64:
+            if entity < len(self.state) and self.state[entity] != UNSEEN:
+                return self.state, self.entered, entity
+            table, key = self._ints, entity
+            slot = table.get(key) if table.size else -1
+            if slot >= 0:
+                return self.mapped_state, self.mapped_entered, slot
+            bound = max(DIRECT_IDS, 2 * self.entities)
+            if entity < max(len(self.state), bound):
+                if entity >= len(self.state):
+                    grow = max(entity + 1, min(2 * len(self.state), bound)) - len(self.state)
+                    self.state.extend(array(self._typecode, [UNSEEN]) * grow)
+                    self.entered.extend(array('d', [math.nan]) * grow)
+                self.entities += 1
+                return self.state, self.entered, entity
+        else:
+            table, key = self._others, _id_digest(entity)
+            slot = table.get(key)
+            if slot >= 0:
+                return self.mapped_state, self.mapped_entered, slot
+
+        slot = len(self.mapped_state)
+        self.mapped_state.append(UNSEEN)
+        self.mapped_entered.append(math.nan)
+        table.put(key, slot)
+        self.entities += 1
+        return self.mapped_state, self.mapped_entered, slot
+
+    def seen(self) -> Iterator[int]:
+        """Yield the state code of every entity seen so far."""
+        for states in (self.state, self.mapped_state):
+            yield from (s for s in states if s != UNSEEN)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory of the state arrays and id tables in bytes."""
+        arrays = (self.state, self.entered, self.mapped_state, self.mapped_entered)
+        return sum(a.itemsize * len(a) for a in arrays) + self._ints.nbytes + self._others.nbytes
+
+
+@dataclass
+class DwellStats:
+    """Time spent in a state before leaving it."""
+    count: int
+    mean: float
+    minimum: float
+    maximum: float
+
+
+@dataclass
+class ConformanceReport:
+    """Result of checking a trace against a state machine."""
+    machine: str
+    events: int
+    entities: int
+    illegal: int
+    illegal_by_pair: Dict[Tuple[str, str], int]
+    examples: List[Tuple[int, Any, str, str]]  # (event index, entity, state, trigger)
+    final_states: Dict[str, int]
+    terminal_never_reached: List[str]
+    unterminated: int
+    dwell: Dict[str, DwellStats] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        """True when the trace contained no illegal transitions."""
+        return self.illegal == 0
+
+
+class TraceChecker:
+    """Incremental conformance checker for one state machine.
+
+    Usage:
+        checker = TraceChecker(sm)
+        for entity, trigger, ts in read_csv_events("trace.csv"):
+            checker.feed(entity, trigger, ts)
+        report = checker.report()
+    """
+
+    def __init__(self, sm: Union[StateMachine, StateMachineExecutor],
+                 max_examples: int = DEFAULT_MAX_EXAMPLES):
+        self.executor = sm if isinstance(sm, StateMachineExecutor) else compile_state_machine(sm)
+        ex = self.executor
+        self.store = EntityStateStore(len(ex.states))
+        self.max_examples = max_examples
+        self._initial = ex.state_index[ex.initial_state]
+        self._reached = bytearray(len(ex.states))
+        self._illegal: Counter = Counter()
+        self._examples: List[Tuple[int, Any, str, str]] = []
+        self._events = 0
+        n = len(ex.states)
+        self._dwell_count = array('q', [0]) * n
+        self._dwell_sum = array('d', [0.0]) * n
+        self._dwell_min = array('d', [math.inf]) * n
+        self._dwell_max = array('d', [-math.inf]) * n
+
+    def feed(self, entity: Any, trigger: str, timestamp: Optional[float] = None,
+             context: Optional[Mapping[str, Any]] = None) -> None:
+        """Apply one event by trigger name."""
+        self.feed_code(entity, self.executor.trigger_index.get(trigger, -1), timestamp, context, trigger)
+
+    def feed_code(self, entity: Any, code: int, timestamp: Optional[float] = None,
+                  context: Optional[Mapping[str, Any]] = None, trigger: Optional[str] = None) -> None:
+        """
+        Apply one event by trigger code (see StateMachineExecutor.encode_triggers).
+
+        Args:
+            entity: Entity id
+            code: Trigger code; -1 or any code outside the machine's
+                triggers counts as an illegal event
+            timestamp: Event time, for dwell statistics
+            context: Condition variables
+            trigger: Trigger name used in reports (defaults to the code's name)
+        """
+        ex = self.executor
+        states, entered_at, slot = self.store.locate(entity)
+        current = states[slot]
+        if current == UNSEEN:
+            current = self._initial
+            states[slot] = current
+            self._reached[current] = 1
+            if timestamp is not None:
+                entered_at[slot] = timestamp
+
+        if 0 <= code < len(ex.triggers):
+            nxt = ex.next_state[current * len(ex.triggers) + code]
+            if nxt == CONDITIONAL:
+                nxt = ex.next_code(current, code, context)
+        else:
+            nxt = NO_TRANSITION
+
+        if nxt < 0:
+            if trigger is None:
+                trigger = ex.triggers[code] if 0 <= code < len(ex.triggers) else str(code)
+            self._illegal[(current, trigger)] += 1
+            if len(self._examples) < self.max_examples:
+                self._examples.append((self._events, entity, ex.states[current], trigger))
+        elif nxt != current:
+            if timestamp is not None:
+                entered = entered_at[slot]
+                if entered == entered:  # not NaN
+                    dwell = timestamp - entered
+                    self._dwell_count[current] += 1
+                    self._dwell_sum[current] += dwell
+                    if dwell < self._dwell_min[current]:
+                        self._dwell_min[current] = dwell
+                    if dwell > self._dwell_max[current]:
+                        self._dwell_max[current] = dwell
+                entered_at[slot] = timestamp
+            states[slot] = nxt
+            self._reached[nxt] = 1
+        self._events += 1
+
+    def feed_many(self, events: Iterator[Tuple[Any, Any, Optional[float]]]) -> "TraceChecker":
+        """Apply (entity, trigger, timestamp) events; integer triggers are codes."""
+        for entity, trigger, timestamp in events:
+            if isinstance(trigger, int):
+                self.feed_code(entity, trigger, timestamp)
+            else:
+                self.feed(entity, trigger, timestamp)
+        return self
+
+    def report(self) -> ConformanceReport:
+        """Summarize everything fed so far."""
+        ex = self.executor
+        finals = Counter(self.store.seen())
+        final_states = {ex.states[code]: count for code, count in sorted(finals.items())}
+        dwell = {}
+        for code, name in enumerate(ex.states):
+            count = self._dwell_count[code]
+            if count:
+                dwell[name] = DwellStats(count, self._dwell_sum[code] / count,
+                                         self._dwell_min[code], self._dwell_max[code])
+        return ConformanceReport(
+            machine=ex.name,
+            events=self._events,
+            entities=sum(finals.values()),
+            illegal=sum(self._illegal.values()),
+            illegal_by_pair={(ex.states[s], t): n for (s, t), n in self._illegal.most_common()},
+            examples=list(self._examples),
+            final_states=final_states,
+            terminal_never_reached=[name for code, name in enumerate(ex.states)
+                                    if ex.terminal[code] and not self._reached[code]],
+            unterminated=sum(n for code, n in finals.items() if not ex.terminal[code]),
+            dwell=dwell,
+        )
+
+
+def read_csv_events(path: Union[str, Path], entity: str = 'entity', trigger: str = 'trigger',
+                    timestamp: Optional[str] = 'timestamp') -> Iterator[Tuple[Any, str, Optional[float]]]:
+    """
+    Stream (entity, trigger, timestamp) events from a CSV file with a header row.
+
+    Numeric entity ids are converted to int (the cheapest ids for
+    EntityStateStore); a missing timestamp column yields None timestamps.
+
+    Args:
+        path: CSV file path
+        entity: Entity id column
+        trigger: Trigger column
+        timestamp: Timestamp column, or None
+
+    Yields:
+        Event tuples
+    """
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        columns = next(reader, None) or []
+        try:
+            e_col, t_col = columns.index(entity), columns.index(trigger)
+        except ValueError:
+            raise ValueError(f"{path}: CSV needs '{entity}' and '{trigger}' columns") from None
+        ts_col = columns.index(timestamp) if timestamp in columns else None
+        for row in reader:
+            if not row:
+                continue
+            value = row[e_col]
+            yield (int(value) if value.isdigit() else value, row[t_col],
+                   float(row[ts_col]) if ts_col is not None and row[ts_col] else None)
+
+
+def read_jsonl_events(path: Union[str, Path], entity: str = 'entity', trigger: str = 'trigger',
+                      timestamp: Optional[str] = 'timestamp') -> Iterator[Tuple[Any, str, Optional[float]]]:
+    """
+    Stream (entity, trigger, timestamp) events from a JSON-lines file.
+
+    Args:
+        path: JSONL file path
+        entity: Entity id key
+        trigger: Trigger key
+        timestamp: Timestamp key, or None
+
+    Yields:
+        Event tuples
+    """
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            yield event[entity], event[trigger], event.get(timestamp) if timestamp else None
+
+
+def read_binary_events(path: Union[str, Path], record_format: str = DEFAULT_BINARY_FORMAT,
+                       trigger_codes: Optional[Sequence[int]] = None
+                       ) -> Iterator[Tuple[int, int, Optional[float]]]:
+    """
+    Stream fixed-size (entity, trigger code, timestamp) records.
+
+    Records are read in chunks with struct.iter_unpack. Trigger codes in the
+    file can be translated to executor codes through trigger_codes (file
+    code -> executor code, -1 for triggers the machine does not know).
+
+    Args:
+        path: Binary file path
+        record_format: struct format of one record; two fields means no
+            timestamp
+        trigger_codes: Optional code translation table
+
+    Yields:
+        Event tuples with integer trigger codes
+    """
+    record = struct.Struct(record_format)
+    chunk_size = record.size * _CHUNK_RECORDS
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            usable = len(chunk) - len(chunk) % record.size
+            if usable <= 0:
+                break
+            for values in record.iter_unpack(chunk[:usable] if usable != len(chunk) else chunk):
+                code = values[1]
+                if trigger_codes is not None:
+                    code = trigger_codes[code] if 0 <= code < len(trigger_codes) else -1
+                yield values[0], code, values[2] if len(values) > 2 else None
+            if usable != len(chunk):
+                break
+
+
+def check_trace(sm: Union[StateMachine, StateMachineExecutor], path: Union[str, Path],
+                fmt: Optional[str] = None, max_examples: int = DEFAULT_MAX_EXAMPLES,
+                **reader_options) -> ConformanceReport:
+    """
+    Check an event log file against a state machine.
+
+    Args:
+        sm: StateMachine or compiled executor
+        path: Log file
+        fmt: 'csv', 'jsonl' or 'bin'; inferred from the suffix when None
+        max_examples: Number of illegal events kept as examples
+        **reader_options: Passed to the reader (column names, record format)
+
+    Returns:
+        ConformanceReport
+    """
+    fmt = fmt or Path(path).suffix.lstrip('.').lower()
+    readers = {'csv': read_csv_events, 'jsonl': read_jsonl_events, 'json': read_jsonl_events,
+               'bin': read_binary_events}
+    if fmt not in readers:
+        raise ValueError(f"Unknown trace format '{fmt}' for {path}")
+    checker = TraceChecker(sm, max_examples)
+    checker.feed_many(readers[fmt](path, **reader_options))
+    return checker.report()
+
+
+def generate_conformance_tables(report: ConformanceReport) -> List[Dict[str, Any]]:
+    """
+    Generate table sections for a conformance report.
+
+    Args:
+        report: ConformanceReport
+
+    Returns:
+        List of YAML table section dicts (summary, illegal transitions,
+        dwell times)
+    """
+    sections = [{
+        'type': 'table',
+        'title': f"{report.machine} Trace Conformance",
+        'headers': ['Metric', 'Value'],
+        'rows': [
+            ['Events', str(report.events)],
+            ['Entities', str(report.entities)],
+            ['Illegal transitions', str(report.illegal)],
+            ['Entities not in a terminal state', str(report.unterminated)],
+            ['Terminal states never reached', ', '.join(report.terminal_never_reached) or '-'],
+        ]
+    }]
+    if report.illegal_by_pair:
+        sections.append({
+            'type': 'table',
+            'title': f"{report.machine} Illegal Transitions",
+            'headers': ['State', 'Trigger', 'Count'],
+            'rows': [[state, trigger, str(n)] for (state, trigger), n in report.illegal_by_pair.items()]
+        })
+    if report.dwell:
+        sections.append({
+            'type': 'table',
+            'title': f"{report.machine} Dwell Times",
+            'headers': ['State', 'Exits', 'Mean', 'Min', 'Max'],
+            'rows': [[state, str(s.count), f"{s.mean:g}", f"{s.minimum:g}", f"{s.maximum:g}"]
+                     for state, s in report.dwell.items()]
+        })
+    return sections
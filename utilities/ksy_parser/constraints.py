@@ -0,0 +1,323 @@
+"""
+KSY Constraints - Compile x-constraint and x-packet constraints into validators.
+
+Provides utilities for:
+- Extracting per-field x-constraint expressions ("value == 0x01 or
+  value == 0x02") and x-packet.constraints entries as named constraints
+- Compiling them once into scalar predicates over decoded records or
+  NumPy-vectorized predicates over decoded columns
+- Validating many packets in one pass with per-constraint violation counts
+  and the first offending packet indices
+- Generating a report-ready violation table
+
+x-constraint expressions use the Kaitai expression subset of
+utilities.ksy_parser.expressions, with 'value' bound to the field. x-packet
+constraints are prose; entries of the form "<fields> MUST [NOT] be
+<values>" (e.g. "rsvd_hi and rsvd_lo MUST be 0", "type MUST be 0x01 (RUD)
+or 0x02 (ROD)") and entries that are already expressions over field names
+are compiled. Anything else is listed in 'skipped' so reviewers can see
+which constraints are only documented, not checked.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Set, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from utilities.ksy_parser.parser import KsyHeader
+
+from utilities.ksy_parser.encoder import enum_name_maps
+from utilities.ksy_parser.expressions import (
+    ExpressionError, compile_expression, compile_instances, tokenize,
+)
+
+
+DEFAULT_MAX_INDICES = 10
+
+_PROSE_RE = re.compile(r'^\s*(?P<subject>[\w\s,]+?)\s+MUST\s+(?P<neg>NOT\s+)?(?i:be)\s+(?P<values>.+?)\s*\.?\s*$')
+_PAREN_RE = re.compile(r'\([^)]*\)')
+
+
+@dataclass
+class Constraint:
+    """One executable constraint of a header."""
+    name: str
+    expr: str
+    source: str  # 'x-constraint' or 'x-packet'
+    field: Optional[str] = None
+
+
+@dataclass
+class ConstraintResult:
+    """Violation count and first offending indices for one constraint."""
+    constraint: Constraint
+    violations: int = 0
+    first_indices: List[int] = field(default_factory=list)
+
+
+@dataclass
+class ValidationReport:
+    """Result of validating a set of packets against a header's constraints."""
+    header_id: str
+    checked: int
+    results: List[ConstraintResult]
+    skipped: List[str]
+
+    @property
+    def ok(self) -> bool:
+        """True when no constraint was violated."""
+        return all(r.violations == 0 for r in self.results)
+
+    @property
+    def violations(self) -> Dict[str, int]:
+        """Constraint name -> violation count."""
+        return {r.constraint.name: r.violations for r in self.results}
+
+
+def _bind_value(expr: str, field_name: str) -> str:
+    """Rewrite an x-constraint expression so 'value' refers to field_name."""
+    tokens = tokenize(expr)[:-1]
+    return ' '.join(field_name if kind == 'name' and text == 'value' else text
+                    for kind, text in tokens)
+
+
+def _prose_to_expr(text: str, known: Set[str], enums: Mapping[str, Mapping[str, int]],
+                   field_enums: Mapping[str, Optional[str]]) -> Optional[str]:
+    """Translate "<fields> MUST [NOT] be <values>" into an expression, if possible."""
+    match = _PROSE_RE.match(text)
+    if not match:
+        return None
+    subjects = [s for s in re.split(r'\s*(?:,|\band\b)\s*', match.group('subject')) if s]
+    if not subjects or any(s not in known for s in subjects):
+        return None
+
+    values_text = _PAREN_RE.sub(' ', match.group('values'))
+    values_text = re.split(r'\s+for\s+', values_text)[0]
+    raw_values = [v for v in re.split(r'\s*(?:,|\bor\b)\s*', values_text.strip()) if v]
+    if not raw_values:
+        return None
+
+    negate = bool(match.group('neg'))
+    clauses = []
+    for subject in subjects:
+        ids = enums.get(field_enums.get(subject) or '', {})
+        values = []
+        for raw in raw_values:
+            if raw in ids:
+                values.append(ids[raw])
+                continue
+            try:
+                values.append(int(raw, 0))
+            except ValueError:
+                return None
+        op, join = ('!=', ' and ') if negate else ('==', ' or ')
+        clauses.append('(' + join.join(f"{subject} {op} {v}" for v in values) + ')')
+    return ' and '.join(clauses)
+
+
+def extract_constraints(header: "KsyHeader") -> Tuple[List[Constraint], List[str]]:
+    """
+    Collect the compilable constraints of a header.
+
+    Args:
+        header: KsyHeader with x-constraint fields and/or x-packet.constraints
+
+    Returns:
+        (constraints, skipped) where skipped lists constraint texts that
+        could not be turned into expressions
+    """
+    enums = enum_name_maps(header)
+    field_enums = {f.name: f.enum_type for f in header.fields}
+    known = set(field_enums) | {i.name for i in header.instances or []}
+
+    constraints: List[Constraint] = []
+    skipped: List[str] = []
+
+    for f in header.fields:
+        if not f.x_constraint:
+            continue
+        text = str(f.x_constraint)
+        label = f"{f.name}: {text}"
+        try:
+            constraints.append(Constraint(label, _bind_value(text, f.name), 'x-constraint', f.name))
+        except ExpressionError:
+            skipped.append(label)
+
+    for item in (header.x_packet or {}).get('constraints') or []:
+        text = str(item)
+        expr = _prose_to_expr(text, known, enums, field_enums)
+        if expr is None:
+            try:
+                names = compile_expression(text, enums).names
+            except ExpressionError:
+                names = None
+            if names is not None and names and set(names) <= known:
+                expr = text
+        if expr is None:
+            skipped.append(text)
+        else:
+            constraints.append(Constraint(text, expr, 'x-packet'))
+
+    return constraints, skipped
+
+
+class ConstraintValidator:
+    """Compiled constraint predicates for one header.
+
+    In scalar mode check() and validate() take decoded record dicts (from
+    compile_decoder); in vectorized mode validate() takes a dict of columns
+    (from compile_batch_decoder). Instances referenced by constraints are
+    evaluated automatically.
+    """
+
+    def __init__(self, header: "KsyHeader", vectorized: bool = False,
+                 max_indices: int = DEFAULT_MAX_INDICES):
+        self.header_id = header.id
+        self.vectorized = vectorized
+        self.max_indices = max_indices
+
+        enums = enum_name_maps(header)
+        constraints, skipped = extract_constraints(header)
+        self.constraints: List[Constraint] = []
+        self.skipped: List[str] = list(skipped)
+        self._predicates: List[Callable[[Mapping[str, Any]], Any]] = []
+        for constraint in constraints:
+            try:
+                predicate = compile_expression(constraint.expr, enums, vectorized)
+            except ExpressionError:
+                self.skipped.append(constraint.name)
+                continue
+            self.constraints.append(constraint)
+            self._predicates.append(predicate)
+
+        instance_names = {i.name for i in header.instances or []}
+        referenced = {n for p in self._predicates for n in p.names}
+        self._instances = None
+        if referenced & instance_names:
+            self._instances = compile_instances(header, vectorized=vectorized, strict=False)
+
+    def _env(self, record: Mapping[str, Any]) -> Mapping[str, Any]:
+        if self._instances is None:
+            return record
+        env = dict(record)
+        env.update(self._instances(record))
+        return env
+
+    def check(self, record: Mapping[str, Any]) -> List[str]:
+        """
+        Check one decoded record.
+
+        Args:
+            record: Field name -> value
+
+        Returns:
+            Names of the violated constraints (empty when valid)
+        """
+        env = self._env(record)
+        return [c.name for c, p in zip(self.constraints, self._predicates) if not p(env)]
+
+    def validate(self, records: Any) -> ValidationReport:
+        """
+        Validate many packets.
+
+        Args:
+            records: Iterable of decoded record dicts (scalar mode) or a
+                dict of equal-length columns (vectorized mode)
+
+        Returns:
+            ValidationReport with per-constraint counts and first indices
+        """
+        if self.vectorized:
+            return self._validate_columns(records)
+
+        results = [ConstraintResult(c) for c in self.constraints]
+        steps = list(zip(self._predicates, results))
+        limit = self.max_indices
+        checked = 0
+        for index, record in enumerate(records):
+            env = self._env(record)
+            for predicate, result in steps:
+                if not predicate(env):
+                    result.violations += 1
+                    if len(result.first_indices) < limit:
+                        result.first_indices.append(index)
+            checked += 1
+        return ValidationReport(self.header_id, checked, results, list(self.skipped))
+
+    def _validate_columns(self, columns: Mapping[str, Any]) -> ValidationReport:
+        from utilities.ksy_parser.batch import require_numpy
+        np = require_numpy()
+
+        count = len(next(iter(columns.values()))) if columns else 0
+        env = self._env(columns)
+        results = []
+        for constraint, predicate in zip(self.constraints, self._predicates):
+            ok = np.broadcast_to(np.asarray(predicate(env), dtype=bool), (count,))
+            bad = np.flatnonzero(~ok)
+            results.append(ConstraintResult(constraint, int(bad.size),
+                                            bad[:self.max_indices].tolist()))
+        return ValidationReport(self.header_id, count, results, list(self.skipped))
+
+
+def compile_validator(header: "KsyHeader", vectorized: bool = False,
+                      max_indices: int = DEFAULT_MAX_INDICES) -> ConstraintValidator:
+    """
+    Compile a header's constraints into a validator.
+
+    Args:
+        header: KsyHeader to compile
+        vectorized: Compile NumPy predicates over decoded columns
+        max_indices: Number of offending indices kept per constraint
+
+    Returns:
+        ConstraintValidator
+    """
+    return ConstraintValidator(header, vectorized, max_indices)
+
+
+def validate_packets(header: "KsyHeader", data: Any, stride: Optional[int] = None,
+                     max_indices: int = DEFAULT_MAX_INDICES) -> ValidationReport:
+    """
+    Decode back-to-back packets with NumPy and validate them in one pass.
+
+    Args:
+        header: KsyHeader describing the packets
+        data: bytes-like buffer or (N, stride) uint8 array
+        stride: Bytes per packet (see compile_batch_decoder)
+        max_indices: Number of offending indices kept per constraint
+
+    Returns:
+        ValidationReport
+    """
+    from utilities.ksy_parser.batch import compile_batch_decoder
+    columns = compile_batch_decoder(header, stride)(data)
+    return ConstraintValidator(header, True, max_indices).validate(columns)
+
+
+def generate_violation_table(report: ValidationReport) -> Dict[str, Any]:
+    """
+    Generate a table section summarizing a validation run.
+
+    Args:
+        report: ValidationReport
+
+    Returns:
+        Dict in YAML table format
+    """
+    rows = []
+    for result in report.results:
+        rows.append([
+            result.constraint.name,
+            result.constraint.source,
+            str(result.violations),
+            ', '.join(str(i) for i in result.first_indices),
+        ])
+    for text in report.skipped:
+        rows.append([text, 'not checked', '', ''])
+
+    return {
+        'type': 'table',
+        'title': f"Constraint Violations ({report.checked} packets)",
+        'headers': ['Constraint', 'Source', 'Violations', 'First Indices'],
+        'rows': rows
+    }
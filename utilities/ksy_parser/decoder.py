@@ -0,0 +1,188 @@
+"""
+KSY Decoder - Compile binary decoders from Kaitai Struct field layouts.
+
+Provides utilities for:
+- Building per-field extraction plans (byte slices, shifts and masks)
+- Compiling a plan into a single Python function that decodes one header
+
+The compiled decoder is generated source code specialised for one header
+layout, so decoding a packet costs one slice, at most one integer
+conversion for all bit fields, and one shift/mask per field.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from utilities.ksy_parser.parser import KsyHeader
+
+from utilities.ksy_parser.parser import TYPE_SIZES, split_type_endian
+
+
+@dataclass(frozen=True)
+class FieldPlan:
+    """Precomputed extraction plan for one field.
+
+    kind is one of:
+    - 'byte': single aligned byte, read by index
+    - 'int': aligned multi-byte integer, read with int.from_bytes
+    - 'bits': sub-byte or unaligned field, shifted/masked out of the
+      header-wide integer
+    - 'bytes': raw byte string (fields declared with 'size')
+    """
+    name: str
+    kind: str
+    offset_bits: int
+    size_bits: int
+    byte_start: int
+    byte_end: int
+    shift: int = 0
+    mask: int = 0
+    endian: str = 'be'
+    signed: bool = False
+
+
+def build_field_plan(header: "KsyHeader") -> List[FieldPlan]:
+    """
+    Build extraction plans for every fixed-size field of a header.
+
+    Fields whose size could not be determined (size_bits == 0) occupy no
+    bits in the parser's layout and are omitted from the plan.
+
+    Args:
+        header: KsyHeader with computed offset_bits/size_bits
+
+    Returns:
+        List of FieldPlan objects in wire order
+    """
+    span_bits = layout_size_bytes(header) * 8
+    plans = []
+
+    for field in header.fields:
+        if field.size_bits <= 0:
+            continue
+
+        base_type, type_endian = split_type_endian(field.type_str)
+        endian = type_endian or header.endian
+        signed = base_type.startswith('s') and base_type in TYPE_SIZES
+        start = field.offset_bits // 8
+        end = (field.offset_bits + field.size_bits + 7) // 8
+        aligned = field.offset_bits % 8 == 0 and field.size_bits % 8 == 0
+
+        if base_type in TYPE_SIZES and aligned:
+            kind = 'byte' if field.size_bits == 8 and not signed else 'int'
+            plans.append(FieldPlan(field.name, kind, field.offset_bits, field.size_bits,
+                                   start, end, endian=endian, signed=signed))
+        elif base_type not in TYPE_SIZES and not _is_bit_type(base_type) and aligned:
+            plans.append(FieldPlan(field.name, 'bytes', field.offset_bits, field.size_bits,
+                                   start, end))
+        else:
+            if header.bit_endian == 'le':
+                shift = field.offset_bits
+            else:
+                shift = span_bits - field.offset_bits - field.size_bits
+            plans.append(FieldPlan(field.name, 'bits', field.offset_bits, field.size_bits,
+                                   start, end, shift=shift,
+                                   mask=(1 << field.size_bits) - 1,
+                                   endian=header.bit_endian, signed=signed))
+
+    return plans
+
+
+def _is_bit_type(base_type: str) -> bool:
+    return base_type.startswith('b') and base_type[1:].isdigit()
+
+
+def layout_size_bytes(header: "KsyHeader") -> int:
+    """Return the number of bytes spanned by the header's field layout."""
+    total_bits = sum(f.size_bits for f in header.fields)
+    return (total_bits + 7) // 8
+
+
+def _endian_word(endian: str) -> str:
+    return 'little' if endian == 'le' else 'big'
+
+
+def _field_expr(plan: FieldPlan) -> str:
+    """Return the Python expression that extracts one field from 'b'/'_v'."""
+    if plan.kind == 'byte':
+        return f"b[{plan.byte_start}]"
+    if plan.kind == 'int':
+        return (f"_from_bytes(b[{plan.byte_start}:{plan.byte_end}], "
+                f"'{_endian_word(plan.endian)}', signed={plan.signed})")
+    if plan.kind == 'bytes':
+        return f"bytes(b[{plan.byte_start}:{plan.byte_end}])"
+    expr = f"(_v >> {plan.shift}) & {plan.mask:#x}" if plan.shift else f"_v & {plan.mask:#x}"
+    if plan.signed:
+        return f"_sign_extend({expr}, {plan.size_bits})"
+    return expr
+
+
+def _sign_extend(value: int, bits: int) -> int:
+    if value >> (bits - 1):
+        return value - (1 << bits)
+    return value
+
+
+def generate_decoder_source(header: "KsyHeader", plans: List[FieldPlan],
+                            func_name: str = "decode") -> str:
+    """
+    Generate Python source for a decoder function over the given plans.
+
+    Args:
+        header: KsyHeader the plans were built from
+        plans: Field plans from build_field_plan
+        func_name: Name of the generated function
+
+    Returns:
+        Python source code defining func_name(buf, offset=0)
+    """
+    size = layout_size_bytes(header)
+    short_msg = f"{header.id}: need {size} bytes, got %d"
+    lines = [
+        f"def {func_name}(buf, offset=0):",
+        f"    b = buf[offset:offset + {size}]",
+        f"    if len(b) < {size}:",
+        f"        raise ValueError({short_msg!r} % len(b))",
+    ]
+    if any(p.kind == 'bits' for p in plans):
+        lines.append(f"    _v = _from_bytes(b, '{_endian_word(header.bit_endian)}')")
+    lines.append("    return {")
+    for plan in plans:
+        lines.append(f"        {plan.name!r}: {_field_expr(plan)},")
+    lines.append("    }")
+    return "\n".join(lines) + "\n"
+
+
+def compile_decoder(header: "KsyHeader") -> Callable[..., Dict[str, Any]]:
+    """
+    Compile a decoder for a header's fixed field layout.
+
+    The returned callable takes (buf, offset=0), where buf is any bytes-like
+    object supporting slicing (bytes, bytearray, memoryview, mmap), and returns
+    a dict mapping field name to decoded value. Integer fields decode to int,
+    'size'-only fields decode to bytes.
+
+    The callable also carries the attributes 'plans', 'size_bytes' and
+    'source' for introspection.
+
+    Args:
+        header: KsyHeader to compile
+
+    Returns:
+        Decoder callable
+
+    Raises:
+        ValueError: If the buffer passed to the decoder is too short
+    """
+    plans = build_field_plan(header)
+    source = generate_decoder_source(header, plans)
+    namespace = {'_from_bytes': int.from_bytes, '_sign_extend': _sign_extend}
+    exec(compile(source, f"<ksy decoder {header.id}>", 'exec'), namespace)
+
+    decode = namespace['decode']
+    decode.__name__ = f"decode_{header.id}" if header.id.isidentifier() else "decode"
+    decode.plans = plans
+    decode.size_bytes = layout_size_bytes(header)
+    decode.source = source
+    return decode
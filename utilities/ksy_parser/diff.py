@@ -0,0 +1,352 @@
+"""
+KSY Datamodel Diff - Structural comparison of two datamodel versions.
+
+Provides utilities for:
+- Hashing each header into a signature over its layout, enums and state
+  machine, so unchanged headers are skipped with one comparison
+- Per-header change lists: added/removed/resized/retyped fields, shifted
+  offset_bits, enum value changes, state and transition changes
+- Generating report sections (summary and per-header change tables) for
+  pptx_helper
+
+Headers are matched by id; fields by name; enum values by value;
+transitions by (from, trigger, to).
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from utilities.ksy_parser.parser import KsyHeader, KsyField
+
+from utilities.ksy_parser.enums import extract_enums
+from utilities.ksy_parser.state_machine import StateMachine, extract_state_machine
+
+
+@dataclass
+class Change:
+    """One structural change within a header.
+
+    category is 'header', 'field', 'enum', 'state' or 'transition'; kind
+    is 'added', 'removed', 'resized', 'moved', 'retyped', 'renamed' or
+    'changed'.
+    """
+    category: str
+    element: str
+    kind: str
+    old: Any = None
+    new: Any = None
+
+
+@dataclass
+class HeaderDiff:
+    """Changes between two versions of one header."""
+    header_id: str
+    title: str
+    changes: List[Change] = field(default_factory=list)
+
+    def by_category(self, category: str) -> List[Change]:
+        """Return the changes of one category."""
+        return [c for c in self.changes if c.category == category]
+
+
+@dataclass
+class DatamodelDiff:
+    """Result of comparing two datamodel versions."""
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    changed: List[HeaderDiff] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+
+    @property
+    def has_changes(self) -> bool:
+        """True when any header was added, removed or changed."""
+        return bool(self.added or self.removed or self.changed)
+
+
+def _field_key(f: "KsyField") -> Tuple[Any, ...]:
+    return (f.name, f.type_str, f.size_bits, f.offset_bits, f.enum_type)
+
+
+def field_signature(f: "KsyField") -> str:
+    """Return a hash of a field's name, type, size, offset and enum type."""
+    return hashlib.sha1(repr(_field_key(f)).encode('utf-8')).hexdigest()
+
+
+def _enum_map(header: "KsyHeader") -> Dict[str, Dict[int, str]]:
+    if not header.enums:
+        return {}
+    return {e.name: {v.value: v.id for v in e.values} for e in extract_enums({'enums': header.enums})}
+
+
+def _state_machine(header: "KsyHeader") -> Optional[StateMachine]:
+    return extract_state_machine(header.x_protocol) if header.x_protocol else None
+
+
+def _machine_key(sm: Optional[StateMachine]) -> Any:
+    if sm is None:
+        return None
+    return {
+        'initial': sm.initial_state,
+        'states': [(s.name, bool(s.is_terminal)) for s in sm.states],
+        'transitions': [(t.from_state, t.trigger, t.to_state, t.condition, t.action)
+                        for t in sm.transitions],
+    }
+
+
+def header_signature(header: "KsyHeader") -> str:
+    """
+    Return a hash of everything the diff compares for a header.
+
+    Two headers with equal signatures produce no changes, so a diff can
+    skip them without walking their fields.
+
+    Args:
+        header: KsyHeader
+
+    Returns:
+        Hex digest
+    """
+    content = {
+        'size_bytes': header.size_bytes,
+        'fields': [field_signature(f) for f in header.fields],
+        'enums': {name: sorted(values.items()) for name, values in _enum_map(header).items()},
+        'state_machine': _machine_key(_state_machine(header)),
+    }
+    return hashlib.sha1(json.dumps(content, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def _diff_fields(old: "KsyHeader", new: "KsyHeader") -> List[Change]:
+    changes = []
+    old_fields = {f.name: f for f in old.fields}
+    new_fields = {f.name: f for f in new.fields}
+    old_sigs = {name: field_signature(f) for name, f in old_fields.items()}
+
+    for name, f in new_fields.items():
+        before = old_fields.get(name)
+        if before is None:
+            changes.append(Change('field', name, 'added', None, f"{f.type_str} @ bit {f.offset_bits}"))
+            continue
+        if old_sigs[name] == field_signature(f):
+            continue
+        if before.size_bits != f.size_bits:
+            changes.append(Change('field', name, 'resized', before.size_bits, f.size_bits))
+        if before.type_str != f.type_str or before.enum_type != f.enum_type:
+            old_type = before.type_str + (f" ({before.enum_type})" if before.enum_type else '')
+            new_type = f.type_str + (f" ({f.enum_type})" if f.enum_type else '')
+            if old_type != new_type:
+                changes.append(Change('field', name, 'retyped', old_type, new_type))
+        if before.offset_bits != f.offset_bits:
+            changes.append(Change('field', name, 'moved', before.offset_bits, f.offset_bits))
+
+    for name, f in old_fields.items():
+        if name not in new_fields:
+            changes.append(Change('field', name, 'removed', f"{f.type_str} @ bit {f.offset_bits}", None))
+    return changes
+
+
+def _diff_enums(old: "KsyHeader", new: "KsyHeader") -> List[Change]:
+    changes = []
+    old_enums, new_enums = _enum_map(old), _enum_map(new)
+    for name, values in new_enums.items():
+        before = old_enums.get(name)
+        if before is None:
+            changes.append(Change('enum', name, 'added', None, f"{len(values)} values"))
+            continue
+        for value, enum_id in values.items():
+            element = f"{name}.{value:#x}"
+            if value not in before:
+                changes.append(Change('enum', element, 'added', None, enum_id))
+            elif before[value] != enum_id:
+                changes.append(Change('enum', element, 'renamed', before[value], enum_id))
+        for value, enum_id in before.items():
+            if value not in values:
+                changes.append(Change('enum', f"{name}.{value:#x}", 'removed', enum_id, None))
+    for name, values in old_enums.items():
+        if name not in new_enums:
+            changes.append(Change('enum', name, 'removed', f"{len(values)} values", None))
+    return changes
+
+
+def _diff_state_machines(old: "KsyHeader", new: "KsyHeader") -> List[Change]:
+    old_sm, new_sm = _state_machine(old), _state_machine(new)
+    if old_sm is None and new_sm is None:
+        return []
+    if old_sm is None:
+        return [Change('state', new_sm.name, 'added', None,
+                       f"{len(new_sm.states)} states, {len(new_sm.transitions)} transitions")]
+    if new_sm is None:
+        return [Change('state', old_sm.name, 'removed',
+                       f"{len(old_sm.states)} states, {len(old_sm.transitions)} transitions", None)]
+
+    changes = []
+    if old_sm.initial_state != new_sm.initial_state:
+        changes.append(Change('state', 'initial state', 'changed', old_sm.initial_state, new_sm.initial_state))
+
+    old_states = {s.name: s for s in old_sm.states}
+    new_states = {s.name: s for s in new_sm.states}
+    for name, state in new_states.items():
+        before = old_states.get(name)
+        if before is None:
+            changes.append(Change('state', name, 'added'))
+        elif bool(before.is_terminal) != bool(state.is_terminal):
+            changes.append(Change('state', name, 'changed',
+                                  'terminal' if before.is_terminal else 'non-terminal',
+                                  'terminal' if state.is_terminal else 'non-terminal'))
+    for name in old_states:
+        if name not in new_states:
+            changes.append(Change('state', name, 'removed'))
+
+    def by_edge(sm: StateMachine) -> Dict[Tuple[str, str, str], Tuple[Any, Any]]:
+        return {(t.from_state, t.trigger, t.to_state): (t.condition, t.action) for t in sm.transitions}
+
+    old_edges, new_edges = by_edge(old_sm), by_edge(new_sm)
+    for edge, details in new_edges.items():
+        element = f"{edge[0]} --[{edge[1]}]--> {edge[2]}"
+        if edge not in old_edges:
+            changes.append(Change('transition', element, 'added'))
+        elif old_edges[edge] != details:
+            changes.append(Change('transition', element, 'changed',
+                                  _describe_guard(*old_edges[edge]), _describe_guard(*details)))
+    for edge in old_edges:
+        if edge not in new_edges:
+            changes.append(Change('transition', f"{edge[0]} --[{edge[1]}]--> {edge[2]}", 'removed'))
+    return changes
+
+
+def _describe_guard(condition: Any, action: Any) -> str:
+    parts = []
+    if condition:
+        parts.append(f"if {condition}")
+    if action:
+        parts.append(f"do {action}")
+    return '; '.join(parts) or '-'
+
+
+def diff_headers(old: "KsyHeader", new: "KsyHeader") -> HeaderDiff:
+    """
+    Compare two versions of one header.
+
+    Args:
+        old: Header from the old datamodel
+        new: Header from the new datamodel
+
+    Returns:
+        HeaderDiff (empty changes when the headers are equivalent)
+    """
+    result = HeaderDiff(new.id, new.title or new.id)
+    if old.size_bytes != new.size_bytes:
+        result.changes.append(Change('header', 'size_bytes', 'resized', old.size_bytes, new.size_bytes))
+    result.changes.extend(_diff_fields(old, new))
+    result.changes.extend(_diff_enums(old, new))
+    result.changes.extend(_diff_state_machines(old, new))
+    return result
+
+
+HeaderSet = Union[Mapping[str, "KsyHeader"], Iterable["KsyHeader"]]
+
+
+def _by_id(headers: Any) -> Tuple[Dict[str, "KsyHeader"], Dict[str, str]]:
+    if hasattr(headers, 'headers') and isinstance(headers.headers, Mapping):
+        # ParseTreeResult: signatures are memoized on the result
+        return dict(headers.headers), headers.signatures
+    if isinstance(headers, Mapping):
+        return dict(headers), {}
+    return {h.id: h for h in headers}, {}
+
+
+def _signature(header_id: str, headers: Mapping[str, "KsyHeader"], memo: Dict[str, str]) -> str:
+    signature = memo.get(header_id)
+    if signature is None:
+        signature = memo[header_id] = header_signature(headers[header_id])
+    return signature
+
+
+def diff_datamodels(old: HeaderSet, new: HeaderSet) -> DatamodelDiff:
+    """
+    Compare two datamodel versions header by header.
+
+    Each header's signature is computed once per call; for ParseTreeResult
+    inputs it is memoized on the result, so diffing the same parse again
+    (e.g. against several versions) costs one string comparison per
+    unchanged header. Do not mutate headers of a result after diffing it.
+
+    Args:
+        old: Old headers (id -> header mapping, iterable of headers, or a
+            ParseTreeResult)
+        new: New headers, in the same forms
+
+    Returns:
+        DatamodelDiff with header ids sorted
+    """
+    (old_headers, old_sigs), (new_headers, new_sigs) = _by_id(old), _by_id(new)
+    result = DatamodelDiff(
+        added=sorted(set(new_headers) - set(old_headers)),
+        removed=sorted(set(old_headers) - set(new_headers)),
+    )
+    for header_id in sorted(set(old_headers) & set(new_headers)):
+        before, after = old_headers[header_id], new_headers[header_id]
+        if _signature(header_id, old_headers, old_sigs) == _signature(header_id, new_headers, new_sigs):
+            result.unchanged.append(header_id)
+            continue
+        header_diff = diff_headers(before, after)
+        if header_diff.changes:
+            result.changed.append(header_diff)
+        else:
+            result.unchanged.append(header_id)
+    return result
+
+
+def _cell(value: Any) -> str:
+    return '-' if value is None or value == '' else str(value)
+
+
+def generate_diff_sections(diff: DatamodelDiff, title: str = "Datamodel Changes",
+                           subtitle: str = "") -> List[Dict[str, Any]]:
+    """
+    Generate report sections describing a datamodel diff.
+
+    Produces a section header, a summary table, added/removed header
+    lists, and one change table per changed header.
+
+    Args:
+        diff: DatamodelDiff from diff_datamodels
+        title: Section header title
+        subtitle: Section header subtitle, e.g. "UE 1.0 -> 1.0.1"
+
+    Returns:
+        List of YAML section dicts
+    """
+    sections: List[Dict[str, Any]] = [{
+        'type': 'section_header',
+        'title': title,
+        'subtitle': subtitle,
+    }, {
+        'type': 'table',
+        'title': f"{title} Summary",
+        'headers': ['Change', 'Headers'],
+        'rows': [
+            ['Added', str(len(diff.added))],
+            ['Removed', str(len(diff.removed))],
+            ['Changed', str(len(diff.changed))],
+            ['Unchanged', str(len(diff.unchanged))],
+        ],
+    }]
+    if diff.added:
+        sections.append({'type': 'item_list', 'title': 'Added Headers',
+                         'items': list(diff.added), 'item_type': 'closed'})
+    if diff.removed:
+        sections.append({'type': 'item_list', 'title': 'Removed Headers',
+                         'items': list(diff.removed), 'item_type': 'closed'})
+
+    for header_diff in diff.changed:
+        sections.append({
+            'type': 'table',
+            'title': f"{header_diff.title} Changes",
+            'headers': ['Element', 'Category', 'Change', 'Old', 'New'],
+            'rows': [[c.element, c.category, c.kind, _cell(c.old), _cell(c.new)]
+                     for c in header_diff.changes],
+        })
+    return sections
@@ -0,0 +1,197 @@
+"""
+KSY Efficiency - Vectorized header-efficiency and overhead sweeps.
+
+Provides utilities for:
+- Building stack profiles (summed header bytes) from parsed KsyHeaders or
+  from ProtocolStack paths
+- Computing efficiency, goodput and packets-per-second over arrays of
+  payload sizes, payload MTUs and link rates with NumPy broadcasting
+- Generating report-ready 'table' sections in the format used by the
+  packet taxonomy docs
+
+Model: a message of P payload bytes is carried in ceil(P / mtu) packets
+(one packet when mtu is None); every packet pays the stack's header bytes
+plus an optional fixed per-packet wire overhead (e.g. 20 bytes of
+preamble, SFD and inter-frame gap, plus 4 bytes FCS).
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from utilities.ksy_parser.parser import KsyHeader
+    from utilities.ksy_parser.stack import ProtocolStack
+
+from utilities.ksy_parser.batch import require_numpy
+from utilities.ksy_parser.stack import overhead_bytes
+
+
+ETHERNET_WIRE_OVERHEAD = 24  # preamble + SFD (8) + IFG (12) + FCS (4)
+
+
+@dataclass
+class StackProfile:
+    """A named protocol stack and its total header bytes per packet."""
+    name: str
+    header_bytes: int
+    headers: Optional[List[str]] = None
+
+
+def stack_profile(name: str, headers: Sequence["KsyHeader"]) -> StackProfile:
+    """Build a profile from headers in wire order, sized like ProtocolStack.overhead_bytes."""
+    return StackProfile(name, overhead_bytes(headers), [h.id for h in headers])
+
+
+def profiles_from_stack(stack: "ProtocolStack") -> List[StackProfile]:
+    """Build one profile per root-to-leaf path of a ProtocolStack."""
+    return [
+        StackProfile(' / '.join(stack.headers[h].title or h for h in path),
+                     stack.overhead_bytes(path), list(path))
+        for path in stack.paths()
+    ]
+
+
+@dataclass
+class EfficiencySweep:
+    """Results of efficiency_sweep.
+
+    efficiency has shape (stacks, points); goodput_gbps and
+    packets_per_second have shape (stacks, points, rates), where points is
+    the broadcast shape of payload_bytes and mtu flattened to 1-D.
+    """
+    profiles: List[StackProfile]
+    payload_bytes: Any
+    mtu: Any
+    link_rates_gbps: Any
+    packets: Any
+    wire_bytes: Any
+    efficiency: Any
+    goodput_gbps: Any
+    packets_per_second: Any
+
+
+def efficiency_sweep(profiles: Sequence[StackProfile], payload_bytes: Any,
+                     link_rates_gbps: Any = (100.0,), mtu: Any = None,
+                     wire_overhead: int = 0) -> EfficiencySweep:
+    """
+    Compute efficiency, goodput and packet rate for every stack and point.
+
+    Args:
+        profiles: Stacks to compare
+        payload_bytes: Message payload sizes (scalar or array)
+        link_rates_gbps: Link rates in Gb/s (scalar or array)
+        mtu: Maximum payload bytes per packet, broadcast against
+            payload_bytes; None carries each message in one packet
+        wire_overhead: Fixed bytes per packet outside the headers (use
+            ETHERNET_WIRE_OVERHEAD for on-the-wire figures)
+
+    Returns:
+        EfficiencySweep
+
+    Raises:
+        ImportError: If NumPy is not installed
+        ValueError: If an mtu is not positive
+    """
+    np = require_numpy()
+    payload = np.atleast_1d(np.asarray(payload_bytes, dtype=np.float64))
+    rates = np.atleast_1d(np.asarray(link_rates_gbps, dtype=np.float64))
+
+    if mtu is None:
+        payload = payload.ravel()
+        mtu_arr = np.full_like(payload, np.inf)
+    else:
+        payload, mtu_arr = np.broadcast_arrays(payload, np.asarray(mtu, dtype=np.float64))
+        payload, mtu_arr = payload.ravel(), mtu_arr.ravel()
+        if (mtu_arr <= 0).any():
+            raise ValueError("mtu must be positive")
+
+    packets = np.maximum(1.0, np.ceil(payload / mtu_arr))                      # (P,)
+    per_packet = np.array([p.header_bytes for p in profiles], dtype=np.float64) + wire_overhead
+    wire = payload[None, :] + packets[None, :] * per_packet[:, None]           # (S, P)
+    efficiency = np.divide(payload[None, :], wire, out=np.zeros_like(wire), where=wire > 0)
+
+    line_bytes_per_s = rates * 1e9 / 8.0                                        # (R,)
+    goodput = efficiency[:, :, None] * rates[None, None, :]
+    pps = (packets[None, :, None] / wire[:, :, None]) * line_bytes_per_s[None, None, :]
+
+    return EfficiencySweep(list(profiles), payload, mtu_arr, rates, packets, wire,
+                           efficiency, goodput, pps)
+
+
+def _format_payload(size: float) -> str:
+    size = int(size)
+    if size >= 1024 and size % 1024 == 0:
+        return f"{size // 1024}KB"
+    return f"{size}B"
+
+
+def _nearest(values, target: float) -> int:
+    np = require_numpy()
+    return int(np.argmin(np.abs(values - target)))
+
+
+def generate_efficiency_table(sweep: EfficiencySweep, payloads: Sequence[float] = (4096,),
+                              title: str = "Header Efficiency Comparison") -> Dict[str, Any]:
+    """
+    Generate a table of header bytes and efficiency at selected payloads.
+
+    Columns match the taxonomy docs: Protocol Stack, Total Headers and one
+    'Efficiency (<payload> payload)' column per requested payload (the
+    nearest swept point is used).
+
+    Args:
+        sweep: Result of efficiency_sweep
+        payloads: Payload sizes to report
+        title: Table title
+
+    Returns:
+        Dict in YAML table format
+    """
+    columns = [_nearest(sweep.payload_bytes, p) for p in payloads]
+    rows = []
+    for i, profile in enumerate(sweep.profiles):
+        row = [profile.name, f"{profile.header_bytes} bytes"]
+        row.extend(f"{sweep.efficiency[i, c] * 100:.1f}%" for c in columns)
+        rows.append(row)
+
+    return {
+        'type': 'table',
+        'title': title,
+        'headers': ['Protocol Stack', 'Total Headers'] +
+                   [f"Efficiency ({_format_payload(sweep.payload_bytes[c])} payload)" for c in columns],
+        'rows': rows
+    }
+
+
+def generate_goodput_table(sweep: EfficiencySweep, payload: float = 4096,
+                           title: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Generate a table of goodput and packet rate per link rate at one payload.
+
+    Args:
+        sweep: Result of efficiency_sweep
+        payload: Payload size to report (nearest swept point)
+        title: Optional table title
+
+    Returns:
+        Dict in YAML table format
+    """
+    c = _nearest(sweep.payload_bytes, payload)
+    headers = ['Protocol Stack']
+    for rate in sweep.link_rates_gbps:
+        headers.extend([f"Goodput @ {rate:g}G (Gb/s)", f"Mpps @ {rate:g}G"])
+
+    rows = []
+    for i, profile in enumerate(sweep.profiles):
+        row = [profile.name]
+        for r in range(len(sweep.link_rates_gbps)):
+            row.append(f"{sweep.goodput_gbps[i, c, r]:.1f}")
+            row.append(f"{sweep.packets_per_second[i, c, r] / 1e6:.2f}")
+        rows.append(row)
+
+    return {
+        'type': 'table',
+        'title': title or f"Goodput ({_format_payload(sweep.payload_bytes[c])} payload)",
+        'headers': headers,
+        'rows': rows
+    }
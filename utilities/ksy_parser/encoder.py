@@ -0,0 +1,239 @@
+"""
+KSY Encoder - Pack field values back into wire bytes using KSY layouts.
+
+Provides utilities for:
+- Compiling a per-header packer that serializes a field dict to bytes
+- Bulk packing of columnar field arrays into N back-to-back packets
+
+Both packers reuse the decoder's field plans, so anything a compiled
+decoder reads, the matching encoder writes. Enum fields accept either the
+integer value or the enum id from KsyHeader.enums. Missing fields encode
+as zero, so reserved fields can be omitted.
+"""
+
+from typing import Any, Callable, Dict, List, Mapping, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from utilities.ksy_parser.parser import KsyHeader
+
+from utilities.ksy_parser.decoder import FieldPlan, build_field_plan, layout_size_bytes
+from utilities.ksy_parser.enums import extract_enums
+
+
+def enum_name_maps(header: "KsyHeader") -> Dict[str, Dict[str, int]]:
+    """
+    Build enum id -> value lookups for every enum defined by a header.
+
+    Args:
+        header: KsyHeader with enums
+
+    Returns:
+        Dict of enum name to {id: value}
+    """
+    if not header.enums:
+        return {}
+    return {
+        enum_def.name: {v.id: v.value for v in enum_def.values}
+        for enum_def in extract_enums({'enums': header.enums})
+    }
+
+
+def _overflow(name: str, value: Any, size_bits: int) -> None:
+    raise ValueError(f"Value {value!r} does not fit {size_bits}-bit field '{name}'")
+
+
+def _range_check(plan: FieldPlan) -> str:
+    """Return a guard statement rejecting values that do not fit the field."""
+    if plan.signed:
+        low, high = -(1 << (plan.size_bits - 1)), (1 << (plan.size_bits - 1)) - 1
+    else:
+        low, high = 0, (1 << plan.size_bits) - 1
+    return (f"    if not {low} <= v <= {high:#x}: "
+            f"_overflow({plan.name!r}, v, {plan.size_bits})")
+
+
+def generate_encoder_source(header: "KsyHeader", plans: List[FieldPlan],
+                            stride: int, enum_fields: Mapping[str, str],
+                            func_name: str = "encode") -> str:
+    """
+    Generate Python source for an encoder function over the given plans.
+
+    Args:
+        header: KsyHeader the plans were built from
+        plans: Field plans from build_field_plan
+        stride: Output size in bytes
+        enum_fields: Field name -> enum name for fields accepting enum ids
+        func_name: Name of the generated function
+
+    Returns:
+        Python source code defining func_name(record)
+    """
+    order = 'little' if header.bit_endian == 'le' else 'big'
+    span_bits = stride * 8
+    lines = [f"def {func_name}(record):", "    _v = 0"]
+    tail = []
+
+    for plan in plans:
+        if plan.kind == 'bytes':
+            width = plan.byte_end - plan.byte_start
+            tail.append(f"    v = bytes(record.get({plan.name!r}, b''))")
+            tail.append(f"    if len(v) > {width}: _overflow({plan.name!r}, v, {plan.size_bits})")
+            tail.append(f"    out[{plan.byte_start}:{plan.byte_start} + len(v)] = v")
+            continue
+
+        target = tail if plan.kind == 'int' else lines
+        target.append(f"    v = record.get({plan.name!r}, 0)")
+        if plan.name in enum_fields:
+            target.append(f"    if v.__class__ is str: v = _enums[{enum_fields[plan.name]!r}][v]")
+        target.append(_range_check(plan))
+
+        if plan.kind == 'int':
+            endian = 'little' if plan.endian == 'le' else 'big'
+            target.append(f"    out[{plan.byte_start}:{plan.byte_end}] = "
+                          f"v.to_bytes({plan.byte_end - plan.byte_start}, '{endian}', "
+                          f"signed={plan.signed})")
+            continue
+
+        # Bit-positioned fields (including aligned single bytes) share one integer
+        shift = plan.offset_bits if order == 'little' else span_bits - plan.offset_bits - plan.size_bits
+        value = f"(v & {(1 << plan.size_bits) - 1:#x})" if plan.signed else "v"
+        lines.append(f"    _v |= {value} << {shift}" if shift else f"    _v |= {value}")
+
+    if tail:
+        lines.append(f"    out = bytearray(_v.to_bytes({stride}, '{order}'))")
+        lines.extend(tail)
+        lines.append("    return bytes(out)")
+    else:
+        lines.append(f"    return _v.to_bytes({stride}, '{order}')")
+    return "\n".join(lines) + "\n"
+
+
+def _enum_fields(header: "KsyHeader", enums: Mapping[str, Any]) -> Dict[str, str]:
+    return {f.name: f.enum_type for f in header.fields if f.enum_type in enums}
+
+
+def compile_encoder(header: "KsyHeader",
+                    stride: Optional[int] = None) -> Callable[[Mapping[str, Any]], bytes]:
+    """
+    Compile a packer that serializes one field dict to wire bytes.
+
+    The returned callable takes a mapping of field name to value and returns
+    bytes of length stride. Enum fields accept the enum id string in place of
+    the integer value; 'size'-only fields take bytes (shorter values are
+    zero-padded).
+
+    Args:
+        header: KsyHeader to compile
+        stride: Output size in bytes; defaults to the larger of
+            header.size_bytes and the span of the field layout
+
+    Returns:
+        Encoder callable carrying 'plans', 'size_bytes' and 'source'
+
+    Raises:
+        ValueError: If a value does not fit its field (raised by the encoder)
+        KeyError: If an enum id is not defined (raised by the encoder)
+    """
+    plans = build_field_plan(header)
+    if stride is None:
+        stride = max(header.size_bytes, layout_size_bytes(header))
+    enums = enum_name_maps(header)
+    source = generate_encoder_source(header, plans, stride, _enum_fields(header, enums))
+    namespace = {'_enums': enums, '_overflow': _overflow}
+    exec(compile(source, f"<ksy encoder {header.id}>", 'exec'), namespace)
+
+    encode = namespace['encode']
+    encode.__name__ = f"encode_{header.id}" if header.id.isidentifier() else "encode"
+    encode.plans = plans
+    encode.size_bytes = stride
+    encode.source = source
+    return encode
+
+
+def _enum_codes(np, values, mapping: Mapping[str, int]):
+    """Map an array of enum ids to integer codes via its unique values."""
+    uniques, inverse = np.unique(values, return_inverse=True)
+    codes = np.array([mapping[u] for u in uniques.tolist()], dtype=np.int64)
+    return codes[inverse]
+
+
+def compile_batch_encoder(header: "KsyHeader",
+                          stride: Optional[int] = None) -> Callable[..., Any]:
+    """
+    Compile a bulk packer that writes N packets from columnar field arrays.
+
+    The returned callable takes a mapping of field name to array-like of N
+    values (enum columns may hold enum id strings) and returns an (N, stride)
+    uint8 NumPy array; call .tobytes() on it for a contiguous wire buffer.
+    Missing columns encode as zero.
+
+    Args:
+        header: KsyHeader to compile
+        stride: Bytes per packet (see compile_encoder)
+
+    Returns:
+        Batch encoder callable
+
+    Raises:
+        ImportError: If NumPy is not installed
+    """
+    from utilities.ksy_parser.batch import require_numpy
+    np = require_numpy()
+
+    plans = build_field_plan(header)
+    if stride is None:
+        stride = max(header.size_bytes, layout_size_bytes(header))
+    enums = enum_name_maps(header)
+    enum_fields = _enum_fields(header, enums)
+
+    def encode_batch(columns: Mapping[str, Any], count: Optional[int] = None):
+        if count is None:
+            count = len(next(iter(columns.values()))) if columns else 0
+        out = np.zeros((count, stride), dtype=np.uint8)
+
+        for plan in plans:
+            if plan.name not in columns:
+                continue
+            values = np.asarray(columns[plan.name])
+
+            if plan.kind == 'bytes':
+                out[:, plan.byte_start:plan.byte_end] = values.reshape(count, -1)
+                continue
+
+            if values.dtype.kind in 'UO' and plan.name in enum_fields:
+                values = _enum_codes(np, values, enums[enum_fields[plan.name]])
+            values = values.astype(np.int64, copy=False)
+            low = -(1 << (plan.size_bits - 1)) if plan.signed else 0
+            high = (1 << (plan.size_bits - 1)) - 1 if plan.signed else (1 << plan.size_bits) - 1
+            if plan.size_bits < 64 and values.size and (values.min() < low or values.max() > high):
+                raise ValueError(f"Column '{plan.name}' has values outside {plan.size_bits}-bit range")
+
+            if plan.kind == 'byte':
+                out[:, plan.byte_start] = values.astype(np.uint8)
+                continue
+
+            if plan.kind == 'int':
+                width = plan.byte_end - plan.byte_start
+                order = '<' if plan.endian == 'le' else '>'
+                code = 'i' if plan.signed else 'u'
+                raw = values.astype(f'{order}{code}{width}').view(np.uint8).reshape(count, width)
+                out[:, plan.byte_start:plan.byte_end] = raw
+                continue
+
+            span = plan.byte_end - plan.byte_start
+            if span > 8:
+                raise ValueError(f"Bit field '{plan.name}' spans {span} bytes; at most 8 supported")
+            if plan.endian == 'le':
+                shift = plan.offset_bits - plan.byte_start * 8
+            else:
+                shift = plan.byte_end * 8 - plan.offset_bits - plan.size_bits
+            word = (values.astype(np.uint64) & np.uint64(plan.mask)) << np.uint64(shift)
+            for i, col in enumerate(range(plan.byte_start, plan.byte_end)):
+                byte_shift = 8 * i if plan.endian == 'le' else 8 * (span - 1 - i)
+                out[:, col] |= ((word >> np.uint64(byte_shift)) & np.uint64(0xFF)).astype(np.uint8)
+
+        return out
+
+    encode_batch.plans = plans
+    encode_batch.stride = stride
+    return encode_batch
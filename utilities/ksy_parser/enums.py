@@ -4,10 +4,20 @@ KSY Enums - Extract and format enumeration definitions from Kaitai Struct files.
 Provides utilities for:
 - Extracting enum definitions from KSY data
 - Generating YAML table format for enumerations
+- Precomputed value<->id lookup tables (dense arrays for compact value
+  ranges, hash maps for sparse ones) and vectorized decoding of NumPy code
+  columns into labels
 """
 
 from dataclasses import dataclass
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from utilities.ksy_parser.parser import KsyHeader
+
+
+DENSE_ENUM_SPAN = 4096
+UNKNOWN_LABEL = 'unknown'
 
 
 @dataclass
@@ -117,3 +127,161 @@ def generate_enum_sections(ksy_data: dict, title_prefix: str = "") -> List[Dict[
     """
     enums = extract_enums(ksy_data)
     return [generate_enum_table(e, title_prefix) for e in enums]
+
+
+class EnumTable:
+    """Precomputed lookups for one enumeration.
+
+    Values spanning at most dense_span codes are decoded through a list
+    indexed by (value - minimum); wider, sparse enums use a dict. NumPy
+    decoding uses a dense index array or a sorted-values search likewise.
+    """
+
+    def __init__(self, enum_def: EnumDef, dense_span: int = DENSE_ENUM_SPAN):
+        self.name = enum_def.name
+        self.by_value: Dict[int, str] = {v.value: v.id for v in enum_def.values}
+        self.by_id: Dict[str, int] = {v.id: v.value for v in enum_def.values}
+        self.labels: List[str] = [v.id for v in enum_def.values]
+        self.values: List[int] = [v.value for v in enum_def.values]
+
+        self.minimum = min(self.values) if self.values else 0
+        span = (max(self.values) - self.minimum + 1) if self.values else 0
+        self.dense: Optional[List[Optional[str]]] = None
+        if 0 < span <= dense_span:
+            self.dense = [None] * span
+            for value, label in self.by_value.items():
+                self.dense[value - self.minimum] = label
+        self._np_tables = None
+
+    @property
+    def is_dense(self) -> bool:
+        """True when lookups use a dense array."""
+        return self.dense is not None
+
+    def name_of(self, value: int, default: Optional[str] = None) -> Optional[str]:
+        """Return the id for a value, or default when the value is not defined."""
+        if self.dense is not None:
+            index = value - self.minimum
+            if 0 <= index < len(self.dense):
+                label = self.dense[index]
+                return default if label is None else label
+            return default
+        return self.by_value.get(value, default)
+
+    def value_of(self, enum_id: str) -> int:
+        """
+        Return the value for an enum id.
+
+        Raises:
+            KeyError: If the id is not defined
+        """
+        return self.by_id[enum_id]
+
+    def _numpy_tables(self):
+        from utilities.ksy_parser.batch import require_numpy
+        np = require_numpy()
+        if self._np_tables is None:
+            order = sorted(range(len(self.values)), key=self.values.__getitem__)
+            sorted_values = np.asarray([self.values[i] for i in order], dtype=np.int64)
+            dense_index = None
+            if self.dense is not None:
+                dense_index = np.full(len(self.dense), len(self.labels), dtype=np.intp)
+                for i, value in enumerate(self.values):
+                    dense_index[value - self.minimum] = i
+            self._np_tables = (np.asarray(order, dtype=np.intp), sorted_values, dense_index)
+        return np, self._np_tables
+
+    def categorize(self, codes: Any) -> Tuple[Any, List[str]]:
+        """
+        Map a code array to category indices.
+
+        Args:
+            codes: NumPy integer array (any shape)
+
+        Returns:
+            (indices, categories): indices has the shape of codes and
+            indexes categories, which are the enum ids in definition order;
+            undefined codes get index len(categories)
+        """
+        np, (order, sorted_values, dense_index) = self._numpy_tables()
+        codes = np.asarray(codes).astype(np.int64, copy=False)
+        missing = len(self.labels)
+        if dense_index is not None:
+            offset = codes - self.minimum
+            inside = (offset >= 0) & (offset < len(dense_index))
+            indices = np.full(codes.shape, missing, dtype=np.intp)
+            indices[inside] = dense_index[offset[inside]]
+        elif len(sorted_values):
+            pos = np.searchsorted(sorted_values, codes)
+            pos_clipped = np.minimum(pos, len(sorted_values) - 1)
+            found = sorted_values[pos_clipped] == codes
+            indices = np.where(found, order[pos_clipped], missing)
+        else:
+            indices = np.full(codes.shape, missing, dtype=np.intp)
+        return indices, list(self.labels)
+
+    def decode(self, codes: Any, unknown: str = UNKNOWN_LABEL) -> Any:
+        """
+        Map a code array to an array of enum id labels.
+
+        Args:
+            codes: NumPy integer array
+            unknown: Label for undefined codes
+
+        Returns:
+            NumPy string array with the shape of codes
+        """
+        np, _ = self._numpy_tables()
+        indices, categories = self.categorize(codes)
+        return np.asarray(categories + [unknown]).take(indices)
+
+
+def build_enum_tables(source: Any, dense_span: int = DENSE_ENUM_SPAN) -> Dict[str, EnumTable]:
+    """
+    Build lookup tables for every enum of a header or KSY data dict.
+
+    Args:
+        source: KsyHeader, or parsed KSY YAML data with an 'enums' section
+        dense_span: Largest value span decoded through a dense array
+
+    Returns:
+        Dict of enum name to EnumTable
+    """
+    enums = source.get('enums') if isinstance(source, dict) else source.enums
+    return {e.name: EnumTable(e, dense_span) for e in extract_enums({'enums': enums or {}})}
+
+
+def decode_enum(table: EnumTable, codes: Any, unknown: str = UNKNOWN_LABEL) -> Any:
+    """
+    Decode a NumPy code column into enum id labels.
+
+    Args:
+        table: EnumTable (see build_enum_tables)
+        codes: NumPy integer array, e.g. a column from compile_batch_decoder
+        unknown: Label for undefined codes
+
+    Returns:
+        NumPy string array of labels
+    """
+    return table.decode(codes, unknown)
+
+
+def decode_enum_columns(header: "KsyHeader", columns: Dict[str, Any],
+                        unknown: str = UNKNOWN_LABEL) -> Dict[str, Any]:
+    """
+    Label every enum-typed column of a batch-decoded header.
+
+    Args:
+        header: KsyHeader whose fields carry enum types
+        columns: Field name -> code array (from compile_batch_decoder)
+        unknown: Label for undefined codes
+
+    Returns:
+        Field name -> label array for fields with an enum type
+    """
+    tables = build_enum_tables(header)
+    return {
+        f.name: tables[f.enum_type].decode(columns[f.name], unknown)
+        for f in header.fields
+        if f.enum_type in tables and f.name in columns
+    }
@@ -0,0 +1,324 @@
+"""
+KSY State Machine Executor - Run StateMachine definitions over event streams.
+
+Provides utilities for:
+- Compiling a StateMachine into integer-coded states and triggers with a
+  flat (state, trigger) -> next-state table
+- Evaluating transition conditions through compiled, cached predicates
+- Stepping single events and replaying whole event streams with a report
+  of illegal transitions
+
+Deterministic, unconditional transitions resolve with one list index per
+event; only (state, trigger) pairs with conditions or several candidate
+transitions fall back to a per-pair candidate list. Transitions whose
+from_state is '*' apply to every state; a to_state must be a declared
+state.
+
+Conditions are compiled with utilities.ksy_parser.expressions against the
+context mapping passed to step()/run(). "true" and empty conditions always
+hold; conditions that are not expressions (prose such as "credits
+available") cannot be evaluated and are treated as satisfied, or raise when
+compiled with strict=True. They are listed in 'opaque_conditions'.
+Evaluating an expression condition whose variables are missing from the
+context raises ExpressionError naming the variable.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from utilities.ksy_parser.expressions import ExpressionError, compile_expression
+from utilities.ksy_parser.state_machine import StateMachine, Transition
+
+
+NO_TRANSITION = -1
+CONDITIONAL = -2
+WILDCARD_STATE = '*'
+
+
+class IllegalTransition(ValueError):
+    """Raised when no transition accepts an event in the current state."""
+
+    def __init__(self, state: str, trigger: str):
+        super().__init__(f"No transition from '{state}' on '{trigger}'")
+        self.state = state
+        self.trigger = trigger
+
+
+@dataclass
+class ReplayResult:
+    """Outcome of replaying an event stream."""
+    final_state: str
+    steps: int
+    illegal: List[Tuple[int, str, str]] = field(default_factory=list)  # (index, state, trigger)
+
+    @property
+    def ok(self) -> bool:
+        """True when every event was accepted."""
+        return not self.illegal
+
+
+def _always(context: Optional[Mapping[str, Any]]) -> bool:
+    return True
+
+
+def _check_targets(sm: StateMachine) -> None:
+    declared = {s.name for s in sm.states}
+    for t in sm.transitions:
+        if not t.to_state or t.to_state == WILDCARD_STATE or (declared and t.to_state not in declared):
+            raise ValueError(f"Transition {t.from_state} --[{t.trigger}]--> {t.to_state!r} of "
+                             f"'{sm.name}' does not target a declared state")
+
+
+class StateMachineExecutor:
+    """Integer-coded transition tables for one StateMachine.
+
+    Usage:
+        executor = compile_state_machine(sm)
+        state = executor.step('DISABLED', 'start')
+        result = executor.run(['start', 'ready', 'remove'])
+    """
+
+    def __init__(self, sm: StateMachine, strict: bool = False):
+        self.name = sm.name
+        self.initial_state = sm.initial_state
+        _check_targets(sm)
+
+        self.states: List[str] = []
+        self.state_index: Dict[str, int] = {}
+        for name in [s.name for s in sm.states] + [sm.initial_state] + \
+                [n for t in sm.transitions for n in (t.from_state, t.to_state)]:
+            if name != WILDCARD_STATE and name not in self.state_index:
+                self.state_index[name] = len(self.states)
+                self.states.append(name)
+        terminal = {s.name for s in sm.states if s.is_terminal}
+        self.terminal = [name in terminal for name in self.states]
+
+        self.triggers: List[str] = []
+        self.trigger_index: Dict[str, int] = {}
+        for t in sm.transitions:
+            if t.trigger not in self.trigger_index:
+                self.trigger_index[t.trigger] = len(self.triggers)
+                self.triggers.append(t.trigger)
+
+        self.opaque_conditions: List[str] = []
+        self._predicates: Dict[str, Callable] = {}
+
+        # (state, trigger) -> candidate (to_state, predicate, transition index)
+        candidates: Dict[Tuple[int, int], List[Tuple[int, Callable, int]]] = {}
+        for i, t in enumerate(sm.transitions):
+            sources = range(len(self.states)) if t.from_state == WILDCARD_STATE \
+                else [self.state_index[t.from_state]]
+            predicate = self._compile_condition(t.condition, strict)
+            for s in sources:
+                key = (s, self.trigger_index[t.trigger])
+                candidates.setdefault(key, []).append((self.state_index[t.to_state], predicate, i))
+
+        width = len(self.triggers)
+        self._width = width
+        self.next_state: List[int] = [NO_TRANSITION] * (len(self.states) * width)
+        self._candidates: Dict[int, Tuple[Tuple[int, Callable, int], ...]] = {}
+        for (s, trig), options in candidates.items():
+            slot = s * width + trig
+            if len(options) == 1 and options[0][1] is _always:
+                self.next_state[slot] = options[0][0]
+            else:
+                self.next_state[slot] = CONDITIONAL
+                self._candidates[slot] = tuple(options)
+
+        self.transitions = list(sm.transitions)
+
+    def _compile_condition(self, condition: Optional[str], strict: bool) -> Callable:
+        text = str(condition).strip() if condition is not None else ''
+        if not text or text.lower() == 'true':
+            return _always
+        if text in self._predicates:
+            return self._predicates[text]
+        try:
+            func = compile_expression(text)
+        except ExpressionError:
+            if strict:
+                raise
+            self.opaque_conditions.append(text)
+            predicate = _always
+        else:
+            def predicate(context, func=func, text=text):
+                try:
+                    return bool(func(context or {}))
+                except KeyError as e:
+                    raise ExpressionError(f"Condition {text!r} needs variable {e.args[0]!r}, "
+                                          f"which is missing from the context") from None
+        self._predicates[text] = predicate
+        return predicate
+
+    def encode_triggers(self, triggers: Iterable[str]) -> List[int]:
+        """Map trigger names to codes; unknown triggers become -1."""
+        index = self.trigger_index
+        return [index.get(t, -1) for t in triggers]
+
+    def next_code(self, state: int, trigger: int,
+                  context: Optional[Mapping[str, Any]] = None) -> int:
+        """
+        Return the next state code, or NO_TRANSITION.
+
+        Args:
+            state: Current state code
+            trigger: Trigger code (-1 for unknown triggers)
+            context: Variables for transition conditions
+
+        Returns:
+            Next state code or NO_TRANSITION
+        """
+        if trigger < 0:
+            return NO_TRANSITION
+        slot = state * self._width + trigger
+        nxt = self.next_state[slot]
+        if nxt != CONDITIONAL:
+            return nxt
+        for to_state, predicate, _ in self._candidates[slot]:
+            if predicate(context):
+                return to_state
+        return NO_TRANSITION
+
+    def step(self, state: str, trigger: str, context: Optional[Mapping[str, Any]] = None) -> str:
+        """
+        Apply one event.
+
+        Args:
+            state: Current state name
+            trigger: Event/trigger name
+            context: Variables for transition conditions
+
+        Returns:
+            Next state name
+
+        Raises:
+            KeyError: If state is not a state of the machine
+            IllegalTransition: If no transition accepts the event
+            ExpressionError: If a condition needs a variable missing from
+                context
+        """
+        nxt = self.next_code(self.state_index[state], self.trigger_index.get(trigger, -1), context)
+        if nxt < 0:
+            raise IllegalTransition(state, trigger)
+        return self.states[nxt]
+
+    def run(self, events: Iterable[Any], state: Optional[str] = None,
+            context: Optional[Mapping[str, Any]] = None, strict: bool = False) -> ReplayResult:
+        """
+        Replay an event stream from a state.
+
+        Events are trigger names, or (trigger, context) pairs to give each
+        event its own condition variables. Illegal events are recorded and
+        leave the state unchanged.
+
+        Args:
+            events: Iterable of triggers or (trigger, context) pairs
+            state: Start state (defaults to the initial state)
+            context: Condition variables shared by all events
+            strict: Raise IllegalTransition on the first illegal event
+
+        Returns:
+            ReplayResult
+
+        Raises:
+            ExpressionError: If a condition needs a variable missing from
+                the event's context
+        """
+        current = self.state_index[state or self.initial_state]
+        trigger_index = self.trigger_index
+        next_state = self.next_state
+        width = self._width
+        illegal: List[Tuple[int, str, str]] = []
+        steps = 0
+
+        for index, event in enumerate(events):
+            if isinstance(event, tuple):
+                trigger, event_context = event
+            else:
+                trigger, event_context = event, context
+            code = trigger_index.get(trigger, -1)
+            nxt = next_state[current * width + code] if code >= 0 else NO_TRANSITION
+            if nxt == CONDITIONAL:
+                nxt = self.next_code(current, code, event_context)
+            if nxt < 0:
+                if strict:
+                    raise IllegalTransition(self.states[current], trigger)
+                illegal.append((index, self.states[current], trigger))
+            else:
+                current = nxt
+            steps += 1
+
+        return ReplayResult(self.states[current], steps, illegal)
+
+    def run_codes(self, codes: Iterable[int], state: Optional[int] = None,
+                  context: Optional[Mapping[str, Any]] = None) -> Tuple[int, List[int]]:
+        """
+        Replay pre-encoded trigger codes (see encode_triggers).
+
+        Fast path for large logs: no per-event name lookups or tuples.
+
+        Args:
+            codes: Trigger codes
+            state: Start state code (defaults to the initial state)
+            context: Condition variables shared by all events
+
+        Returns:
+            (final state code, indices of illegal events)
+        """
+        current = self.state_index[self.initial_state] if state is None else state
+        next_state = self.next_state
+        width = self._width
+        illegal: List[int] = []
+        for index, code in enumerate(codes):
+            nxt = next_state[current * width + code] if code >= 0 else NO_TRANSITION
+            if nxt == CONDITIONAL:
+                nxt = self.next_code(current, code, context)
+            if nxt < 0:
+                illegal.append(index)
+            else:
+                current = nxt
+        return current, illegal
+
+    def as_array(self):
+        """
+        Return the transition table as an (states, triggers) int32 NumPy array.
+
+        Entries are next-state codes, NO_TRANSITION, or CONDITIONAL for pairs
+        that need next_code().
+        """
+        from utilities.ksy_parser.batch import require_numpy
+        np = require_numpy()
+        return np.asarray(self.next_state, dtype=np.int32).reshape(len(self.states), self._width)
+
+    def transitions_from(self, state: str, trigger: str) -> List[Transition]:
+        """Return the candidate transitions for a (state, trigger) pair."""
+        s, trig = self.state_index[state], self.trigger_index.get(trigger, -1)
+        if trig < 0:
+            return []
+        slot = s * self._width + trig
+        if slot in self._candidates:
+            return [self.transitions[i] for _, _, i in self._candidates[slot]]
+        nxt = self.next_state[slot]
+        if nxt < 0:
+            return []
+        return [t for t in self.transitions
+                if t.trigger == trigger and t.to_state == self.states[nxt]
+                and t.from_state in (state, WILDCARD_STATE)][:1]
+
+
+def compile_state_machine(sm: StateMachine, strict: bool = False) -> StateMachineExecutor:
+    """
+    Compile a StateMachine into an executor.
+
+    Args:
+        sm: StateMachine from extract_state_machine
+        strict: Raise ExpressionError on conditions that are not expressions
+
+    Returns:
+        StateMachineExecutor
+
+    Raises:
+        ValueError: If a transition targets '*', no state, or a state that is
+            not declared (when the machine declares any states)
+    """
+    return StateMachineExecutor(sm, strict)
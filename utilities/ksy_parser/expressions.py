@@ -0,0 +1,319 @@
+"""
+KSY Expressions - Compile Kaitai instance expressions into Python closures.
+
+Provides utilities for:
+- Tokenizing and parsing the Kaitai expression subset used by the datamodel: integer and
+  boolean literals, field/instance references, enum references
+  (enum_name::id), arithmetic, bit operations, comparisons, and/or/not and
+  the ternary operator
+- Compiling an expression once into a Python function over a decoded
+  record (scalar mode) or over columns of decoded records (NumPy mode)
+- Evaluating all of a header's instances in dependency order
+
+Expressions are translated to Python source and compiled once; the
+translation is cached by expression text, so headers sharing an
+expression share the compiled code. Integer division follows Kaitai
+semantics ('/' on integers is floor division).
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from utilities.ksy_parser.parser import KsyHeader
+
+
+class ExpressionError(ValueError):
+    """Raised when an expression is malformed or outside the supported subset."""
+
+
+_TOKEN_RE = re.compile(r"""
+    \s*(?:
+      (?P<num>0[xX][0-9a-fA-F_]+|0[bB][01_]+|0[oO][0-7_]+|\d[\d_]*(?:\.\d+)?)
+    | (?P<name>[A-Za-z_][A-Za-z0-9_]*(?:::[A-Za-z_][A-Za-z0-9_]*)?)
+    | (?P<op><<|>>|<=|>=|==|!=|[-+*/%&|^~<>?:()])
+    )""", re.VERBOSE)
+
+_BINARY = {
+    'or': 2, 'and': 3,
+    '==': 5, '!=': 5, '<': 5, '<=': 5, '>': 5, '>=': 5,
+    '|': 6, '^': 7, '&': 8, '<<': 9, '>>': 9,
+    '+': 10, '-': 10, '*': 11, '/': 11, '%': 11,
+}
+_TERNARY_BP = 1
+_NOT_BP = 4
+_UNARY_BP = 12
+
+
+def tokenize(expr: str) -> List[Tuple[str, str]]:
+    """
+    Split an expression into (kind, text) tokens.
+
+    Args:
+        expr: Kaitai expression text
+
+    Returns:
+        Tokens of kind 'num', 'name' or 'op', followed by an ('end', '') token
+
+    Raises:
+        ExpressionError: If the text contains unsupported syntax
+    """
+    tokens = []
+    pos = 0
+    text = expr.strip()
+    while pos < len(text):
+        match = _TOKEN_RE.match(text, pos)
+        if not match or match.end() == pos:
+            raise ExpressionError(f"Unsupported syntax at {text[pos:pos + 20]!r} in {expr!r}")
+        pos = match.end()
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+    tokens.append(('end', ''))
+    return tokens
+
+
+class _Parser:
+    """Pratt parser producing a small tuple AST."""
+
+    def __init__(self, expr: str):
+        self.expr = expr
+        self.tokens = tokenize(expr)
+        self.pos = 0
+
+    def peek(self) -> Tuple[str, str]:
+        return self.tokens[self.pos]
+
+    def advance(self) -> Tuple[str, str]:
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def expect(self, value: str) -> None:
+        kind, text = self.advance()
+        if text != value:
+            raise ExpressionError(f"Expected {value!r}, found {text or 'end'!r} in {self.expr!r}")
+
+    def parse(self):
+        node = self.expression(0)
+        if self.peek()[0] != 'end':
+            raise ExpressionError(f"Unexpected {self.peek()[1]!r} in {self.expr!r}")
+        return node
+
+    def expression(self, min_bp: int):
+        left = self.prefix()
+        while True:
+            kind, text = self.peek()
+            if text == '?' and _TERNARY_BP >= min_bp:
+                self.advance()
+                if_true = self.expression(0)
+                self.expect(':')
+                if_false = self.expression(_TERNARY_BP)
+                left = ('cond', left, if_true, if_false)
+                continue
+            bp = _BINARY.get(text) if kind in ('op', 'name') else None
+            if bp is None or bp <= min_bp:
+                return left
+            self.advance()
+            right = self.expression(bp)
+            if text in ('and', 'or'):
+                left = (text, left, right)
+            elif bp == 5:
+                left = ('cmp', text, left, right)
+            else:
+                left = ('bin', text, left, right)
+
+    def prefix(self):
+        kind, text = self.advance()
+        if kind == 'num':
+            literal = text.replace('_', '')
+            return ('num', float(literal) if '.' in literal else int(literal, 0))
+        if kind == 'name':
+            if text in ('true', 'false'):
+                return ('num', text == 'true')
+            if text == 'not':
+                return ('not', self.expression(_NOT_BP))
+            if text in _BINARY:
+                raise ExpressionError(f"Unexpected {text!r} in {self.expr!r}")
+            if '::' in text:
+                enum_name, enum_id = text.split('::')
+                return ('enum', enum_name, enum_id)
+            if text.startswith('_'):
+                raise ExpressionError(f"Unsupported reference {text!r} in {self.expr!r}")
+            return ('name', text)
+        if text == '(':
+            node = self.expression(0)
+            self.expect(')')
+            return node
+        if text in ('-', '~', '+'):
+            operand = self.expression(_UNARY_BP)
+            return operand if text == '+' else ('unary', text, operand)
+        raise ExpressionError(f"Unexpected {text or 'end'!r} in {self.expr!r}")
+
+
+def _emit(node, vectorized: bool, names: Dict[str, str], enum_refs: Dict[Tuple[str, str], str]) -> str:
+    """Emit Python source for an AST node."""
+    kind = node[0]
+    if kind == 'num':
+        return repr(node[1])
+    if kind == 'name':
+        return names.setdefault(node[1], f"v{len(names)}")
+    if kind == 'enum':
+        return enum_refs.setdefault((node[1], node[2]), f"_enum{len(enum_refs)}")
+    if kind == 'unary':
+        return f"({node[1]}{_emit(node[2], vectorized, names, enum_refs)})"
+
+    args = [_emit(child, vectorized, names, enum_refs) for child in node[1:] if isinstance(child, tuple)]
+    if kind == 'bin':
+        op = '//' if node[1] == '/' else node[1]
+        return f"({args[0]} {op} {args[1]})"
+    if kind == 'cmp':
+        return f"({args[0]} {node[1]} {args[1]})"
+    if kind == 'not':
+        return f"_np.logical_not({args[0]})" if vectorized else f"(not {args[0]})"
+    if kind in ('and', 'or'):
+        if vectorized:
+            return f"_np.logical_{kind}({args[0]}, {args[1]})"
+        return f"({args[0]} {kind} {args[1]})"
+    if kind == 'cond':
+        if vectorized:
+            return f"_np.where({args[0]}, {args[1]}, {args[2]})"
+        return f"({args[1]} if {args[0]} else {args[2]})"
+    raise ExpressionError(f"Unknown node {kind!r}")  # pragma: no cover
+
+
+@lru_cache(maxsize=4096)
+def _translate(expr: str, vectorized: bool):
+    """Translate an expression to a compiled function body (cached by text)."""
+    tree = _Parser(expr).parse()
+    names: Dict[str, str] = {}
+    enum_refs: Dict[Tuple[str, str], str] = {}
+    body = _emit(tree, vectorized, names, enum_refs)
+
+    load = "_widen(r[{!r}])" if vectorized else "r[{!r}]"
+    lines = ["def _expr(r):"]
+    lines.extend(f"    {local} = {load.format(name)}" for name, local in names.items())
+    lines.append(f"    return {body}")
+    source = "\n".join(lines) + "\n"
+    return compile(source, f"<ksy expr {expr!r}>", 'exec'), tuple(names), tuple(enum_refs.items()), source
+
+
+def _widen(values):
+    """Promote narrow integer NumPy columns so shifts and sums do not overflow."""
+    dtype = getattr(values, 'dtype', None)
+    if dtype is not None and dtype.kind in 'ui' and dtype.itemsize < 8:
+        return values.astype('int64')
+    return values
+
+
+def compile_expression(expr: str, enums: Optional[Mapping[str, Mapping[str, int]]] = None,
+                       vectorized: bool = False) -> Callable[[Mapping[str, Any]], Any]:
+    """
+    Compile a Kaitai expression into a function of a decoded record.
+
+    Args:
+        expr: Kaitai expression text, e.g. "(flags >> 3) & 0x1F"
+        enums: Enum id lookups ({enum_name: {id: value}}) for enum_name::id
+            references; see encoder.enum_name_maps
+        vectorized: Compile for NumPy columns instead of scalar values
+            (and/or/not become logical_*, ternaries become where)
+
+    Returns:
+        Callable taking a mapping of name to value (or column) and
+        returning the expression result. Its 'names' attribute lists the
+        referenced field/instance names.
+
+    Raises:
+        ExpressionError: If the expression is malformed, uses unsupported
+            syntax, or references an unknown enum value
+    """
+    code, names, enum_refs, source = _translate(' '.join(str(expr).split()), vectorized)
+
+    namespace: Dict[str, Any] = {'_widen': _widen}
+    if vectorized:
+        from utilities.ksy_parser.batch import require_numpy
+        namespace['_np'] = require_numpy()
+    for (enum_name, enum_id), local in enum_refs:
+        try:
+            namespace[local] = (enums or {})[enum_name][enum_id]
+        except KeyError:
+            raise ExpressionError(f"Unknown enum reference {enum_name}::{enum_id} in {expr!r}") from None
+
+    exec(code, namespace)
+    func = namespace['_expr']
+    func.names = names
+    func.source = source
+    return func
+
+
+def compile_instances(header: "KsyHeader", vectorized: bool = False,
+                      strict: bool = True) -> Callable[[Mapping[str, Any]], Dict[str, Any]]:
+    """
+    Compile all instances of a header into one evaluator.
+
+    Instances may reference fields and other instances; they are evaluated
+    in dependency order. The returned callable takes a decoded record (a
+    dict from compile_decoder, or a dict of columns from
+    compile_batch_decoder when vectorized) and returns a dict of instance
+    name to value.
+
+    Args:
+        header: KsyHeader with instances
+        vectorized: Compile for NumPy columns
+        strict: Raise on instances that cannot be compiled; when False they
+            are skipped and reported in the evaluator's 'errors' attribute
+
+    Returns:
+        Instance evaluator callable
+
+    Raises:
+        ExpressionError: On unsupported expressions (strict) or dependency
+            cycles between instances
+    """
+    from utilities.ksy_parser.encoder import enum_name_maps
+
+    enums = enum_name_maps(header)
+    compiled: Dict[str, Callable] = {}
+    errors: Dict[str, str] = {}
+    for instance in header.instances or []:
+        try:
+            compiled[instance.name] = compile_expression(instance.value, enums, vectorized)
+        except ExpressionError as e:
+            if strict:
+                raise
+            errors[instance.name] = str(e)
+
+    order = _dependency_order(compiled)
+    steps = [(name, compiled[name]) for name in order]
+
+    def evaluate(record: Mapping[str, Any]) -> Dict[str, Any]:
+        env = dict(record)
+        for name, func in steps:
+            env[name] = func(env)
+        return {name: env[name] for name, _ in steps}
+
+    evaluate.order = order
+    evaluate.errors = errors
+    return evaluate
+
+
+def _dependency_order(compiled: Mapping[str, Callable]) -> List[str]:
+    """Topologically order instances so dependencies are evaluated first."""
+    order: List[str] = []
+    state: Dict[str, int] = {}
+
+    def visit(name: str, path: Tuple[str, ...]) -> None:
+        if state.get(name) == 2:
+            return
+        if state.get(name) == 1:
+            raise ExpressionError(f"Instance dependency cycle: {' -> '.join(path + (name,))}")
+        state[name] = 1
+        for dep in compiled[name].names:
+            if dep in compiled:
+                visit(dep, path + (name,))
+        state[name] = 2
+        order.append(name)
+
+    for name in compiled:
+        visit(name, ())
+    return order
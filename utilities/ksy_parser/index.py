@@ -0,0 +1,174 @@
+"""
+KSY Datamodel Index - Cross-header lookups over a parsed datamodel.
+
+Provides utilities for:
+- Finding the headers that contain a field or use an enum
+- Finding fields (and headers) citing a spec table/section/figure,
+  including prefix queries such as every field under "Section 3.5"
+- Finding headers whose x-protocol.related_messages reference a format
+
+All lookups are dict hits built once at index time; prefix citation
+queries bisect a sorted key list.
+"""
+
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from utilities.ksy_parser.parser import KsyHeader, KsyField
+
+
+_CITATION_RE = re.compile(
+    r'\b(table|section|figure|clause)s?\s+'
+    r'([0-9A-Z][\w.\-]*(?:\s*(?:,|and|&)\s*[0-9][\w.\-]*)*)',
+    re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True, eq=False)
+class FieldRef:
+    """A field located within a specific header."""
+    header_id: str
+    field: "KsyField"
+
+
+def normalize_citation(text: str) -> List[str]:
+    """
+    Split a spec reference into normalized citation keys.
+
+    "Table 5-20, Lane 1; Tables 5-23, 5-24" yields
+    ['table 5-20', 'table 5-23', 'table 5-24']. Text without a recognizable
+    table/section/figure/clause citation is returned lower-cased as one key.
+
+    Args:
+        text: Spec reference string
+
+    Returns:
+        List of normalized citation keys
+    """
+    keys = []
+    for match in _CITATION_RE.finditer(text):
+        kind = match.group(1).lower()
+        for number in re.split(r'\s*(?:,|and|&)\s*', match.group(2)):
+            number = number.strip().rstrip('.')
+            if number:
+                keys.append(f"{kind} {number}")
+    if not keys and text.strip():
+        keys.append(text.strip().lower())
+    return keys
+
+
+class DatamodelIndex:
+    """Inverted indexes over a set of parsed KsyHeader objects."""
+
+    def __init__(self, headers: Union[Mapping[str, "KsyHeader"], Iterable["KsyHeader"]]):
+        if isinstance(headers, Mapping):
+            self.headers: Dict[str, "KsyHeader"] = dict(headers)
+        else:
+            self.headers = {h.id: h for h in headers}
+
+        self._fields: Dict[str, List[FieldRef]] = defaultdict(list)
+        self._enum_users: Dict[str, List[str]] = defaultdict(list)
+        self._enum_definers: Dict[str, List[str]] = defaultdict(list)
+        self._field_citations: Dict[str, List[FieldRef]] = defaultdict(list)
+        self._header_citations: Dict[str, List[str]] = defaultdict(list)
+        self._related: Dict[str, List[str]] = defaultdict(list)
+
+        for header_id, header in self.headers.items():
+            self._add_header(header_id, header)
+
+        self._citation_keys = sorted(self._field_citations)
+        self._header_citation_keys = sorted(self._header_citations)
+
+    def _add_header(self, header_id: str, header: "KsyHeader") -> None:
+        used_enums = set()
+        for field in header.fields:
+            ref = FieldRef(header_id, field)
+            self._fields[field.name].append(ref)
+            if field.enum_type and field.enum_type not in used_enums:
+                used_enums.add(field.enum_type)
+                self._enum_users[field.enum_type].append(header_id)
+            if field.x_spec_ref:
+                for key in set(normalize_citation(str(field.x_spec_ref))):
+                    self._field_citations[key].append(ref)
+
+        for enum_name in (header.enums or {}):
+            self._enum_definers[enum_name].append(header_id)
+
+        if header.x_spec:
+            keys = set()
+            for part in ('table', 'section', 'figure'):
+                if header.x_spec.get(part):
+                    keys.update(normalize_citation(str(header.x_spec[part])))
+            for key in keys:
+                self._header_citations[key].append(header_id)
+
+        related = (header.x_protocol or {}).get('related_messages') or []
+        seen = set()
+        for msg in related:
+            name = str(msg.get('name', '') if isinstance(msg, dict) else msg).strip().lower()
+            if name and name not in seen:
+                seen.add(name)
+                self._related[name].append(header_id)
+
+    def headers_with_field(self, field_name: str) -> List[str]:
+        """Return ids of headers containing a field with this name."""
+        seen = dict.fromkeys(ref.header_id for ref in self._fields.get(field_name, ()))
+        return list(seen)
+
+    def field_refs(self, field_name: str) -> List[FieldRef]:
+        """Return every (header, field) occurrence of a field name."""
+        return list(self._fields.get(field_name, ()))
+
+    def headers_using_enum(self, enum_name: str) -> List[str]:
+        """Return ids of headers with at least one field typed by this enum."""
+        return list(self._enum_users.get(enum_name, ()))
+
+    def headers_defining_enum(self, enum_name: str) -> List[str]:
+        """Return ids of headers whose enums section defines this enum."""
+        return list(self._enum_definers.get(enum_name, ()))
+
+    def fields_citing(self, reference: str, prefix: bool = False) -> List[FieldRef]:
+        """
+        Return fields whose x-spec-ref cites a spec table/section/figure.
+
+        Args:
+            reference: Citation such as "Table 5-21" or "Section 3.5.8"
+            prefix: Also match sub-sections ("Section 3.5" matches
+                "Section 3.5.8")
+
+        Returns:
+            List of FieldRef objects
+        """
+        return self._lookup_citation(self._field_citations, self._citation_keys, reference, prefix)
+
+    def headers_citing(self, reference: str, prefix: bool = False) -> List[str]:
+        """Return ids of headers whose x-spec table/section/figure cites reference."""
+        return self._lookup_citation(self._header_citations, self._header_citation_keys,
+                                     reference, prefix)
+
+    def headers_related_to(self, message_name: str) -> List[str]:
+        """Return ids of headers listing message_name in x-protocol.related_messages."""
+        return list(self._related.get(message_name.strip().lower(), ()))
+
+    @staticmethod
+    def _lookup_citation(table: Dict[str, list], sorted_keys: List[str],
+                         reference: str, prefix: bool) -> list:
+        results = []
+        for key in normalize_citation(reference):
+            if not prefix:
+                results.extend(table.get(key, ()))
+                continue
+            # Sub-sections share the key followed by '.' or '-'
+            for i in range(bisect_left(sorted_keys, key), len(sorted_keys)):
+                candidate = sorted_keys[i]
+                if not candidate.startswith(key):
+                    break
+                if len(candidate) == len(key) or candidate[len(key)] in '.-':
+                    results.extend(table[candidate])
+        # FieldRef objects are shared between keys, so dedupe them by identity
+        unique = {item if isinstance(item, str) else id(item): item for item in results}
+        return list(unique.values())
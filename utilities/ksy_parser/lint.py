@@ -0,0 +1,207 @@
+"""
+KSY Datamodel Lint - Consistency checks across every header of a datamodel.
+
+Provides utilities for:
+- Per-header checks: declared x-packet size vs the field layout, fields
+  referencing undefined enums, zero-size fields, duplicate field ids and
+  state machine transitions referencing undefined states
+- Linting a whole datamodel directory across a process pool, including
+  cross-file duplicate header ids
+- Machine-readable results (plain dicts / JSON) for CI
+
+Rules and severities:
+- size-mismatch (error): x-packet size_bytes/size_bits disagree with the
+  summed field sizes; a layout longer than the declared size overlaps
+  whatever follows the header
+- undefined-enum (error): a field's enum is not defined in enums
+- zero-size-field (error): a field whose size could not be determined
+  (unknown type, or a size expression) occupies no bits, shifting every
+  later offset; a trailing variable-size field is only a warning
+- duplicate-field (error): two seq entries share an id
+- undefined-state (error): a transition or the initial state names a state
+  that is not declared
+- parse-error / duplicate-id (error): the file could not be used
+"""
+
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from utilities.ksy_parser.parser import KsyHeader
+
+from utilities.ksy_parser.tree import discover_ksy_files, map_files
+
+
+ERROR = 'error'
+WARNING = 'warning'
+
+
+@dataclass
+class LintIssue:
+    """One lint finding."""
+    rule: str
+    severity: str
+    message: str
+    path: Optional[str] = None
+    header_id: Optional[str] = None
+    field_name: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the issue as a JSON-serializable dict."""
+        return asdict(self)
+
+    def format(self) -> str:
+        """Return a one-line 'path: [header.field] severity rule: message' string."""
+        where = self.header_id or ''
+        if self.field_name:
+            where = f"{where}.{self.field_name}"
+        prefix = f"{self.path}: " if self.path else ''
+        return f"{prefix}{where + ' ' if where else ''}{self.severity} {self.rule}: {self.message}"
+
+
+@dataclass
+class LintResult:
+    """Lint findings for a datamodel."""
+    issues: List[LintIssue] = field(default_factory=list)
+    files: int = 0
+
+    @property
+    def errors(self) -> List[LintIssue]:
+        """Issues with error severity."""
+        return [i for i in self.issues if i.severity == ERROR]
+
+    @property
+    def ok(self) -> bool:
+        """True when no error-severity issues were found."""
+        return not self.errors
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the result as a JSON-serializable dict."""
+        counts: Dict[str, int] = {}
+        for issue in self.issues:
+            counts[issue.rule] = counts.get(issue.rule, 0) + 1
+        return {
+            'files': self.files,
+            'errors': len(self.errors),
+            'warnings': len(self.issues) - len(self.errors),
+            'rules': counts,
+            'issues': [i.to_dict() for i in self.issues],
+        }
+
+
+def _field_defs(header: "KsyHeader") -> List[Dict[str, Any]]:
+    data = header.load_raw_data() or {}
+    return [d for d in data.get('seq', []) if isinstance(d, dict)]
+
+
+def _zero_size_reason(field_def: Optional[Dict[str, Any]], type_str: str) -> str:
+    if field_def is not None and 'size' in field_def:
+        return f"size {field_def['size']!r} is not a constant"
+    if not type_str:
+        return "no type or size given"
+    return f"unknown type '{type_str}'"
+
+
+def lint_header(header: "KsyHeader") -> List[LintIssue]:
+    """
+    Run every per-header rule.
+
+    Args:
+        header: Parsed KsyHeader
+
+    Returns:
+        List of LintIssue (path and header_id filled in)
+    """
+    from utilities.ksy_parser.state_machine import extract_state_machine
+    from utilities.ksy_parser.state_graph import undefined_states
+
+    issues: List[LintIssue] = []
+
+    def add(rule: str, message: str, field_name: Optional[str] = None, severity: str = ERROR) -> None:
+        issues.append(LintIssue(rule, severity, message, header.source_path, header.id, field_name))
+
+    total_bits = sum(f.size_bits for f in header.fields)
+    layout_bytes = (total_bits + 7) // 8
+    x_packet = header.x_packet or {}
+    declared_bytes = x_packet.get('size_bytes')
+    if isinstance(declared_bytes, int) and declared_bytes != layout_bytes:
+        add('size-mismatch', f"x-packet size_bytes is {declared_bytes} but fields span "
+                             f"{total_bits} bits ({layout_bytes} bytes)")
+    declared_bits = x_packet.get('size_bits')
+    if isinstance(declared_bits, int) and declared_bits != total_bits:
+        add('size-mismatch', f"x-packet size_bits is {declared_bits} but fields sum to {total_bits} bits")
+
+    enums = header.enums or {}
+    for f in header.fields:
+        if f.enum_type and f.enum_type not in enums:
+            add('undefined-enum', f"enum '{f.enum_type}' is not defined", f.name)
+
+    zero = [i for i, f in enumerate(header.fields) if f.size_bits <= 0]
+    if zero:
+        defs = _field_defs(header)
+        for i in zero:
+            f = header.fields[i]
+            reason = _zero_size_reason(defs[i] if i < len(defs) else None, f.type_str)
+            if i == len(header.fields) - 1:
+                add('zero-size-field', f"trailing field has no fixed size ({reason})", f.name, WARNING)
+            else:
+                add('zero-size-field', f"field has no fixed size ({reason}); "
+                                       f"offsets of the {len(header.fields) - 1 - i} later fields are wrong",
+                    f.name)
+
+    seen = set()
+    for f in header.fields:
+        if f.name in seen:
+            add('duplicate-field', f"field id '{f.name}' appears more than once", f.name)
+        seen.add(f.name)
+
+    sm = extract_state_machine(header.x_protocol) if header.x_protocol else None
+    if sm is not None:
+        for name in undefined_states(sm):
+            add('undefined-state', f"state machine '{sm.name}' references undeclared state '{name}'")
+    return issues
+
+
+def _lint_one(args: Tuple[str, Optional[str]]):
+    """Worker: parse and lint one file, returning (path, header_id, issues)."""
+    path, cache_dir = args
+    from utilities.ksy_parser.parser import KsyParser
+    try:
+        header = KsyParser(cache_dir=cache_dir).parse(path)
+    except Exception as e:
+        return path, None, [LintIssue('parse-error', ERROR, f"{type(e).__name__}: {e}", path)]
+    issues = lint_header(header)
+    return path, header.id or Path(path).stem, issues
+
+
+def lint_tree(root: Union[str, Path], workers: Optional[int] = None,
+              cache_dir: Optional[str] = None) -> LintResult:
+    """
+    Lint every .ksy file under a directory, optionally in parallel.
+
+    Args:
+        root: Datamodel directory (or a single .ksy file)
+        workers: Worker processes; None uses os.cpu_count(), 1 lints
+            serially in the calling process
+        cache_dir: Optional parse cache directory shared by all workers
+
+    Returns:
+        LintResult with issues in path order
+    """
+    jobs = [(str(p), cache_dir) for p in discover_ksy_files(root)]
+    outcomes = map_files(_lint_one, jobs, workers)
+
+    result = LintResult(files=len(jobs))
+    first_path: Dict[str, str] = {}
+    for path, header_id, issues in outcomes:
+        result.issues.extend(issues)
+        if header_id is None:
+            continue
+        if header_id in first_path:
+            result.issues.append(LintIssue('duplicate-id', ERROR,
+                                           f"header id also defined in {first_path[header_id]}",
+                                           path, header_id))
+        else:
+            first_path[header_id] = path
+    return result
@@ -11,9 +11,12 @@ Parses .ksy YAML files and extracts field definitions including:
 - Instance (computed) fields
 """
 
+import os
+import sys
 from dataclasses import dataclass, field
 from typing import List, Optional, Dict, Any
-import yaml
+
+from utilities.yaml_loader import safe_load
 
 
 TYPE_SIZES = {
@@ -22,9 +25,21 @@ TYPE_SIZES = {
 }
 
 
-@dataclass
+def split_type_endian(type_str: str):
+    """Split an explicit endian suffix ('u2le', 'b12be') off a KSY type."""
+    for suffix in ('le', 'be'):
+        if type_str.endswith(suffix) and len(type_str) > 2:
+            return type_str[:-2], suffix
+    return type_str, None
+
+
+@dataclass(slots=True)
 class KsyField:
-    """Represents a field in a KSY sequence."""
+    """Represents a field in a KSY sequence.
+    
+    Slotted to keep whole-datamodel loads compact; name, type_str and
+    enum_type are interned by the parser.
+    """
     name: str
     type_str: str
     size_bits: int
@@ -36,7 +51,7 @@ class KsyField:
     enum_type: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class KsyInstance:
     """Represents a computed/derived field in KSY instances."""
     name: str
@@ -59,19 +74,137 @@ class KsyHeader:
     enums: Optional[Dict[str, Dict]] = None
     instances: Optional[List[KsyInstance]] = None
     raw_data: Optional[Dict[str, Any]] = None
+    endian: str = 'be'
+    bit_endian: str = 'be'
+    source_path: Optional[str] = None
+    
+    def load_raw_data(self, retain: bool = False) -> Optional[Dict[str, Any]]:
+        """Return raw_data, re-reading it from source_path if it was dropped.
+        
+        Args:
+            retain: Keep the reloaded data on the header for later calls
+        
+        Returns:
+            Parsed KSY YAML data, or None if it was dropped and the header
+            has no source_path
+        """
+        if self.raw_data is not None or not self.source_path:
+            return self.raw_data
+        with open(self.source_path) as f:
+            data = safe_load(f)
+        if retain:
+            self.raw_data = data
+        return data
+    
+    def drop_raw_data(self) -> None:
+        """Release raw_data; load_raw_data() can re-read it from source_path."""
+        self.raw_data = None
+    
+    def compile_decoder(self):
+        """Compile a fast decoder for this header's field layout.
+        
+        See utilities.ksy_parser.decoder.compile_decoder.
+        """
+        from utilities.ksy_parser.decoder import compile_decoder
+        return compile_decoder(self)
+    
+    def compile_batch_decoder(self, stride: Optional[int] = None):
+        """Compile a vectorized NumPy decoder for back-to-back packets.
+        
+        See utilities.ksy_parser.batch.compile_batch_decoder.
+        """
+        from utilities.ksy_parser.batch import compile_batch_decoder
+        return compile_batch_decoder(self, stride)
+    
+    def compile_encoder(self):
+        """Compile a packer that serializes a field dict to wire bytes.
+        
+        See utilities.ksy_parser.encoder.compile_encoder.
+        """
+        from utilities.ksy_parser.encoder import compile_encoder
+        return compile_encoder(self)
+    
+    def compile_instances(self, vectorized: bool = False, strict: bool = True):
+        """Compile instance expressions into an evaluator over decoded records.
+        
+        See utilities.ksy_parser.expressions.compile_instances.
+        """
+        from utilities.ksy_parser.expressions import compile_instances
+        return compile_instances(self, vectorized=vectorized, strict=strict)
+    
+    def compile_validator(self, vectorized: bool = False):
+        """Compile x-constraint and x-packet constraints into a validator.
+        
+        See utilities.ksy_parser.constraints.compile_validator.
+        """
+        from utilities.ksy_parser.constraints import compile_validator
+        return compile_validator(self, vectorized=vectorized)
+
+    def compile_struct_module(self, cache_dir: Optional[str] = None):
+        """Load the generated struct/ctypes overlay module for this header.
+
+        See utilities.ksy_parser.codegen.load_generated_module.
+        """
+        from utilities.ksy_parser.codegen import load_generated_module
+        return load_generated_module(self, cache_dir)
 
 
 class KsyParser:
-    """Parser for Kaitai Struct (.ksy) YAML files."""
+    """Parser for Kaitai Struct (.ksy) YAML files.
+    
+    Pass cache_dir to enable the persistent parse cache: headers are stored
+    on disk keyed by file path and validated by size/mtime/content hash, so
+    unchanged files skip YAML parsing on later runs.
+    
+    Pass keep_raw_data=False for long-running processes that load the whole
+    datamodel: headers are returned without raw_data, which can still be
+    re-read on demand with KsyHeader.load_raw_data().
+    """
+    
+    def __init__(self, cache_dir: Optional[str] = None, cache_max_bytes: Optional[int] = None,
+                 keep_raw_data: bool = True):
+        self.keep_raw_data = keep_raw_data
+        self.cache = None
+        if cache_dir is not None:
+            from utilities.ksy_parser.cache import ParseCache, DEFAULT_MAX_BYTES
+            self.cache = ParseCache(cache_dir, cache_max_bytes or DEFAULT_MAX_BYTES)
     
     def parse(self, filepath: str) -> KsyHeader:
         """Parse a KSY file and return a KsyHeader object."""
+        header = None
+        if self.cache is not None:
+            header = self.cache.get(filepath)
+            if header is None:
+                header = self._parse_file(filepath)
+                self.cache.put(filepath, header)
+        else:
+            header = self._parse_file(filepath)
+        
+        if not self.keep_raw_data:
+            header.drop_raw_data()
+        return header
+    
+    def parse_tree(self, root: str, workers: Optional[int] = None):
+        """Parse every .ksy file under a directory across a process pool.
+        
+        See utilities.ksy_parser.tree.parse_tree. The parse cache, if
+        enabled, is shared with the workers.
+        """
+        from utilities.ksy_parser.tree import parse_tree
+        cache_dir = str(self.cache.cache_dir) if self.cache is not None else None
+        return parse_tree(root, workers=workers, cache_dir=cache_dir,
+                          keep_raw_data=self.keep_raw_data)
+    
+    def _parse_file(self, filepath: str) -> KsyHeader:
+        """Parse a KSY file from disk without consulting the cache."""
         with open(filepath) as f:
-            data = yaml.safe_load(f)
+            data = safe_load(f)
         
         meta = data.get('meta', {})
         header_id = meta.get('id', '')
         title = meta.get('title', '')
+        endian = meta.get('endian', 'be')
+        bit_endian = meta.get('bit-endian', 'be')
         
         # Extract x-packet metadata
         x_packet = data.get('x-packet', {})
@@ -87,8 +220,8 @@ class KsyParser:
         fields = []
         offset_bits = 0
         for field_def in data.get('seq', []):
-            name = field_def.get('id', '')
-            type_str = str(field_def.get('type', ''))
+            name = sys.intern(str(field_def.get('id', '')))
+            type_str = sys.intern(str(field_def.get('type', '')))
             size_bits = self._get_type_size(type_str, field_def)
             doc = self._extract_doc(field_def.get('doc', ''))
             
@@ -97,6 +230,8 @@ class KsyParser:
             x_constraint = field_def.get('x-constraint')
             x_spec_ref = field_def.get('x-spec-ref')
             enum_type = field_def.get('enum')
+            if isinstance(enum_type, str):
+                enum_type = sys.intern(enum_type)
             
             fields.append(KsyField(
                 name=name,
@@ -125,7 +260,7 @@ class KsyParser:
                 value = str(inst_def.get('value', ''))
                 doc = self._extract_doc(inst_def.get('doc', ''))
                 instances.append(KsyInstance(
-                    name=inst_name,
+                    name=sys.intern(str(inst_name)),
                     value=value,
                     description=doc
                 ))
@@ -141,15 +276,19 @@ class KsyParser:
             x_protocol=x_protocol,
             enums=enums,
             instances=instances,
-            raw_data=data
+            raw_data=data,
+            endian=endian if isinstance(endian, str) else 'be',
+            bit_endian=bit_endian,
+            source_path=os.path.abspath(filepath)
         )
     
     def _get_type_size(self, type_str: str, field_def: dict) -> int:
         """Determine the size in bits for a field type."""
-        if type_str in TYPE_SIZES:
-            return TYPE_SIZES[type_str]
-        if type_str.startswith('b') and type_str[1:].isdigit():
-            return int(type_str[1:])
+        base_type, _ = split_type_endian(type_str)
+        if base_type in TYPE_SIZES:
+            return TYPE_SIZES[base_type]
+        if base_type.startswith('b') and base_type[1:].isdigit():
+            return int(base_type[1:])
         if 'size' in field_def:
             size_val = field_def['size']
             if isinstance(size_val, int):
@@ -0,0 +1,292 @@
+"""
+KSY State Machine Product - Compose StateMachines and explore them lazily.
+
+Provides utilities for:
+- Synchronized product of two or more StateMachines: shared triggers move
+  every machine that knows them together, other triggers move one machine
+- Lazy breadth-first exploration of the reachable product states, encoded
+  as mixed-radix integers, without building the full cross product
+- Finding shortest event traces to product states matching a predicate
+  (e.g. "VC removed while PDC still open") and reachable deadlocks
+- Materializing the reachable part as a StateMachine for the existing
+  tables, diagrams and state_graph analyses
+
+Transition conditions are not evaluated: every candidate transition of a
+(state, trigger) pair is explored, so guarded alternatives all appear in
+the product. A product state is terminal when every component is in a
+terminal state.
+"""
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from utilities.ksy_parser.state_machine import StateMachine, State, Transition
+from utilities.ksy_parser.state_graph import WILDCARD_STATE, build_state_graph
+
+
+DENSE_VISITED_LIMIT = 1 << 24  # use a bytearray visited set up to this many product states
+
+
+@dataclass
+class ExplorationResult:
+    """Reachable part of a product automaton."""
+    states: int
+    transitions: int
+    deadlocks: List[Tuple[str, ...]] = field(default_factory=list)
+    truncated: bool = False
+
+
+class _Visited:
+    """Visited set over product codes: a bitmap when small, a set otherwise."""
+
+    def __init__(self, size: int):
+        self._dense = bytearray(size) if size <= DENSE_VISITED_LIMIT else None
+        self._sparse: Set[int] = set()
+
+    def add(self, code: int) -> bool:
+        """Mark code visited; return False if it already was."""
+        if self._dense is not None:
+            if self._dense[code]:
+                return False
+            self._dense[code] = 1
+            return True
+        if code in self._sparse:
+            return False
+        self._sparse.add(code)
+        return True
+
+
+class ProductMachine:
+    """Synchronized product of StateMachines, explored on demand.
+
+    Usage:
+        product = ProductMachine([vc_sm, pdc_sm])
+        result = product.explore()
+        trace = product.find(lambda s: s == ('REMOVING', 'OPEN'))
+    """
+
+    def __init__(self, machines: Sequence[StateMachine], sync: Optional[Iterable[str]] = None):
+        if len(machines) < 2:
+            raise ValueError("A product needs at least two state machines")
+        self.machines = list(machines)
+        self.graphs = [build_state_graph(sm) for sm in machines]
+
+        self.triggers: List[str] = []
+        self.trigger_index: Dict[str, int] = {}
+        alphabets: List[Set[int]] = []
+        # per machine: state code -> [(trigger code, target code)]
+        self._moves: List[List[List[Tuple[int, int]]]] = []
+        for sm, graph in zip(self.machines, self.graphs):
+            moves: List[List[Tuple[int, int]]] = [[] for _ in graph.states]
+            alphabet = set()
+            for t in sm.transitions:
+                trig = self.trigger_index.setdefault(t.trigger, len(self.triggers))
+                if trig == len(self.triggers):
+                    self.triggers.append(t.trigger)
+                alphabet.add(trig)
+                target = graph.index[t.to_state]
+                sources = range(len(graph.states)) if t.from_state == WILDCARD_STATE \
+                    else [graph.index[t.from_state]]
+                for s in sources:
+                    moves[s].append((trig, target))
+            self._moves.append(moves)
+            alphabets.append(alphabet)
+
+        if sync is None:
+            counts: Dict[int, int] = {}
+            for alphabet in alphabets:
+                for trig in alphabet:
+                    counts[trig] = counts.get(trig, 0) + 1
+            synced = {trig for trig, n in counts.items() if n > 1}
+        else:
+            synced = {self.trigger_index[t] for t in sync if t in self.trigger_index}
+        self.sync = sorted(self.triggers[t] for t in synced)
+        self._synced = synced
+        # trigger code -> machines that must all move on it
+        self._participants = {trig: [i for i, a in enumerate(alphabets) if trig in a] for trig in synced}
+
+        self._radix = [len(g.states) for g in self.graphs]
+        self._weights = []
+        weight = 1
+        for size in self._radix:
+            self._weights.append(weight)
+            weight *= size
+        self.size = weight
+
+        for sm, graph in zip(self.machines, self.graphs):
+            if graph.initial is None:
+                raise ValueError(f"State machine '{sm.name}' has no initial state")
+        self.initial = self._encode_codes([g.initial for g in self.graphs])
+
+    def _encode_codes(self, codes: Sequence[int]) -> int:
+        return sum(c * w for c, w in zip(codes, self._weights))
+
+    def _decode_codes(self, code: int) -> List[int]:
+        codes = []
+        for size in self._radix:
+            code, c = divmod(code, size)
+            codes.append(c)
+        return codes
+
+    def encode(self, states: Sequence[str]) -> int:
+        """Encode a tuple of component state names as a product code."""
+        return self._encode_codes([g.index[name] for g, name in zip(self.graphs, states)])
+
+    def decode(self, code: int) -> Tuple[str, ...]:
+        """Decode a product code into component state names."""
+        return tuple(g.states[c] for g, c in zip(self.graphs, self._decode_codes(code)))
+
+    def is_terminal(self, code: int) -> bool:
+        """True when every component is in a terminal state."""
+        return all(g.terminal[c] for g, c in zip(self.graphs, self._decode_codes(code)))
+
+    def successors(self, code: int) -> Iterator[Tuple[int, int]]:
+        """
+        Yield (trigger code, successor code) pairs of a product state.
+
+        Args:
+            code: Product state code
+
+        Yields:
+            Successor pairs; duplicates are possible for nondeterministic
+            components
+        """
+        codes = self._decode_codes(code)
+        synced_moves: Dict[int, Dict[int, List[int]]] = {}
+        for i, (c, weight) in enumerate(zip(codes, self._weights)):
+            base = code - c * weight
+            for trig, target in self._moves[i][c]:
+                if trig in self._synced:
+                    synced_moves.setdefault(trig, {}).setdefault(i, []).append(target)
+                else:
+                    yield trig, base + target * weight
+
+        for trig, by_machine in synced_moves.items():
+            participants = self._participants[trig]
+            if len(by_machine) != len(participants):
+                continue
+            partial = [code]
+            for i in participants:
+                weight, current = self._weights[i], codes[i]
+                partial = [p + (t - current) * weight for p in partial for t in by_machine[i]]
+            for successor in partial:
+                yield trig, successor
+
+    def explore(self, max_states: Optional[int] = None) -> ExplorationResult:
+        """
+        Breadth-first exploration of the reachable product states.
+
+        Args:
+            max_states: Stop after visiting this many states (result is
+                marked truncated)
+
+        Returns:
+            ExplorationResult with counts and non-terminal deadlocks
+        """
+        visited = _Visited(self.size)
+        visited.add(self.initial)
+        queue = deque([self.initial])
+        states, transitions, deadlocks = 1, 0, []
+        truncated = False
+        while queue:
+            code = queue.popleft()
+            has_successor = False
+            for _, successor in self.successors(code):
+                has_successor = True
+                transitions += 1
+                if visited.add(successor):
+                    if max_states is not None and states >= max_states:
+                        truncated = True
+                        continue
+                    states += 1
+                    queue.append(successor)
+            if not has_successor and not self.is_terminal(code):
+                deadlocks.append(self.decode(code))
+        return ExplorationResult(states, transitions, deadlocks, truncated)
+
+    def find(self, predicate: Callable[[Tuple[str, ...]], bool],
+             max_states: Optional[int] = None) -> Optional[List[Tuple[str, Tuple[str, ...]]]]:
+        """
+        Find a shortest event trace to a product state matching predicate.
+
+        Args:
+            predicate: Called with component state names
+            max_states: Exploration bound
+
+        Returns:
+            [(trigger, state tuple), ...] starting with ('', initial state),
+            or None if no reachable state matches
+        """
+        parents: Dict[int, Tuple[int, int]] = {self.initial: (-1, -1)}
+        queue = deque([self.initial])
+        while queue:
+            code = queue.popleft()
+            if predicate(self.decode(code)):
+                trace = []
+                while code != -1:
+                    parent, trig = parents[code]
+                    trace.append((self.triggers[trig] if trig >= 0 else '', self.decode(code)))
+                    code = parent
+                return trace[::-1]
+            for trig, successor in self.successors(code):
+                if successor not in parents:
+                    if max_states is not None and len(parents) >= max_states:
+                        continue
+                    parents[successor] = (code, trig)
+                    queue.append(successor)
+        return None
+
+    def to_state_machine(self, max_states: Optional[int] = None, separator: str = '|') -> StateMachine:
+        """
+        Materialize the reachable product as a StateMachine.
+
+        Args:
+            max_states: Exploration bound
+            separator: Joins component state names
+
+        Returns:
+            StateMachine over the reachable product states
+        """
+        def name(code: int) -> str:
+            return separator.join(self.decode(code))
+
+        order = [self.initial]
+        seen = {self.initial}
+        transitions: List[Transition] = []
+        edges = set()
+        i = 0
+        while i < len(order):
+            code = order[i]
+            i += 1
+            for trig, successor in self.successors(code):
+                if successor not in seen:
+                    if max_states is not None and len(seen) >= max_states:
+                        continue
+                    seen.add(successor)
+                    order.append(successor)
+                if (code, trig, successor) not in edges:
+                    edges.add((code, trig, successor))
+                    transitions.append(Transition(name(code), name(successor), self.triggers[trig]))
+
+        return StateMachine(
+            name=' x '.join(sm.name for sm in self.machines),
+            initial_state=name(self.initial),
+            states=[State(name(c), '', self.is_terminal(c)) for c in order],
+            transitions=transitions,
+        )
+
+
+def compose_state_machines(*machines: StateMachine, sync: Optional[Iterable[str]] = None) -> ProductMachine:
+    """
+    Build the synchronized product of state machines.
+
+    Args:
+        *machines: Two or more StateMachines
+        sync: Triggers to synchronize; defaults to triggers used by more
+            than one machine
+
+    Returns:
+        ProductMachine
+    """
+    return ProductMachine(machines, sync)
@@ -19,6 +19,11 @@ from utilities.ksy_parser.enums import extract_enums, generate_enum_table
 from utilities.ksy_parser.state_machine import extract_state_machine, generate_state_table, generate_transition_table, generate_transition_diagram
 
 
+# Bump when the sections produced by generate_header_section change, so
+# incremental builds (utilities.ksy_parser.build) regenerate every header
+REPORT_GENERATOR_VERSION = 1
+
+
 def generate_spec_reference(header: "KsyHeader") -> Optional[str]:
     """
     Generate UE Spec reference text from x-spec metadata.
@@ -64,11 +69,12 @@ def generate_enum_section(header: "KsyHeader") -> List[Dict[str, Any]]:
     Returns:
         List of YAML table dicts for enumerations
     """
-    if not header.enums or not header.raw_data:
+    if not header.enums:
         return []
     
     sections = []
-    enums = extract_enums(header.raw_data)
+    # Enums live on the header itself, so this works when raw_data was dropped
+    enums = extract_enums({'enums': header.enums})
     
     for enum_def in enums:
         table = generate_enum_table(enum_def)
@@ -0,0 +1,270 @@
+"""
+KSY Protocol Stack - Chain headers through next-header selector fields.
+
+Provides utilities for:
+- Describing a protocol graph where a field of one header (EtherType, UDP
+  port, UE next_hdr enum, ...) selects the header that follows it
+- Compiling the graph into per-header dispatch tables for one-pass
+  full-frame decoding with cumulative offsets
+- Enumerating root-to-leaf header paths and their overhead in bytes
+
+Stacks can be built in code or from a config mapping (e.g. loaded from
+YAML):
+
+    root: ethernet
+    links:
+      ethernet: {field: ethertype, next: {0x86DD: ipv6}}
+      ipv6: {field: next_header, next: {17: udp}}
+      udp: {field: dst_port, next: {4793: pds}}
+      pds: {field: next_hdr, next: {uet_hdr_request_std: ses_standard}}
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from utilities.ksy_parser.parser import KsyHeader
+
+from utilities.ksy_parser.decoder import layout_size_bytes
+from utilities.ksy_parser.encoder import enum_name_maps
+
+
+MAX_DEPTH = 32
+
+
+def header_size_bytes(header: "KsyHeader") -> int:
+    """Return the bytes a header occupies in a frame: its declared size or field span, if larger."""
+    return max(header.size_bytes, layout_size_bytes(header))
+
+
+def overhead_bytes(headers: Iterable["KsyHeader"]) -> int:
+    """Return the summed header_size_bytes of headers in wire order."""
+    return sum(header_size_bytes(h) for h in headers)
+
+
+@dataclass
+class StackLink:
+    """Selector field of a header and the header chosen for each value."""
+    field: str
+    next: Dict[int, str] = field(default_factory=dict)
+    default: Optional[str] = None
+
+
+@dataclass(slots=True)
+class Layer:
+    """One decoded header within a frame."""
+    header_id: str
+    offset: int
+    fields: Dict[str, Any]
+
+
+@dataclass(slots=True)
+class DecodedFrame:
+    """All layers decoded from one frame, in wire order."""
+    layers: List[Layer]
+    payload_offset: int
+
+    def __getitem__(self, header_id: str) -> Dict[str, Any]:
+        for layer in self.layers:
+            if layer.header_id == header_id:
+                return layer.fields
+        raise KeyError(header_id)
+
+    def __contains__(self, header_id: str) -> bool:
+        return any(layer.header_id == header_id for layer in self.layers)
+
+    @property
+    def path(self) -> List[str]:
+        """Header ids in wire order."""
+        return [layer.header_id for layer in self.layers]
+
+
+class ProtocolStack:
+    """Graph of headers connected by next-header selector fields."""
+
+    def __init__(self, headers: Mapping[str, "KsyHeader"], root: str):
+        if root not in headers:
+            raise ValueError(f"Root header '{root}' is not defined")
+        self.headers = dict(headers)
+        self.root = root
+        self.links: Dict[str, StackLink] = {}
+        self._compiled = None
+
+    @classmethod
+    def from_config(cls, headers: Mapping[str, "KsyHeader"], config: Mapping[str, Any]) -> "ProtocolStack":
+        """
+        Build a stack from a config mapping with 'root' and 'links'.
+
+        Args:
+            headers: Header id -> KsyHeader (e.g. ParseTreeResult.headers)
+            config: {'root': id, 'links': {id: {'field': f, 'next': {value: id},
+                'default': id}}}
+
+        Returns:
+            ProtocolStack
+        """
+        stack = cls(headers, config['root'])
+        for header_id, link in (config.get('links') or {}).items():
+            stack.link(header_id, link['field'], link.get('next') or {}, link.get('default'))
+        return stack
+
+    def link(self, header_id: str, selector_field: str, next_headers: Mapping[Any, str],
+             default: Optional[str] = None) -> "ProtocolStack":
+        """
+        Declare that selector_field of header_id chooses the next header.
+
+        Selector values may be integers or enum ids of the field's enum.
+
+        Args:
+            header_id: Selecting header
+            selector_field: Field whose decoded value selects the next header
+            next_headers: Selector value -> next header id
+            default: Header used for unlisted values (None ends the frame)
+
+        Returns:
+            self, for chaining
+
+        Raises:
+            ValueError: On unknown headers, fields or enum ids
+        """
+        header = self._header(header_id)
+        selector = next((f for f in header.fields if f.name == selector_field), None)
+        if selector is None:
+            raise ValueError(f"Header '{header_id}' has no field '{selector_field}'")
+
+        enum_ids = enum_name_maps(header).get(selector.enum_type or '', {})
+        table: Dict[int, str] = {}
+        for value, next_id in next_headers.items():
+            self._header(next_id)
+            if isinstance(value, str):
+                if value in enum_ids:
+                    value = enum_ids[value]
+                else:
+                    try:
+                        value = int(value, 0)
+                    except ValueError:
+                        raise ValueError(f"'{value}' is not a value of {selector.enum_type or selector_field}") from None
+            table[value] = next_id
+        if default is not None:
+            self._header(default)
+
+        self.links[header_id] = StackLink(selector_field, table, default)
+        self._compiled = None
+        return self
+
+    def _header(self, header_id: str) -> "KsyHeader":
+        try:
+            return self.headers[header_id]
+        except KeyError:
+            raise ValueError(f"Header '{header_id}' is not defined") from None
+
+    def reachable(self) -> List[str]:
+        """Return the header ids reachable from the root through links, root first."""
+        order = [self.root]
+        seen = {self.root}
+        for header_id in order:
+            link = self.links.get(header_id)
+            if link is None:
+                continue
+            for next_id in list(link.next.values()) + ([link.default] if link.default else []):
+                if next_id not in seen:
+                    seen.add(next_id)
+                    order.append(next_id)
+        return order
+
+    def compile(self) -> Dict[str, Tuple]:
+        """
+        Precompute decoders, sizes and dispatch tables for reachable headers.
+
+        Headers that no link reaches from the root are not compiled.
+
+        Returns:
+            Header id -> (decoder, size_bytes, selector_field, table, default)
+        """
+        if self._compiled is None:
+            compiled = {}
+            for header_id in self.reachable():
+                header = self.headers[header_id]
+                decode = header.compile_decoder()
+                size = header_size_bytes(header)
+                link = self.links.get(header_id)
+                if link is None:
+                    compiled[header_id] = (decode, size, None, None, None)
+                else:
+                    compiled[header_id] = (decode, size, link.field, link.next, link.default)
+            self._compiled = compiled
+        return self._compiled
+
+    def decode(self, buf, offset: int = 0) -> DecodedFrame:
+        """
+        Decode a full frame, following selector fields from the root header.
+
+        Args:
+            buf: bytes-like frame data
+            offset: Offset of the root header within buf
+
+        Returns:
+            DecodedFrame with one Layer per header and the payload offset
+
+        Raises:
+            ValueError: If the frame is too short for a selected header or the
+                chain exceeds MAX_DEPTH headers
+        """
+        plan = self.compile()
+        layers = []
+        header_id = self.root
+        pos = offset
+        while header_id is not None:
+            if len(layers) >= MAX_DEPTH:
+                raise ValueError(f"Header chain exceeds {MAX_DEPTH} layers (cycle in stack?)")
+            decode, size, selector, table, default = plan[header_id]
+            fields = decode(buf, pos)
+            layers.append(Layer(header_id, pos, fields))
+            pos += size
+            header_id = table.get(fields[selector], default) if selector is not None else None
+        return DecodedFrame(layers, pos)
+
+    def paths(self) -> Iterator[List[str]]:
+        """
+        Enumerate every root-to-leaf header path through the graph.
+
+        Yields:
+            Lists of header ids; paths revisiting a header are cut at the cycle
+        """
+        def walk(header_id: str, path: List[str]) -> Iterator[List[str]]:
+            path = path + [header_id]
+            link = self.links.get(header_id)
+            successors = []
+            if link is not None:
+                successors = list(dict.fromkeys(list(link.next.values()) +
+                                                ([link.default] if link.default else [])))
+            successors = [s for s in successors if s not in path]
+            if not successors:
+                yield path
+                return
+            for successor in successors:
+                yield from walk(successor, path)
+
+        yield from walk(self.root, [])
+
+    def overhead_bytes(self, path: List[str]) -> int:
+        """
+        Return the summed header size of a path of header ids.
+
+        Sizes are the ones decode() advances by, so the result equals the
+        payload offset of a frame following this path.
+
+        Args:
+            path: Header ids, e.g. from paths()
+
+        Returns:
+            Total size in bytes
+
+        Raises:
+            ValueError: If a header is not reachable from the root
+        """
+        plan = self.compile()
+        for header_id in path:
+            if header_id not in plan:
+                raise ValueError(f"Header {header_id!r} is not reachable from '{self.root}'")
+        return overhead_bytes(self.headers[h] for h in path)
@@ -0,0 +1,344 @@
+"""
+KSY State Graph - Linear-time graph analysis of StateMachine definitions.
+
+Provides utilities for:
+- Building an integer adjacency index over a StateMachine
+- Reachability from the initial state (unreachable states)
+- Strongly connected components (iterative Tarjan)
+- States that cannot reach any terminal state (dead states)
+- Nondeterministic (state, trigger) pairs and transitions referencing
+  undeclared states
+- Generating a report-ready lint table
+
+Every routine is O(states + transitions), plus O(states x wildcards) to
+expand transitions whose from_state is '*' (they apply to every state), so
+machines with tens of thousands of states (e.g. generated product
+machines) can be linted on each commit. Machines without terminal states
+(cyclic protocols) skip the dead-state check.
+"""
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from utilities.ksy_parser.state_machine import StateMachine
+
+
+WILDCARD_STATE = '*'
+
+
+@dataclass
+class StateGraph:
+    """Integer-coded adjacency lists of a StateMachine."""
+    states: List[str]
+    index: Dict[str, int]
+    successors: List[List[int]]
+    terminal: List[bool]
+    initial: Optional[int]
+
+    def predecessors(self) -> List[List[int]]:
+        """Return the reversed adjacency lists."""
+        preds: List[List[int]] = [[] for _ in self.states]
+        for s, targets in enumerate(self.successors):
+            for t in targets:
+                preds[t].append(s)
+        return preds
+
+
+@dataclass
+class NondeterministicPair:
+    """A (state, trigger) pair with more than one transition."""
+    state: str
+    trigger: str
+    targets: List[str]
+    guarded: bool  # every candidate has a non-trivial condition
+
+
+@dataclass
+class StateMachineAnalysis:
+    """Lint results for one StateMachine."""
+    name: str
+    unreachable: List[str]
+    dead: List[str]
+    components: List[List[str]]
+    nondeterministic: List[NondeterministicPair] = field(default_factory=list)
+    undefined: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        """True when no unreachable, dead, undefined or unguarded nondeterministic states exist."""
+        return not (self.unreachable or self.dead or self.undefined or
+                    any(not p.guarded for p in self.nondeterministic))
+
+
+def build_state_graph(sm: StateMachine) -> StateGraph:
+    """
+    Build the adjacency index of a state machine.
+
+    States are the declared states followed by any undeclared names used
+    by the initial state or transitions.
+
+    Args:
+        sm: StateMachine
+
+    Returns:
+        StateGraph
+    """
+    states: List[str] = []
+    index: Dict[str, int] = {}
+
+    def code(name: str) -> int:
+        if name not in index:
+            index[name] = len(states)
+            states.append(name)
+        return index[name]
+
+    for state in sm.states:
+        code(state.name)
+    initial = code(sm.initial_state) if sm.initial_state else None
+    edges: List[Tuple[Optional[int], int]] = []
+    for t in sm.transitions:
+        source = None if t.from_state == WILDCARD_STATE else code(t.from_state)
+        edges.append((source, code(t.to_state)))
+
+    successors: List[List[int]] = [[] for _ in states]
+    wildcard_targets = []
+    for source, target in edges:
+        if source is None:
+            wildcard_targets.append(target)
+        else:
+            successors[source].append(target)
+    if wildcard_targets:
+        for targets in successors:
+            targets.extend(wildcard_targets)
+
+    terminal_names = {s.name for s in sm.states if s.is_terminal}
+    terminal = [name in terminal_names for name in states]
+    return StateGraph(states, index, successors, terminal, initial)
+
+
+def _reach(adjacency: Sequence[Sequence[int]], sources: Sequence[int]) -> bytearray:
+    seen = bytearray(len(adjacency))
+    queue = deque()
+    for s in sources:
+        if not seen[s]:
+            seen[s] = 1
+            queue.append(s)
+    while queue:
+        for t in adjacency[queue.popleft()]:
+            if not seen[t]:
+                seen[t] = 1
+                queue.append(t)
+    return seen
+
+
+def reachable_states(sm: StateMachine, start: Optional[str] = None) -> List[str]:
+    """Return states reachable from start (default: the initial state), in declaration order."""
+    graph = build_state_graph(sm)
+    source = graph.index.get(start) if start else graph.initial
+    if source is None:
+        return []
+    seen = _reach(graph.successors, [source])
+    return [name for code, name in enumerate(graph.states) if seen[code]]
+
+
+def unreachable_states(sm: StateMachine) -> List[str]:
+    """Return states not reachable from the initial state."""
+    graph = build_state_graph(sm)
+    if graph.initial is None:
+        return list(graph.states)
+    seen = _reach(graph.successors, [graph.initial])
+    return [name for code, name in enumerate(graph.states) if not seen[code]]
+
+
+def dead_states(sm: StateMachine) -> List[str]:
+    """Return states from which no terminal state can be reached ([] without terminals)."""
+    graph = build_state_graph(sm)
+    terminals = [code for code, is_terminal in enumerate(graph.terminal) if is_terminal]
+    if not terminals:
+        return []
+    seen = _reach(graph.predecessors(), terminals)
+    return [name for code, name in enumerate(graph.states) if not seen[code]]
+
+
+def strongly_connected_components(sm: StateMachine) -> List[List[str]]:
+    """
+    Return the strongly connected components of a state machine.
+
+    Uses an iterative Tarjan so deep machines do not hit the recursion
+    limit. Components are returned in reverse topological order (sinks
+    first).
+
+    Args:
+        sm: StateMachine
+
+    Returns:
+        List of components, each a list of state names
+    """
+    graph = build_state_graph(sm)
+    return [[graph.states[c] for c in comp] for comp in _tarjan(graph.successors)]
+
+
+def _tarjan(successors: Sequence[Sequence[int]]) -> List[List[int]]:
+    n = len(successors)
+    index = [-1] * n
+    low = [0] * n
+    on_stack = bytearray(n)
+    stack: List[int] = []
+    components: List[List[int]] = []
+    counter = 0
+
+    for root in range(n):
+        if index[root] != -1:
+            continue
+        work = [(root, 0)]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        while work:
+            node, pos = work[-1]
+            targets = successors[node]
+            if pos < len(targets):
+                work[-1] = (node, pos + 1)
+                t = targets[pos]
+                if index[t] == -1:
+                    index[t] = low[t] = counter
+                    counter += 1
+                    stack.append(t)
+                    on_stack[t] = 1
+                    work.append((t, 0))
+                elif on_stack[t] and index[t] < low[node]:
+                    low[node] = index[t]
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                if low[node] < low[parent]:
+                    low[parent] = low[node]
+            if low[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = 0
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+    return components
+
+
+def _is_guarded(condition: Optional[str]) -> bool:
+    text = str(condition).strip().lower() if condition is not None else ''
+    return bool(text) and text != 'true'
+
+
+def nondeterministic_pairs(sm: StateMachine) -> List[NondeterministicPair]:
+    """
+    Return (state, trigger) pairs with several outgoing transitions.
+
+    Wildcard transitions count for every state. Pairs whose candidates all
+    carry conditions are reported with guarded=True since the conditions
+    may be mutually exclusive.
+
+    Args:
+        sm: StateMachine
+
+    Returns:
+        List of NondeterministicPair
+    """
+    return _nondeterministic_pairs(build_state_graph(sm), sm)
+
+
+def _nondeterministic_pairs(graph: StateGraph, sm: StateMachine) -> List[NondeterministicPair]:
+    by_pair: Dict[Tuple[str, str], List[Any]] = {}
+    wildcard: Dict[str, List[Any]] = {}
+    for t in sm.transitions:
+        if t.from_state == WILDCARD_STATE:
+            wildcard.setdefault(t.trigger, []).append(t)
+        else:
+            by_pair.setdefault((t.from_state, t.trigger), []).append(t)
+
+    for trigger, transitions in wildcard.items():
+        for state in graph.states:
+            by_pair.setdefault((state, trigger), []).extend(transitions)
+
+    results = []
+    for (state, trigger), transitions in by_pair.items():
+        if len(transitions) > 1:
+            results.append(NondeterministicPair(
+                state, trigger, [t.to_state for t in transitions],
+                all(_is_guarded(t.condition) for t in transitions)))
+    return results
+
+
+def undefined_states(sm: StateMachine) -> List[str]:
+    """Return state names used by the initial state or transitions but not declared."""
+    return _undefined_states(build_state_graph(sm), sm)
+
+
+def _undefined_states(graph: StateGraph, sm: StateMachine) -> List[str]:
+    # build_state_graph codes the declared states first, then undeclared names in order of use
+    return graph.states[len({s.name for s in sm.states}):]
+
+
+def analyze_state_machine(sm: StateMachine) -> StateMachineAnalysis:
+    """
+    Run every analysis over a state machine with one adjacency index.
+
+    Args:
+        sm: StateMachine
+
+    Returns:
+        StateMachineAnalysis
+    """
+    graph = build_state_graph(sm)
+    if graph.initial is None:
+        unreachable = list(graph.states)
+    else:
+        reached = _reach(graph.successors, [graph.initial])
+        unreachable = [name for code, name in enumerate(graph.states) if not reached[code]]
+    terminals = [code for code, is_terminal in enumerate(graph.terminal) if is_terminal]
+    if terminals:
+        alive = _reach(graph.predecessors(), terminals)
+        dead = [name for code, name in enumerate(graph.states) if not alive[code]]
+    else:
+        dead = []
+
+    return StateMachineAnalysis(
+        name=sm.name,
+        unreachable=unreachable,
+        dead=dead,
+        components=[[graph.states[c] for c in comp] for comp in _tarjan(graph.successors)],
+        nondeterministic=_nondeterministic_pairs(graph, sm),
+        undefined=_undefined_states(graph, sm),
+    )
+
+
+def generate_analysis_table(analysis: StateMachineAnalysis) -> Dict[str, Any]:
+    """
+    Generate a lint table section for a state machine analysis.
+
+    Args:
+        analysis: StateMachineAnalysis
+
+    Returns:
+        Dict in YAML table format
+    """
+    cycles = [comp for comp in analysis.components if len(comp) > 1]
+    nondeterministic = [f"{p.state} --[{p.trigger}]--> {' | '.join(p.targets)}"
+                        + (" (guarded)" if p.guarded else "")
+                        for p in analysis.nondeterministic]
+    rows = [
+        ['Unreachable states', ', '.join(analysis.unreachable) or '-'],
+        ['States that cannot reach a terminal state', ', '.join(analysis.dead) or '-'],
+        ['Undefined states', ', '.join(analysis.undefined) or '-'],
+        ['Nondeterministic transitions', '; '.join(nondeterministic) or '-'],
+        ['Cycles (SCCs)', '; '.join(', '.join(c) for c in cycles) or '-'],
+    ]
+    return {
+        'type': 'table',
+        'title': f"{analysis.name} Analysis",
+        'headers': ['Check', 'Result'],
+        'rows': rows
+    }
@@ -2,6 +2,8 @@
 import pytest
 from pathlib import Path
 
+from utilities.yaml_loader import load_yaml_file
+
 
 @pytest.fixture
 def fixtures_dir() -> Path:
@@ -21,17 +23,19 @@ def vc_state_machine_ksy(fixtures_dir: Path) -> Path:
     return fixtures_dir / "vc_state_machine.ksy"
 
 
+@pytest.fixture
+def rud_rod_request_ksy(fixtures_dir: Path) -> Path:
+    """Return path to rud_rod_request.ksy fixture (bit-packed header)."""
+    return fixtures_dir / "rud_rod_request.ksy"
+
+
 @pytest.fixture
 def cf_update_data(cf_update_ksy: Path) -> dict:
     """Load and return cf_update.ksy as dict."""
-    import yaml
-    with open(cf_update_ksy) as f:
-        return yaml.safe_load(f)
+    return load_yaml_file(cf_update_ksy)
 
 
 @pytest.fixture
 def vc_state_machine_data(vc_state_machine_ksy: Path) -> dict:
     """Load and return vc_state_machine.ksy as dict."""
-    import yaml
-    with open(vc_state_machine_ksy) as f:
-        return yaml.safe_load(f)
+    return load_yaml_file(vc_state_machine_ksy)
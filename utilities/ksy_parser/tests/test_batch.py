@@ -0,0 +1,73 @@
+"""Tests for ksy_parser.batch module."""
+import pytest
+from utilities.ksy_parser.parser import KsyParser, KsyHeader, KsyField
+from utilities.ksy_parser.batch import compile_batch_decoder, decode_batch
+from utilities.ksy_parser.tests.test_decoder import pack_bits
+
+np = pytest.importorskip("numpy")
+
+
+def rud_packet(psn: int, next_hdr: int) -> bytes:
+    return pack_bits(
+        (0x02, 5), (next_hdr, 4), (0, 2), (psn & 1, 1), (1, 1), (0, 1), (0, 2),
+        (0x0010, 16), (psn, 32), (0x0102, 16), (0x3004, 16),
+    )
+
+
+class TestCompileBatchDecoder:
+    """Tests for compile_batch_decoder function."""
+
+    def test_batch_matches_scalar_decoder(self, rud_rod_request_ksy):
+        """Test that every column matches the scalar decoder."""
+        header = KsyParser().parse(str(rud_rod_request_ksy))
+        data = b''.join(rud_packet(psn, psn % 16) for psn in range(100))
+
+        columns = header.compile_batch_decoder()(data)
+        decode = header.compile_decoder()
+
+        for i in (0, 1, 57, 99):
+            record = decode(data, i * 12)
+            for name, value in record.items():
+                assert columns[name][i] == value, name
+        assert len(columns['psn']) == 100
+
+    def test_bitfield_dtypes(self, rud_rod_request_ksy):
+        """Test that bit fields use the smallest unsigned dtype."""
+        header = KsyParser().parse(str(rud_rod_request_ksy))
+        columns = decode_batch(header, rud_packet(7, 3))
+
+        assert columns['next_hdr'].dtype == np.uint8
+        assert columns['psn'].dtype == np.uint32
+        assert columns['next_hdr'][0] == 3
+
+    def test_accepts_2d_array(self, rud_rod_request_ksy):
+        """Test decoding from an N x size_bytes uint8 array."""
+        header = KsyParser().parse(str(rud_rod_request_ksy))
+        packets = np.frombuffer(rud_packet(5, 1) * 4, dtype=np.uint8).reshape(4, 12)
+
+        columns = decode_batch(header, packets)
+        assert list(columns['psn']) == [5, 5, 5, 5]
+
+    def test_little_endian_and_signed(self):
+        """Test little-endian bit fields and signed integers."""
+        header = KsyHeader(
+            id='le_hdr', title='', size_bytes=4, doc='',
+            fields=[
+                KsyField('lo', 'b3', 3, 0, ''),
+                KsyField('hi', 'b5', 5, 3, ''),
+                KsyField('tag', 'u1', 8, 8, ''),
+                KsyField('delta', 's2', 16, 16, ''),
+            ],
+            endian='le', bit_endian='le')
+        data = bytes([(0x1A << 3) | 0x5, 0x7F, 0xFE, 0xFF]) * 2
+
+        columns = decode_batch(header, data)
+        assert list(columns['lo']) == [5, 5]
+        assert list(columns['hi']) == [0x1A, 0x1A]
+        assert list(columns['delta']) == [-2, -2]
+
+    def test_ragged_buffer_raises(self, rud_rod_request_ksy):
+        """Test that a buffer that is not a multiple of the stride raises."""
+        header = KsyParser().parse(str(rud_rod_request_ksy))
+        with pytest.raises(ValueError):
+            decode_batch(header, rud_packet(1, 1) + b'\x00')
@@ -0,0 +1,146 @@
+"""Tests for ksy_parser.build module."""
+import shutil
+import pytest
+import yaml
+from utilities.ksy_parser.build import ReportBuilder, build_report_sections, normalize_name
+from utilities.ksy_parser.cli import main
+
+
+ACK_KSY = """meta:
+  id: ack
+  title: PDS ACK
+seq:
+  - id: psn
+    type: u4
+    doc: {doc}
+"""
+
+
+@pytest.fixture
+def datamodel(fixtures_dir, tmp_path):
+    """Datamodel with a request whose related_messages names the ACK header."""
+    root = tmp_path / "datamodel"
+    root.mkdir()
+    shutil.copy(fixtures_dir / "rud_rod_request.ksy", root)
+    shutil.copy(fixtures_dir / "cf_update.ksy", root)
+    (root / "ack.ksy").write_text(ACK_KSY.format(doc="Acknowledged PSN."))
+    return root
+
+
+def generator_calls():
+    """Count generator invocations by header id."""
+    from utilities.ksy_parser import report
+    calls = []
+
+    def generate(header):
+        calls.append(header.id)
+        return report.generate_header_section(header)
+    return calls, generate
+
+
+class TestReportBuilder:
+    """Tests for ReportBuilder."""
+
+    def test_first_build(self, datamodel, tmp_path):
+        """Test every header is built on the first run."""
+        result = ReportBuilder(tmp_path / "state").build(datamodel)
+
+        assert result.rebuilt == {'ack': 'new', 'cbfc_cf_update': 'new', 'rud_rod_request': 'new'}
+        assert result.sections['ack'][0]['type'] == 'section_header'
+        assert result.errors == {}
+
+    def test_unchanged_inputs_reused(self, datamodel, tmp_path):
+        """Test nothing is regenerated or parsed when inputs are unchanged."""
+        first = ReportBuilder(tmp_path / "state", generator=generator_calls()[1]).build(datamodel)
+        calls, generate = generator_calls()
+
+        second = ReportBuilder(tmp_path / "state", generator=generate).build(datamodel)
+
+        assert calls == []
+        assert sorted(second.reused) == ['ack', 'cbfc_cf_update', 'rud_rod_request']
+        assert second.sections == first.sections
+
+    def test_changed_input_and_dependent(self, datamodel, tmp_path):
+        """Test editing ACK rebuilds ACK and the request that relates to it."""
+        ReportBuilder(tmp_path / "state").build(datamodel)
+        (datamodel / "ack.ksy").write_text(ACK_KSY.format(doc="Cumulative ACK PSN."))
+
+        result = ReportBuilder(tmp_path / "state").build(datamodel)
+
+        assert result.rebuilt == {'ack': 'changed', 'rud_rod_request': 'dependency'}
+        assert result.reused == ['cbfc_cf_update']
+
+    def test_touch_without_change(self, datamodel, tmp_path):
+        """Test rewriting identical content does not rebuild."""
+        ReportBuilder(tmp_path / "state").build(datamodel)
+        path = datamodel / "ack.ksy"
+        path.write_text(path.read_text())
+
+        assert ReportBuilder(tmp_path / "state").build(datamodel).rebuilt == {}
+
+    def test_generator_version(self, datamodel, tmp_path):
+        """Test a new generator version rebuilds everything."""
+        ReportBuilder(tmp_path / "state").build(datamodel)
+
+        result = ReportBuilder(tmp_path / "state", generator_version='next').build(datamodel)
+
+        assert set(result.rebuilt.values()) == {'generator'}
+
+    def test_other_generator_rebuilds(self, datamodel, tmp_path):
+        """Test a different generator with the default version does not reuse sections."""
+        ReportBuilder(tmp_path / "state").build(datamodel)
+        calls, generate = generator_calls()
+
+        result = ReportBuilder(tmp_path / "state", generator=generate).build(datamodel)
+
+        assert set(result.rebuilt.values()) == {'generator'}
+        assert sorted(calls) == ['ack', 'cbfc_cf_update', 'rud_rod_request']
+
+    def test_removed_and_broken(self, datamodel, tmp_path):
+        """Test removed files are dropped and broken files reported."""
+        ReportBuilder(tmp_path / "state").build(datamodel)
+        (datamodel / "cf_update.ksy").unlink()
+        (datamodel / "broken.ksy").write_text("meta: [unclosed\n")
+
+        result = build_report_sections(datamodel, tmp_path / "state")
+
+        assert result.removed == ['cbfc_cf_update']
+        assert list(result.errors)[0].endswith('broken.ksy')
+        assert 'cbfc_cf_update' not in result.sections
+
+    def test_normalize_name(self):
+        """Test related message names match ids and titles."""
+        assert normalize_name("PDS ACK") == normalize_name("pds_ack") == 'pds_ack'
+
+
+class TestReportCommand:
+    """Tests for the report CLI subcommand."""
+
+    def test_report_yaml(self, datamodel, tmp_path):
+        """Test the report subcommand writes a sections YAML document."""
+        output = tmp_path / "report.yaml"
+        with pytest.raises(SystemExit) as exc:
+            main(['report', str(datamodel), '-o', str(output), '--title', 'Taxonomy',
+                  '--state-dir', str(tmp_path / "state")])
+
+        assert exc.value.code == 0
+        document = yaml.safe_load(output.read_text())
+        assert document['title'] == 'Taxonomy'
+        assert document['sections'][0] == {'type': 'section_header', 'title': 'PDS ACK',
+                                           'subtitle': '4 bytes (32 bits)'}
+
+
+class TestWatchBuilds:
+    """Tests for repeated builds on one long-lived builder."""
+
+    def test_sections_kept_in_memory(self, datamodel, tmp_path):
+        """Test unchanged sections are served from memory between builds."""
+        builder = ReportBuilder(tmp_path / "state")
+        first = builder.build(datamodel)
+        for path in (tmp_path / "state" / "sections").iterdir():
+            path.write_text("[]")  # would be visible if re-read from disk
+
+        second = builder.build(datamodel)
+
+        assert second.rebuilt == {}
+        assert second.sections == first.sections
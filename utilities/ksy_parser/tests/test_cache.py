@@ -0,0 +1,87 @@
+"""Tests for ksy_parser.cache module."""
+import os
+import shutil
+import pytest
+from utilities.ksy_parser.parser import KsyParser
+from utilities.ksy_parser.cache import ParseCache
+
+
+@pytest.fixture
+def ksy_copy(cf_update_ksy, tmp_path):
+    """Copy cf_update.ksy into a scratch directory."""
+    path = tmp_path / "src" / "cf_update.ksy"
+    path.parent.mkdir()
+    shutil.copy(cf_update_ksy, path)
+    return path
+
+
+class TestParseCache:
+    """Tests for the persistent parse cache."""
+
+    def test_cache_hit_skips_yaml(self, ksy_copy, tmp_path, monkeypatch):
+        """Test that a second parse is served without YAML loading."""
+        parser = KsyParser(cache_dir=str(tmp_path / "cache"))
+        first = parser.parse(str(ksy_copy))
+
+        import utilities.ksy_parser.parser as parser_module
+        monkeypatch.setattr(parser_module, 'safe_load',
+                            lambda *a, **k: pytest.fail("YAML parsed on cache hit"))
+        second = KsyParser(cache_dir=str(tmp_path / "cache")).parse(str(ksy_copy))
+
+        assert second == first
+        assert second.raw_data == first.raw_data
+
+    def test_modified_file_is_reparsed(self, ksy_copy, tmp_path):
+        """Test that changing the file invalidates the entry."""
+        parser = KsyParser(cache_dir=str(tmp_path / "cache"))
+        parser.parse(str(ksy_copy))
+
+        text = ksy_copy.read_text().replace('id: cbfc_cf_update', 'id: cbfc_cf_update_v2')
+        ksy_copy.write_text(text)
+        st = ksy_copy.stat()
+        os.utime(ksy_copy, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+        assert parser.parse(str(ksy_copy)).id == 'cbfc_cf_update_v2'
+
+    def test_touched_file_uses_content_hash(self, ksy_copy, tmp_path):
+        """Test that an mtime-only change still hits via the content hash."""
+        cache = ParseCache(tmp_path / "cache")
+        header = KsyParser().parse(str(ksy_copy))
+        cache.put(ksy_copy, header)
+
+        st = ksy_copy.stat()
+        os.utime(ksy_copy, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+        assert cache.get(ksy_copy) == header
+
+    def test_hit_survives_failed_lru_touch(self, ksy_copy, tmp_path, monkeypatch):
+        """Test that a hit is served when the entry's mtime cannot be updated."""
+        cache = ParseCache(tmp_path / "cache")
+        header = KsyParser().parse(str(ksy_copy))
+        cache.put(ksy_copy, header)
+
+        def utime(*args, **kwargs):
+            raise PermissionError("read-only cache")
+        monkeypatch.setattr(os, 'utime', utime)
+
+        assert cache.get(ksy_copy) == header
+
+    def test_invalidate_and_clear(self, ksy_copy, tmp_path):
+        """Test explicit invalidation."""
+        cache = ParseCache(tmp_path / "cache")
+        cache.put(ksy_copy, KsyParser().parse(str(ksy_copy)))
+
+        cache.invalidate(ksy_copy)
+        assert cache.get(ksy_copy) is None
+
+        cache.put(ksy_copy, KsyParser().parse(str(ksy_copy)))
+        cache.clear()
+        assert list((tmp_path / "cache").iterdir()) == []
+
+    def test_size_bounded_eviction(self, ksy_copy, vc_state_machine_ksy, tmp_path):
+        """Test that the least recently used entry is evicted over budget."""
+        cache = ParseCache(tmp_path / "cache", max_bytes=1)
+        cache.put(ksy_copy, KsyParser().parse(str(ksy_copy)))
+        cache.put(vc_state_machine_ksy, KsyParser().parse(str(vc_state_machine_ksy)))
+
+        assert len(list((tmp_path / "cache").glob('*.pkl'))) <= 1
@@ -0,0 +1,110 @@
+"""Tests for ksy_parser.capture module."""
+import struct
+import pytest
+from utilities.ksy_parser.parser import KsyParser
+from utilities.ksy_parser.capture import CaptureReader, iter_frames, decode_capture
+from utilities.ksy_parser.tests.test_decoder import RUD_PACKET
+
+CF_UPDATE = bytes([0x5C, 0x10, 0xAD, 0x12, 0x36, 0x00, 0x00, 0x00])
+
+
+def write_pcap(path, frames, nanos=False, order='<'):
+    """Write a classic pcap file of (ts_sec, ts_frac, data) frames."""
+    magic = 0xA1B23C4D if nanos else 0xA1B2C3D4
+    out = [struct.pack(order + 'IHHiIII', magic, 2, 4, 0, 0, 65535, 1)]
+    for ts_sec, ts_frac, data in frames:
+        out.append(struct.pack(order + 'IIII', ts_sec, ts_frac, len(data), len(data)) + data)
+    path.write_bytes(b''.join(out))
+
+
+def pcapng_block(block_type, body):
+    body += b'\x00' * (-len(body) % 4)
+    length = len(body) + 12
+    return struct.pack('<II', block_type, length) + body + struct.pack('<I', length)
+
+
+def write_pcapng(path, frames):
+    """Write a pcapng file with one nanosecond-resolution interface."""
+    shb = pcapng_block(0x0A0D0D0A, struct.pack('<IHHq', 0x1A2B3C4D, 1, 0, -1))
+    tsresol = struct.pack('<HHB', 9, 1, 9) + b'\x00' * 3 + struct.pack('<HH', 0, 0)
+    idb = pcapng_block(1, struct.pack('<HHI', 1, 0, 65535) + tsresol)
+    blocks = [shb, idb]
+    for ts, data in frames:
+        blocks.append(pcapng_block(6, struct.pack('<IIIII', 0, ts >> 32, ts & 0xFFFFFFFF,
+                                                  len(data), len(data)) + data))
+    path.write_bytes(b''.join(blocks))
+
+
+class TestCaptureReader:
+    """Tests for frame iteration."""
+
+    def test_pcap_frames(self, tmp_path):
+        """Test classic pcap iteration with microsecond timestamps."""
+        path = tmp_path / "cap.pcap"
+        write_pcap(path, [(1, 500, b'abc'), (2, 0, b'defg')])
+
+        frames = [(f.index, f.timestamp_ns, bytes(f.data), f.linktype) for f in iter_frames(path)]
+        assert frames == [(0, 1_000_500_000, b'abc', 1), (1, 2_000_000_000, b'defg', 1)]
+
+    def test_pcap_big_endian_nanosecond(self, tmp_path):
+        """Test big-endian, nanosecond-resolution pcap."""
+        path = tmp_path / "cap.pcap"
+        write_pcap(path, [(1, 7, b'xy')], nanos=True, order='>')
+
+        frame = next(iter_frames(path))
+        assert frame.timestamp_ns == 1_000_000_007
+        assert bytes(frame.data) == b'xy'
+
+    def test_pcapng_frames(self, tmp_path):
+        """Test pcapng enhanced packet blocks with if_tsresol."""
+        path = tmp_path / "cap.pcapng"
+        write_pcapng(path, [(123_456_789_012, b'hello'), (5, b'x')])
+
+        with CaptureReader(path) as reader:
+            assert reader.format == 'pcapng'
+            frames = [(f.timestamp_ns, bytes(f.data)) for f in reader]
+        assert frames == [(123_456_789_012, b'hello'), (5, b'x')]
+
+    def test_frames_are_views(self, tmp_path):
+        """Test that frame data is a zero-copy memoryview."""
+        path = tmp_path / "cap.pcap"
+        write_pcap(path, [(0, 0, b'abc')])
+
+        with CaptureReader(path) as reader:
+            frame = next(iter(reader))
+            assert isinstance(frame.data, memoryview)
+
+    def test_rejects_non_capture(self, tmp_path):
+        """Test that unknown formats raise ValueError."""
+        path = tmp_path / "junk.bin"
+        path.write_bytes(b'\x00' * 64)
+        with pytest.raises(ValueError):
+            CaptureReader(path)
+
+
+class TestDecodeCapture:
+    """Tests for decode_capture function."""
+
+    def test_decode_stack(self, tmp_path, rud_rod_request_ksy, cf_update_ksy):
+        """Test decoding frames through a two-header stack at an offset."""
+        parser = KsyParser()
+        stack = [parser.parse(str(rud_rod_request_ksy)), parser.parse(str(cf_update_ksy))]
+        path = tmp_path / "cap.pcapng"
+        write_pcapng(path, [(0, b'\xee\xee' + RUD_PACKET + CF_UPDATE + b'payload'),
+                            (1, b'\xee\xee' + RUD_PACKET)])
+
+        records = list(decode_capture(path, stack, offset=2))
+
+        assert len(records) == 1
+        assert records[0]['rud_rod_request']['psn'] == 0x12345678
+        assert records[0]['cbfc_cf_update']['control_char'] == 0x5C
+        assert records[0]['payload_offset'] == 22
+
+    def test_decode_strict_raises(self, tmp_path, rud_rod_request_ksy):
+        """Test that strict mode raises on short frames."""
+        header = KsyParser().parse(str(rud_rod_request_ksy))
+        path = tmp_path / "cap.pcap"
+        write_pcap(path, [(0, 0, RUD_PACKET[:4])])
+
+        with pytest.raises(ValueError):
+            list(decode_capture(path, [header], strict=True))
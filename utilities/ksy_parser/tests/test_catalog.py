@@ -0,0 +1,179 @@
+"""Tests for ksy_parser.catalog module."""
+import os
+import shutil
+
+import pytest
+from utilities.ksy_parser.catalog import CATALOG_SCHEMA_VERSION, DatamodelCatalog, build_catalog
+
+
+@pytest.fixture
+def datamodel(tmp_path, fixtures_dir):
+    root = tmp_path / 'datamodel'
+    root.mkdir()
+    for path in fixtures_dir.glob('*.ksy'):
+        shutil.copy(path, root / path.name)
+    return root
+
+
+@pytest.fixture
+def catalog(datamodel, tmp_path):
+    with build_catalog(datamodel, tmp_path / 'datamodel.db', workers=1) as catalog:
+        yield catalog
+
+
+def bump(path, old, new):
+    """Rewrite a file and force a different mtime."""
+    path.write_text(path.read_text().replace(old, new))
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+class TestQueries:
+    """Tests for catalog query methods."""
+
+    def test_headers_and_fields(self, catalog):
+        """Test that headers and their fields are stored in wire order."""
+        assert catalog.header_ids() == ['cbfc_cf_update', 'rud_rod_request', 'vc_state_machine']
+        fields = catalog.fields_of('rud_rod_request')
+        assert [f.name for f in fields][:3] == ['type', 'next_hdr', 'rsvd_hi']
+        psn = next(f for f in fields if f.name == 'psn')
+        assert (psn.size_bits, psn.offset_bits) == (32, 32)
+
+    def test_field_lookup(self, catalog):
+        """Test lookups by field name and enum type."""
+        assert catalog.headers_with_field('psn') == ['rud_rod_request']
+        assert [f.header_id for f in catalog.fields_named('type')] == ['rud_rod_request']
+        assert catalog.headers_using_enum('pds_type') == ['rud_rod_request']
+        assert catalog.headers_with_field('missing') == []
+
+    def test_enum_values(self, catalog):
+        """Test that enum values are queryable by enum name."""
+        values = catalog.enum_values('cbfc_message_type', header_id='cbfc_cf_update')
+        assert values
+        assert all(isinstance(v, int) for v in values)
+
+    def test_spec_ref_search(self, catalog):
+        """Test exact and prefix citation searches."""
+        assert [f.name for f in catalog.fields_citing('Section 3.5.8')] == ['psn']
+        assert catalog.fields_citing('Section 3.5') == []
+        assert [f.name for f in catalog.fields_citing('Section 3.5', prefix=True)] == ['psn']
+        assert catalog.fields_citing('Section 3.5.', prefix=True) == \
+            catalog.fields_citing('Section 3.5', prefix=True)
+        assert 'cbfc_cf_update' in catalog.headers_citing('Table 5-20')
+        assert catalog.headers_citing('Section 5.2', prefix=True) == ['cbfc_cf_update', 'vc_state_machine']
+
+    def test_state_machine(self, catalog):
+        """Test that transitions and states are stored."""
+        assert ('DISABLED', 'start', 'INITIALIZING') in catalog.transitions_of('vc_state_machine')
+        rows = catalog.query("SELECT name FROM states WHERE is_initial = 1")
+        assert rows == [('DISABLED',)]
+
+    def test_size_summary(self, catalog):
+        """Test size aggregates overall and grouped by layer."""
+        [total] = catalog.size_summary()
+        assert (total.headers, total.total_bytes, total.max_bytes) == (3, 20, 12)
+
+        by_layer = {a.group: a for a in catalog.size_summary('layer')}
+        assert by_layer['transport'].total_bytes == 12
+        assert by_layer['link'].headers == 2
+        with pytest.raises(ValueError):
+            catalog.size_summary('title; DROP TABLE headers')
+
+
+class TestRefresh:
+    """Tests for incremental refresh."""
+
+    def test_unchanged_tree_is_not_reparsed(self, datamodel, catalog):
+        """Test that a second refresh touches nothing."""
+        result = catalog.refresh(datamodel, workers=1)
+        assert len(result.unchanged) == 3
+        assert not (result.added or result.updated or result.removed)
+
+    def test_touched_file_with_same_content(self, datamodel, catalog):
+        """Test that a new mtime with identical content is not re-parsed."""
+        bump(datamodel / 'cf_update.ksy', 'meta:', 'meta:')
+        result = catalog.refresh(datamodel, workers=1)
+        assert len(result.unchanged) == 3
+        assert catalog.refresh(datamodel, workers=1).updated == []
+
+    def test_changed_added_and_removed_files(self, datamodel, catalog):
+        """Test that edits, new files and deletions are applied."""
+        bump(datamodel / 'rud_rod_request.ksy', 'id: psn', 'id: packet_seq')
+        shutil.copy(datamodel / 'cf_update.ksy', datamodel / 'copy.ksy')
+        bump(datamodel / 'copy.ksy', 'id: cbfc_cf_update', 'id: cbfc_cf_update_copy')
+        (datamodel / 'vc_state_machine.ksy').unlink()
+
+        result = catalog.refresh(datamodel, workers=1)
+
+        assert [os.path.basename(p) for p in result.updated] == ['rud_rod_request.ksy']
+        assert [os.path.basename(p) for p in result.added] == ['copy.ksy']
+        assert [os.path.basename(p) for p in result.removed] == ['vc_state_machine.ksy']
+        assert catalog.headers_with_field('packet_seq') == ['rud_rod_request']
+        assert catalog.headers_with_field('psn') == []
+        assert catalog.header_ids() == ['cbfc_cf_update', 'cbfc_cf_update_copy', 'rud_rod_request']
+        assert catalog.transitions_of('vc_state_machine') == []
+        assert catalog.query("SELECT COUNT(*) FROM states") == [(0,)]
+
+    def test_parse_error_is_recorded_and_retried(self, datamodel, catalog):
+        """Test that broken files are reported and picked up once fixed."""
+        path = datamodel / 'rud_rod_request.ksy'
+        good = path.read_text()
+        bump(path, 'meta:', 'meta: [')
+        result = catalog.refresh(datamodel, workers=1)
+        assert list(result.errors) == [str(path.resolve())]
+        assert 'rud_rod_request' not in catalog.header_ids()
+
+        path.write_text(good)
+        result = catalog.refresh(datamodel, workers=1)
+        assert not result.errors
+        assert 'rud_rod_request' in catalog.header_ids()
+
+    def test_duplicate_id_is_rejected(self, datamodel, catalog):
+        """Test that a second file with a catalogued id is an error, not a second header."""
+        copy = datamodel / 'zz_copy.ksy'
+        shutil.copy(datamodel / 'cf_update.ksy', copy)
+
+        result = catalog.refresh(datamodel, workers=1)
+
+        assert list(result.errors) == [str(copy.resolve())]
+        assert 'Duplicate id' in result.errors[str(copy.resolve())]
+        assert catalog.header_ids().count('cbfc_cf_update') == 1
+        assert len(catalog.fields_of('cbfc_cf_update')) == 8
+        assert catalog.size_summary()[0].headers == 3
+        assert catalog.query("SELECT error IS NOT NULL FROM files WHERE path = ?",
+                             (str(copy.resolve()),)) == [(1,)]
+
+        (datamodel / 'cf_update.ksy').unlink()
+        result = catalog.refresh(datamodel, workers=1)
+        assert not result.errors
+        assert catalog.header_path('cbfc_cf_update') == str(copy.resolve())
+
+    def test_parallel_refresh(self, datamodel, tmp_path):
+        """Test that a process pool produces the same catalog."""
+        with build_catalog(datamodel, tmp_path / 'parallel.db', workers=2) as catalog:
+            assert catalog.header_ids() == ['cbfc_cf_update', 'rud_rod_request', 'vc_state_machine']
+
+    def test_reopen_and_schema_version(self, datamodel, tmp_path):
+        """Test that the catalog persists and is rebuilt on a schema change."""
+        db = tmp_path / 'datamodel.db'
+        build_catalog(datamodel, db, workers=1).close()
+
+        with DatamodelCatalog(db) as catalog:
+            assert len(catalog.header_ids()) == 3
+            catalog.conn.execute("UPDATE meta SET value = ? WHERE key = 'schema_version'",
+                                 (str(CATALOG_SCHEMA_VERSION + 1),))
+            catalog.conn.commit()
+
+        with DatamodelCatalog(db) as catalog:
+            assert catalog.header_ids() == []
+
+    def test_cli_catalog(self, datamodel, tmp_path):
+        """Test the catalog CLI command creates the database."""
+        from utilities.ksy_parser.cli import main
+
+        with pytest.raises(SystemExit) as exc:
+            main(['catalog', str(datamodel), '-o', str(tmp_path / 'cli.db'), '-j', '1'])
+
+        assert exc.value.code == 0
+        with DatamodelCatalog(tmp_path / 'cli.db') as catalog:
+            assert len(catalog.header_ids()) == 3
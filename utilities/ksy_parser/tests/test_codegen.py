@@ -0,0 +1,194 @@
+"""Tests for ksy_parser.codegen module."""
+import os
+import shutil
+
+import pytest
+from utilities.ksy_parser.parser import KsyParser, KsyHeader, KsyField
+from utilities.ksy_parser.codegen import (
+    build_storage_units,
+    class_name,
+    generate_module_source,
+    load_generated_module,
+    module_cache_key,
+    struct_format,
+    write_generated_module,
+)
+
+
+def mixed_header() -> KsyHeader:
+    """Little-endian header with big-endian bits, a u2be and raw bytes."""
+    return KsyHeader(
+        id='mixed_hdr', title='Mixed', size_bytes=10, doc='',
+        fields=[
+            KsyField('flags', 'b4', 4, 0, ''),
+            KsyField('count', 'b20', 20, 4, ''),
+            KsyField('word', 'u2', 16, 24, ''),
+            KsyField('port', 'u2be', 16, 40, ''),
+            KsyField('delta', 's1', 8, 56, ''),
+            KsyField('tag', '', 16, 64, ''),
+        ],
+        endian='le', bit_endian='be')
+
+
+class TestStorageUnits:
+    """Tests for build_storage_units and struct_format."""
+
+    def test_bit_groups_become_whole_byte_members(self, rud_rod_request_ksy):
+        """Test that sub-byte fields share one native storage member."""
+        header = KsyParser().parse(str(rud_rod_request_ksy))
+        units = build_storage_units(header)
+
+        assert [(u.member, u.ctype) for u in units] == [
+            ('_bits0', 'c_uint16'), ('clear_psn_offset', 'c_uint16'), ('psn', 'c_uint32'),
+            ('spdcid', 'c_uint16'), ('dpdcid', 'c_uint16'),
+        ]
+        assert [p.name for p in units[0].fields][:2] == ['type', 'next_hdr']
+
+    def test_foreign_byte_order_uses_byte_arrays(self):
+        """Test that 3-byte groups and foreign-endian integers are raw arrays."""
+        units = {u.member: u for u in build_storage_units(mixed_header())}
+
+        assert units['_bits0'].ctype is None
+        assert units['_bits0'].size == 3
+        assert units['word'].ctype == 'c_uint16'
+        assert units['_raw_port'].ctype is None
+        assert units['delta'].ctype == 'c_int8'
+
+    def test_struct_format(self, cf_update_ksy, rud_rod_request_ksy):
+        """Test that only byte-aligned layouts get a struct format."""
+        assert struct_format(KsyParser().parse(str(cf_update_ksy))) == '<BBBBBBBB'
+        assert struct_format(KsyParser().parse(str(rud_rod_request_ksy))) is None
+        header = KsyHeader(
+            id='t', title='', size_bytes=7, doc='',
+            fields=[KsyField('a', 's2', 16, 0, ''), KsyField('b', 'u1', 8, 16, ''),
+                    KsyField('raw', '', 32, 24, '')])
+        assert struct_format(header) == '>hB4s'
+
+    def test_invalid_field_name(self):
+        """Test that field names that cannot be attributes are rejected."""
+        header = KsyHeader(id='t', title='', size_bytes=1, doc='',
+                           fields=[KsyField('class', 'u1', 8, 0, '')])
+        with pytest.raises(ValueError):
+            build_storage_units(header)
+
+    def test_zero_size_layout_rejected(self, vc_state_machine_ksy):
+        """Test that state-machine-only headers get no overlay module."""
+        with pytest.raises(ValueError, match='no sized fields'):
+            generate_module_source(KsyParser().parse(str(vc_state_machine_ksy)))
+
+    def test_class_name(self):
+        """Test CamelCase class names."""
+        assert class_name('rud_rod_request') == 'RudRodRequest'
+        assert class_name('1bad') == 'Header'
+
+
+class TestGeneratedModule:
+    """Tests for generated modules."""
+
+    def test_matches_compiled_decoder(self, rud_rod_request_ksy, cf_update_ksy):
+        """Test that generated decoders agree with compile_decoder on random data."""
+        for path in (rud_rod_request_ksy, cf_update_ksy):
+            header = KsyParser().parse(str(path))
+            module = load_generated_module(header)
+            decode = header.compile_decoder()
+            buf = bytearray(os.urandom(module.SIZE * 4))
+
+            assert module.decode(buf) == decode(buf)
+            assert list(module.iter_decode(buf)) == [
+                decode(buf, offset) for offset in range(0, len(buf), module.SIZE)]
+
+    def test_mixed_layout_matches_compiled_decoder(self):
+        """Test byte arrays, foreign-endian integers and signed fields."""
+        header = mixed_header()
+        module = load_generated_module(header)
+        buf = bytes(range(0xf0, 0xfa))
+
+        assert module.decode(buf) == header.compile_decoder()(buf)
+        assert module.decode(buf)['delta'] < 0
+
+    def test_view_is_zero_copy(self, rud_rod_request_ksy):
+        """Test that views over writable buffers see later writes."""
+        module = KsyParser().parse(str(rud_rod_request_ksy)).compile_struct_module()
+        buf = bytearray(module.SIZE * 3)
+        headers = module.view_array(buf)
+        single = module.view(memoryview(buf), module.SIZE)
+
+        buf[module.SIZE + 4:module.SIZE + 8] = (0x12345678).to_bytes(4, 'big')
+        buf[2 * module.SIZE] = 0x02 << 3
+
+        assert len(headers) == 3
+        assert headers[1].psn == 0x12345678
+        assert single.psn == 0x12345678
+        assert headers[2].type == 0x02
+
+    def test_view_read_only_buffer_copies(self, rud_rod_request_ksy):
+        """Test that read-only buffers fall back to a copied view."""
+        module = KsyParser().parse(str(rud_rod_request_ksy)).compile_struct_module()
+        packet = bytes(4) + (7).to_bytes(4, 'big') + bytes(4)
+
+        assert module.view(packet).psn == 7
+
+    def test_iter_decode_rejects_bad_stride(self, cf_update_ksy):
+        """Test that a non-positive stride raises instead of looping."""
+        module = load_generated_module(KsyParser().parse(str(cf_update_ksy)))
+        with pytest.raises(ValueError):
+            list(module.iter_decode(bytes(16), 0))
+
+    def test_source_is_deterministic(self, rud_rod_request_ksy):
+        """Test that regenerating a header yields identical source."""
+        header = KsyParser().parse(str(rud_rod_request_ksy))
+        assert generate_module_source(header) == generate_module_source(header)
+        assert "class RudRodRequest(ctypes.BigEndianStructure):" in generate_module_source(header)
+
+
+class TestModuleCache:
+    """Tests for writing and caching generated modules."""
+
+    def test_write_module_to_directory(self, cf_update_ksy, tmp_path):
+        """Test writing a module named after the header id."""
+        header = KsyParser().parse(str(cf_update_ksy))
+        path = write_generated_module(header, tmp_path)
+
+        assert path == tmp_path / 'cbfc_cf_update.py'
+        namespace = {}
+        exec(path.read_text(), namespace)
+        assert namespace['STRUCT'].size == 8
+
+    def test_cache_dir_reuses_module(self, rud_rod_request_ksy, tmp_path):
+        """Test that cached modules are keyed by the input hash."""
+        source = tmp_path / 'rud.ksy'
+        shutil.copy(rud_rod_request_ksy, source)
+        header = KsyParser().parse(str(source))
+        cache = tmp_path / 'gen'
+
+        key = module_cache_key(header)
+        module = load_generated_module(header, cache)
+        files = list(cache.glob('ksy_rud_rod_request_*.py'))
+        assert len(files) == 1
+        assert load_generated_module(header, cache) is module
+
+        source.write_text(source.read_text().replace('PDS RUD/ROD', 'PDS'))
+        assert module_cache_key(header) != key
+        load_generated_module(header, cache)
+        assert len(list(cache.glob('ksy_rud_rod_request_*.py'))) == 2
+
+    def test_cli_codegen(self, rud_rod_request_ksy, tmp_path):
+        """Test the codegen CLI command writes one module per header."""
+        from utilities.ksy_parser.cli import main
+
+        with pytest.raises(SystemExit) as exc:
+            main(['codegen', str(rud_rod_request_ksy), '-o', str(tmp_path / 'gen')])
+
+        assert exc.value.code == 0
+        assert (tmp_path / 'gen' / 'rud_rod_request.py').exists()
+
+    def test_cli_codegen_skips_zero_size_headers(self, fixtures_dir, tmp_path):
+        """Test that a datamodel with a state-machine-only header still succeeds."""
+        from utilities.ksy_parser.cli import main
+
+        with pytest.raises(SystemExit) as exc:
+            main(['codegen', str(fixtures_dir), '-o', str(tmp_path / 'gen')])
+
+        assert exc.value.code == 0
+        assert sorted(p.name for p in (tmp_path / 'gen').glob('*.py')) == [
+            'cbfc_cf_update.py', 'rud_rod_request.py']
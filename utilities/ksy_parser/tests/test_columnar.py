@@ -0,0 +1,105 @@
+"""Tests for ksy_parser.columnar module."""
+import pytest
+from utilities.ksy_parser.parser import KsyParser, KsyHeader, KsyField
+from utilities.ksy_parser.columnar import (
+    PacketColumnWriter,
+    detect_format,
+    header_schema,
+    iter_packet_batches,
+    read_packet_table,
+    write_packet_file,
+)
+from utilities.ksy_parser.tests.test_batch import rud_packet
+
+np = pytest.importorskip("numpy")
+pa = pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def rud_header(rud_rod_request_ksy):
+    return KsyParser().parse(str(rud_rod_request_ksy))
+
+
+def rud_data(count: int, start: int = 0) -> bytes:
+    return b''.join(rud_packet(psn, psn % 16) for psn in range(start, start + count))
+
+
+class TestSchema:
+    """Tests for header_schema and detect_format."""
+
+    def test_schema_types(self, rud_header):
+        """Test integer widths and dictionary-encoded enum fields."""
+        schema = header_schema(rud_header)
+
+        assert schema.names[:4] == ['type', 'type_code', 'next_hdr', 'next_hdr_code']
+        assert pa.types.is_dictionary(schema.field('type').type)
+        assert schema.field('next_hdr_code').type == pa.uint8()
+        assert schema.field('type').metadata[b'ksy.enum'] == b'pds_type'
+        assert schema.field('psn').type == pa.uint32()
+        assert schema.field('retx').type == pa.uint8()
+        assert schema.metadata[b'ksy.header'] == b'rud_rod_request'
+
+    def test_schema_without_enums_and_raw_bytes(self):
+        """Test signed, raw byte and plain enum-less columns."""
+        header = KsyHeader(
+            id='t', title='', size_bytes=4, doc='',
+            fields=[KsyField('delta', 's2', 16, 0, ''), KsyField('tag', '', 16, 16, '')])
+        schema = header_schema(header, encode_enums=False)
+
+        assert schema.field('delta').type == pa.int16()
+        assert schema.field('tag').type == pa.binary(2)
+
+    def test_detect_format(self):
+        """Test format detection by suffix and override."""
+        assert detect_format('a.parquet') == 'parquet'
+        assert detect_format('a.arrow') == 'arrow'
+        assert detect_format('a.bin', 'arrow') == 'arrow'
+        with pytest.raises(ValueError):
+            detect_format('a.bin')
+
+    def test_unknown_field(self, rud_header):
+        """Test that selecting an undefined field raises KeyError."""
+        with pytest.raises(KeyError):
+            header_schema(rud_header, fields=['nope'])
+
+
+@pytest.mark.parametrize('suffix', ['parquet', 'arrow'])
+class TestRoundTrip:
+    """Tests for writing and reading packet files."""
+
+    def test_write_packets_bounded_row_groups(self, rud_header, tmp_path, suffix):
+        """Test that raw packets stream into fixed-size row groups."""
+        path = tmp_path / f'rud.{suffix}'
+        rows = write_packet_file(rud_header, path, [rud_data(250), rud_data(100, 250)],
+                                 row_group_size=120)
+
+        assert rows == 350
+        assert [b.num_rows for b in iter_packet_batches(path)] == [120, 120, 110]
+
+    def test_projection_and_values(self, rud_header, tmp_path, suffix):
+        """Test reading selected fields back with enum labels."""
+        path = tmp_path / f'rud.{suffix}'
+        write_packet_file(rud_header, path, [rud_data(20)])
+
+        table = read_packet_table(path, fields=['psn', 'type', 'next_hdr', 'next_hdr_code'])
+
+        assert table.column_names == ['psn', 'type', 'next_hdr', 'next_hdr_code']
+        assert table.column('psn').to_pylist() == list(range(20))
+        assert set(table.column('type').to_pylist()) == {'rod_request'}
+        assert table.column('next_hdr').to_pylist()[:5] == [
+            'uet_hdr_none', 'uet_hdr_request_small', 'uet_hdr_request_medium',
+            'uet_hdr_request_std', 'unknown']
+        # Undefined codes keep their raw value next to the 'unknown' label
+        assert table.column('next_hdr_code').to_pylist()[:5] == [0, 1, 2, 3, 4]
+
+    def test_records_match_columns(self, rud_header, tmp_path, suffix):
+        """Test that per-record and columnar writes produce the same table."""
+        data = rud_data(30)
+        decode = rud_header.compile_decoder()
+        by_columns, by_records = tmp_path / f'a.{suffix}', tmp_path / f'b.{suffix}'
+
+        write_packet_file(rud_header, by_columns, [rud_header.compile_batch_decoder()(data)])
+        with PacketColumnWriter(rud_header, by_records, row_group_size=8) as writer:
+            writer.write_records(decode(data, i * 12) for i in range(30))
+
+        assert read_packet_table(by_columns).equals(read_packet_table(by_records))
@@ -0,0 +1,195 @@
+"""Tests for ksy_parser.conformance module."""
+import json
+import struct
+import tracemalloc
+import pytest
+from utilities.ksy_parser.state_machine import StateMachine, State, Transition
+from utilities.ksy_parser.executor import compile_state_machine
+from utilities.ksy_parser.conformance import (
+    EntityStateStore, TraceChecker, check_trace, read_binary_events, read_csv_events,
+    generate_conformance_tables,
+)
+
+
+@pytest.fixture
+def sm():
+    """Simple VC lifecycle: DISABLED -> ACTIVE -> REMOVED (terminal)."""
+    return StateMachine(
+        name='VC',
+        initial_state='DISABLED',
+        states=[State('DISABLED', ''), State('ACTIVE', ''), State('REMOVED', '', is_terminal=True),
+                State('FAILED', '', is_terminal=True)],
+        transitions=[
+            Transition('DISABLED', 'ACTIVE', 'start'),
+            Transition('ACTIVE', 'REMOVED', 'remove'),
+            Transition('ACTIVE', 'FAILED', 'fail'),
+        ],
+    )
+
+
+EVENTS = [
+    (1, 'start', 0.0), (2, 'start', 1.0), (1, 'remove', 10.0),
+    (2, 'start', 12.0), (3, 'remove', 13.0), (2, 'remove', 21.0),
+]
+
+
+class TestEntityStateStore:
+    """Tests for EntityStateStore."""
+
+    @staticmethod
+    def bytes_per_entity(ids):
+        tracemalloc.start()
+        try:
+            store = EntityStateStore(4)
+            for entity in ids:
+                states, _, index = store.locate(entity)
+                states[index] = 1
+            used = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        assert store.entities == len(ids)
+        assert store.nbytes <= used
+        return used / len(ids)
+
+    def test_small_integer_ids_are_direct(self):
+        """Test small integer ids index the state arrays directly."""
+        store = EntityStateStore(4)
+
+        states, entered, index = store.locate(7)
+        assert (states, entered, index) == (store.state, store.entered, 7)
+        assert store.state.itemsize == 1
+        states[index] = 2
+        assert store.locate(7)[2] == 7
+        assert list(store.seen()) == [2]
+
+    def test_sparse_integer_ids_are_mapped(self):
+        """Test sparse 64-bit ids map to dense slots without growing the direct arrays."""
+        store = EntityStateStore(4)
+
+        slots = [store.locate(e)[2] for e in (2**63 + 5, 50_000_000, 2**63 + 5)]
+        assert slots == [0, 1, 0]
+        assert store.locate(2**63 + 5)[0] is store.mapped_state
+        assert len(store.state) == 0
+        assert store.nbytes < 64 * 1024
+
+    def test_string_and_mixed_ids(self):
+        """Test non-integer ids share the mapped slots with sparse integer ids."""
+        store = EntityStateStore(4)
+
+        slots = [store.locate(e)[2] for e in ('vc-a', 2**40, 'vc-b', 3, 'vc-a', 2**40)]
+        assert slots == [0, 1, 2, 3, 0, 1]
+        assert store.entities == 4
+
+    @pytest.mark.parametrize('ids', [
+        range(20_000),
+        [(i * 0x9E3779B97F4A7C15) & (2**64 - 1) for i in range(20_000)],
+        [f'vc-{i}' for i in range(20_000)],
+    ], ids=['dense', 'sparse64', 'str'])
+    def test_memory_per_entity(self, ids):
+        """Test total traced memory per entity, including the id map, stays small."""
+        assert self.bytes_per_entity(list(ids)) < 64
+
+
+class TestTraceChecker:
+    """Tests for TraceChecker."""
+
+    def test_report(self, sm):
+        """Test illegal transitions, final states and dwell statistics."""
+        report = TraceChecker(sm).feed_many(iter(EVENTS)).report()
+
+        assert (report.events, report.entities, report.illegal) == (6, 3, 2)
+        assert report.illegal_by_pair == {('ACTIVE', 'start'): 1, ('DISABLED', 'remove'): 1}
+        assert report.examples[0] == (3, 2, 'ACTIVE', 'start')
+        assert report.final_states == {'DISABLED': 1, 'REMOVED': 2}
+        assert report.unterminated == 1
+        assert report.terminal_never_reached == ['FAILED']
+        assert report.dwell['ACTIVE'].count == 2
+        assert report.dwell['ACTIVE'].mean == 15.0
+        assert (report.dwell['ACTIVE'].minimum, report.dwell['ACTIVE'].maximum) == (10.0, 20.0)
+
+    def test_out_of_range_code_is_illegal(self, sm):
+        """Test trigger codes past the machine's triggers are rejected, not aliased."""
+        checker = TraceChecker(sm)
+        checker.feed_code(1, 3)
+        checker.feed_code(1, 1000)
+        report = checker.report()
+
+        assert report.illegal == 2
+        assert report.illegal_by_pair == {('DISABLED', '3'): 1, ('DISABLED', '1000'): 1}
+        assert report.final_states == {'DISABLED': 1}
+
+    def test_codes_match_names(self, sm):
+        """Test feeding trigger codes gives the same report."""
+        executor = compile_state_machine(sm)
+        codes = [(e, executor.trigger_index[t], ts) for e, t, ts in EVENTS]
+
+        assert TraceChecker(executor).feed_many(iter(codes)).report() == \
+            TraceChecker(executor).feed_many(iter(EVENTS)).report()
+
+
+class TestReaders:
+    """Tests for trace file readers."""
+
+    def test_csv(self, sm, tmp_path):
+        """Test CSV traces are read incrementally."""
+        path = tmp_path / 'trace.csv'
+        path.write_text('timestamp,entity,trigger\n' +
+                        ''.join(f"{ts},{e},{t}\n" for e, t, ts in EVENTS))
+
+        report = check_trace(sm, path)
+
+        assert report.illegal == 2
+        assert report.final_states == {'DISABLED': 1, 'REMOVED': 2}
+
+    def test_csv_mixed_ids(self, sm, tmp_path):
+        """Test CSV traces mixing numeric and named entity ids."""
+        path = tmp_path / 'trace.csv'
+        path.write_text('entity,trigger\n7,start\nvc-a,start\n7,remove\nvc-a,fail\n')
+
+        report = check_trace(sm, path)
+
+        assert report.illegal == 0
+        assert report.final_states == {'REMOVED': 1, 'FAILED': 1}
+        assert [e for e, _, _ in read_csv_events(path)] == [7, 'vc-a', 7, 'vc-a']
+
+    def test_jsonl(self, sm, tmp_path):
+        """Test JSONL traces with custom keys."""
+        path = tmp_path / 'trace.jsonl'
+        path.write_text(''.join(json.dumps({'vc': e, 'event': t}) + '\n' for e, t, _ in EVENTS))
+
+        report = check_trace(sm, path, entity='vc', trigger='event', timestamp=None)
+
+        assert report.illegal == 2
+        assert report.dwell == {}
+
+    def test_binary(self, sm, tmp_path):
+        """Test binary records with trigger code translation."""
+        executor = compile_state_machine(sm)
+        file_codes = {'remove': 0, 'start': 1}
+        path = tmp_path / 'trace.bin'
+        path.write_bytes(b''.join(struct.pack('<QIq', e, file_codes[t], int(ts)) for e, t, ts in EVENTS))
+        translate = [executor.trigger_index['remove'], executor.trigger_index['start']]
+
+        assert next(read_binary_events(path, trigger_codes=translate)) == (1, executor.trigger_index['start'], 0)
+        report = check_trace(executor, path, trigger_codes=translate)
+
+        assert report.illegal == 2
+        assert report.dwell['ACTIVE'].mean == 15.0
+
+    def test_unknown_format(self, sm, tmp_path):
+        """Test unknown suffixes are rejected."""
+        with pytest.raises(ValueError):
+            check_trace(sm, tmp_path / 'trace.parquet')
+
+
+class TestTables:
+    """Tests for generate_conformance_tables function."""
+
+    def test_tables(self, sm):
+        """Test summary, illegal transition and dwell tables."""
+        report = TraceChecker(sm).feed_many(iter(EVENTS)).report()
+        sections = generate_conformance_tables(report)
+
+        assert [s['title'] for s in sections] == \
+            ['VC Trace Conformance', 'VC Illegal Transitions', 'VC Dwell Times']
+        assert ['ACTIVE', 'start', '1'] in sections[1]['rows']
@@ -0,0 +1,133 @@
+"""Tests for ksy_parser.constraints module."""
+import pytest
+from utilities.ksy_parser.parser import KsyParser, KsyHeader, KsyField
+from utilities.ksy_parser.constraints import (
+    extract_constraints, compile_validator, validate_packets, generate_violation_table,
+)
+from utilities.ksy_parser.tests.test_decoder import RUD_PACKET
+
+
+@pytest.fixture
+def header(rud_rod_request_ksy):
+    """Parsed PDS request header with x-constraint and x-packet constraints."""
+    return KsyParser().parse(str(rud_rod_request_ksy))
+
+
+@pytest.fixture
+def record(header):
+    """Valid decoded PDS request."""
+    return header.compile_decoder()(RUD_PACKET)
+
+
+class TestExtractConstraints:
+    """Tests for extract_constraints function."""
+
+    def test_field_constraints_bind_value(self, header):
+        """Test 'value' in x-constraint is bound to the field."""
+        constraints, _ = extract_constraints(header)
+        by_field = {c.field: c.expr for c in constraints if c.source == 'x-constraint'}
+
+        assert by_field['type'] == 'type == 0x01 or type == 0x02'
+        assert by_field['spdcid'] == 'spdcid != 0'
+
+    def test_prose_constraints(self, header):
+        """Test "<fields> MUST be <values>" prose is compiled."""
+        constraints, skipped = extract_constraints(header)
+        packet = {c.name: c.expr for c in constraints if c.source == 'x-packet'}
+
+        assert packet['type MUST be 0x01 (RUD) or 0x02 (ROD)'] == '(type == 1 or type == 2)'
+        assert packet['rsvd_hi and rsvd_lo MUST be 0'] == '(rsvd_hi == 0) and (rsvd_lo == 0)'
+        assert skipped == []
+
+    def test_unrecognized_prose_skipped(self, cf_update_ksy):
+        """Test prose about unknown subjects is reported, not compiled."""
+        header = KsyParser().parse(str(cf_update_ksy))
+        _, skipped = extract_constraints(header)
+
+        assert "CF1_VC_index is 5-bit value (0 to 31)" in skipped
+
+    def test_expression_and_enum_constraints(self):
+        """Test x-packet entries that are expressions, including enum ids."""
+        header = KsyHeader(
+            id='h', title='h', size_bytes=2, doc='',
+            fields=[KsyField('kind', 'u1', 8, 0, '', enum_type='kinds'),
+                    KsyField('len', 'u1', 8, 8, '')],
+            enums={'kinds': {1: 'data', 2: 'ack'}},
+            x_packet={'constraints': ['kind MUST NOT be ack', 'len >= 4 or kind == kinds::ack']},
+        )
+        validator = compile_validator(header)
+
+        assert validator.check({'kind': 1, 'len': 8}) == []
+        assert validator.check({'kind': 2, 'len': 0}) == ['kind MUST NOT be ack']
+        assert validator.check({'kind': 1, 'len': 0}) == ['len >= 4 or kind == kinds::ack']
+
+
+class TestScalarValidator:
+    """Tests for scalar validation."""
+
+    def test_valid_record(self, header, record):
+        """Test a conforming packet violates nothing."""
+        assert header.compile_validator().check(record) == []
+
+    def test_counts_and_first_indices(self, header, record):
+        """Test per-constraint counts and offending indices."""
+        records = [dict(record) for _ in range(30)]
+        for i in (3, 7, 20):
+            records[i]['type'] = 0x07
+        records[5]['rsvd_lo'] = 1
+
+        report = compile_validator(header, max_indices=2).validate(records)
+
+        assert report.checked == 30
+        assert not report.ok
+        assert report.violations['type: value == 0x01 or value == 0x02'] == 3
+        result = next(r for r in report.results if r.constraint.name == 'rsvd_hi and rsvd_lo MUST be 0')
+        assert (result.violations, result.first_indices) == (1, [5])
+        type_result = next(r for r in report.results if r.constraint.field == 'type')
+        assert type_result.first_indices == [3, 7]
+
+
+class TestVectorizedValidator:
+    """Tests for NumPy validation."""
+
+    def test_matches_scalar(self, header, record):
+        """Test vectorized counts match scalar counts."""
+        np = pytest.importorskip("numpy")
+        packets = np.tile(np.frombuffer(RUD_PACKET, dtype=np.uint8), (1000, 1))
+        packets[[10, 500], 8:10] = 0      # spdcid = 0
+        packets[999, 0] = 0x07 << 3       # type = 0x07
+
+        report = validate_packets(header, packets)
+        scalar = compile_validator(header).validate(
+            header.compile_decoder()(row.tobytes()) for row in packets)
+
+        assert report.checked == 1000
+        assert report.violations == scalar.violations
+        assert report.violations['spdcid: value != 0'] == 2
+        spdcid = next(r for r in report.results if r.constraint.field == 'spdcid')
+        assert spdcid.first_indices == [10, 500]
+
+    def test_instance_constraints(self, header):
+        """Test constraints referencing instances evaluate them."""
+        np = pytest.importorskip("numpy")
+        header.x_packet = {'constraints': ['is_rod MUST be 0']}
+        packets = np.tile(np.frombuffer(RUD_PACKET, dtype=np.uint8), (4, 1))
+        packets[2, 0] = 0x02 << 3
+
+        report = validate_packets(header, packets)
+
+        assert report.violations['is_rod MUST be 0'] == 1
+
+
+class TestViolationTable:
+    """Tests for generate_violation_table function."""
+
+    def test_table(self, cf_update_ksy):
+        """Test table rows include checked and skipped constraints."""
+        header = KsyParser().parse(str(cf_update_ksy))
+        report = compile_validator(header).validate([])
+        table = generate_violation_table(report)
+
+        assert table['type'] == 'table'
+        assert table['headers'] == ['Constraint', 'Source', 'Violations', 'First Indices']
+        assert ['CF1_VC_index is 5-bit value (0 to 31)', 'not checked', '', ''] in table['rows']
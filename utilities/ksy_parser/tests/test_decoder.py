@@ -0,0 +1,110 @@
+"""Tests for ksy_parser.decoder module."""
+import pytest
+from utilities.ksy_parser.parser import KsyParser, KsyHeader, KsyField
+from utilities.ksy_parser.decoder import compile_decoder, build_field_plan
+
+
+def pack_bits(*pairs) -> bytes:
+    """Pack (value, width) pairs MSB-first into bytes."""
+    bits = ''.join(format(value, f'0{width}b') for value, width in pairs)
+    return int(bits, 2).to_bytes(len(bits) // 8, 'big')
+
+
+RUD_PACKET = pack_bits(
+    (0x01, 5), (0x3, 4), (0, 2), (1, 1), (1, 1), (0, 1), (0, 2),
+    (0x0010, 16), (0x12345678, 32), (0x0102, 16), (0x3004, 16),
+)
+
+
+class TestBuildFieldPlan:
+    """Tests for build_field_plan function."""
+
+    def test_plan_kinds(self, rud_rod_request_ksy):
+        """Test that sub-byte fields use bit plans and aligned fields use slices."""
+        header = KsyParser().parse(str(rud_rod_request_ksy))
+        plans = {p.name: p for p in build_field_plan(header)}
+
+        assert plans['type'].kind == 'bits'
+        assert plans['next_hdr'].kind == 'bits'
+        assert plans['next_hdr'].byte_start == 0
+        assert plans['next_hdr'].byte_end == 2
+        assert plans['psn'].kind == 'int'
+        assert plans['psn'].byte_start == 4
+
+    def test_plan_skips_zero_size_fields(self):
+        """Test that fields of unknown size are omitted."""
+        header = KsyHeader(
+            id='t', title='', size_bytes=1, doc='',
+            fields=[
+                KsyField('a', 'u1', 8, 0, ''),
+                KsyField('payload', 'opaque', 0, 8, ''),
+            ])
+        plans = build_field_plan(header)
+        assert [p.name for p in plans] == ['a']
+
+
+class TestCompileDecoder:
+    """Tests for compile_decoder function."""
+
+    def test_decode_bitfields_spanning_bytes(self, rud_rod_request_ksy):
+        """Test decoding a header with bN fields crossing byte boundaries."""
+        header = KsyParser().parse(str(rud_rod_request_ksy))
+        decode = header.compile_decoder()
+        record = decode(RUD_PACKET)
+
+        assert record == {
+            'type': 0x01, 'next_hdr': 0x3, 'rsvd_hi': 0, 'retx': 1, 'ar': 1,
+            'syn': 0, 'rsvd_lo': 0, 'clear_psn_offset': 0x0010,
+            'psn': 0x12345678, 'spdcid': 0x0102, 'dpdcid': 0x3004,
+        }
+
+    def test_decode_memoryview_with_offset(self, rud_rod_request_ksy):
+        """Test decoding from a memoryview at a non-zero offset."""
+        header = KsyParser().parse(str(rud_rod_request_ksy))
+        decode = compile_decoder(header)
+        buf = memoryview(b'\xff' * 3 + RUD_PACKET)
+
+        assert decode(buf, 3)['psn'] == 0x12345678
+        assert decode.size_bytes == 12
+
+    def test_decode_byte_fields(self, cf_update_ksy):
+        """Test decoding a header of byte-aligned u1 fields."""
+        header = KsyParser().parse(str(cf_update_ksy))
+        decode = header.compile_decoder()
+        record = decode(bytes([0x5C, 0x10, 0xA8, 0x12, 0x36, 0x00, 0x00, 0x00]))
+
+        assert record['control_char'] == 0x5C
+        assert record['message_type'] == 0x10
+        assert record['cf1_count_low_and_ocode'] == 0x36
+
+    def test_decode_little_endian(self):
+        """Test little-endian byte and bit ordering."""
+        header = KsyHeader(
+            id='le_hdr', title='', size_bytes=3, doc='',
+            fields=[
+                KsyField('lo', 'b3', 3, 0, ''),
+                KsyField('hi', 'b5', 5, 3, ''),
+                KsyField('word', 'u2', 16, 8, ''),
+            ],
+            endian='le', bit_endian='le')
+        record = compile_decoder(header)(bytes([(0x1A << 3) | 0x5, 0x34, 0x12]))
+
+        assert record == {'lo': 0x5, 'hi': 0x1A, 'word': 0x1234}
+
+    def test_decode_signed_and_raw_bytes(self):
+        """Test signed integer and raw byte fields."""
+        header = KsyHeader(
+            id='mixed', title='', size_bytes=4, doc='',
+            fields=[
+                KsyField('delta', 's2be', 16, 0, ''),
+                KsyField('tag', '', 16, 16, ''),
+            ])
+        record = compile_decoder(header)(b'\xff\xfe\xab\xcd')
+
+        assert record == {'delta': -2, 'tag': b'\xab\xcd'}
+
+    def test_decode_short_buffer_raises(self, rud_rod_request_ksy):
+        """Test that a truncated buffer raises ValueError."""
+        decode = KsyParser().parse(str(rud_rod_request_ksy)).compile_decoder()
+        with pytest.raises(ValueError):
+            decode(RUD_PACKET[:8])
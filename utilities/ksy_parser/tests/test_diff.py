@@ -0,0 +1,183 @@
+"""Tests for ksy_parser.diff module."""
+import copy
+import shutil
+
+import pytest
+import yaml
+from utilities.ksy_parser.parser import KsyParser, KsyField
+from utilities.ksy_parser.diff import (
+    diff_headers,
+    diff_datamodels,
+    field_signature,
+    generate_diff_sections,
+    header_signature,
+)
+
+
+@pytest.fixture
+def rud(rud_rod_request_ksy):
+    return KsyParser().parse(str(rud_rod_request_ksy))
+
+
+@pytest.fixture
+def vc(vc_state_machine_ksy):
+    return KsyParser().parse(str(vc_state_machine_ksy))
+
+
+def kinds(header_diff, category):
+    return {(c.element, c.kind) for c in header_diff.by_category(category)}
+
+
+class TestSignatures:
+    """Tests for header and field signatures."""
+
+    def test_signature_stable_across_parses(self, rud, rud_rod_request_ksy):
+        """Test that re-parsing a file yields the same signature."""
+        again = KsyParser().parse(str(rud_rod_request_ksy))
+        assert header_signature(rud) == header_signature(again)
+
+    def test_signature_ignores_docs(self, rud):
+        """Test that documentation-only edits do not change the signature."""
+        edited = copy.deepcopy(rud)
+        edited.doc = 'rewritten'
+        edited.fields[0].description = 'rewritten'
+        assert header_signature(edited) == header_signature(rud)
+
+    def test_field_signature(self, rud):
+        """Test that offsets are part of a field's signature."""
+        moved = copy.copy(rud.fields[-1])
+        moved.offset_bits += 8
+        assert field_signature(moved) != field_signature(rud.fields[-1])
+
+
+class TestDiffHeaders:
+    """Tests for diff_headers function."""
+
+    def test_field_changes(self, rud):
+        """Test added, removed, resized and shifted fields."""
+        new = copy.deepcopy(rud)
+        # Widen clear_psn_offset by 16 bits; every later field shifts
+        index = [f.name for f in new.fields].index('clear_psn_offset')
+        new.fields[index].size_bits = 32
+        new.fields[index].type_str = 'u4'
+        for f in new.fields[index + 1:]:
+            f.offset_bits += 16
+        new.fields = [f for f in new.fields if f.name != 'rsvd_lo']
+        new.fields.append(KsyField('ext', 'u2', 16, 128, ''))
+        new.size_bytes = 16
+
+        result = diff_headers(rud, new)
+
+        assert kinds(result, 'header') == {('size_bytes', 'resized')}
+        assert {('clear_psn_offset', 'resized'), ('clear_psn_offset', 'retyped'),
+                ('psn', 'moved'), ('dpdcid', 'moved'), ('ext', 'added'),
+                ('rsvd_lo', 'removed')} <= kinds(result, 'field')
+        assert ('type', 'moved') not in kinds(result, 'field')
+        moved = next(c for c in result.changes if c.element == 'psn')
+        assert (moved.old, moved.new) == (32, 48)
+
+    def test_enum_changes(self, rud):
+        """Test added, removed and renamed enum values."""
+        new = copy.deepcopy(rud)
+        pds = new.enums['pds_type']
+        pds[0x07] = 'nack'
+        del pds[0x02]
+        pds[0x08] = 'cp'
+        new.enums['extra'] = {0: 'zero'}
+
+        result = diff_headers(rud, new)
+
+        assert kinds(result, 'enum') == {
+            ('pds_type.0x7', 'renamed'), ('pds_type.0x2', 'removed'),
+            ('pds_type.0x8', 'added'), ('extra', 'added'),
+        }
+
+    def test_state_machine_changes(self, vc):
+        """Test state and transition changes."""
+        new = copy.deepcopy(vc)
+        sm = new.x_protocol['state_machine']
+        sm['states'].append({'name': 'FAILED', 'is_terminal': True})
+        sm['transitions'][0]['condition'] = 'credits > 0'
+        sm['transitions'].append({'from': 'ACTIVE', 'to': 'FAILED', 'trigger': 'error'})
+
+        result = diff_headers(vc, new)
+
+        assert kinds(result, 'state') == {('FAILED', 'added')}
+        assert kinds(result, 'transition') == {
+            ('DISABLED --[start]--> INITIALIZING', 'changed'),
+            ('ACTIVE --[error]--> FAILED', 'added'),
+        }
+        changed = result.by_category('transition')[0]
+        assert changed.old.startswith('if true')
+        assert changed.new.startswith('if credits > 0')
+
+
+class TestDiffDatamodels:
+    """Tests for diff_datamodels and generate_diff_sections."""
+
+    def test_added_removed_unchanged(self, rud, vc):
+        """Test header-level matching by id."""
+        new_rud = copy.deepcopy(rud)
+        new_rud.fields[0].enum_type = None
+
+        result = diff_datamodels([rud, vc], {'rud_rod_request': new_rud, 'other': copy.deepcopy(vc)})
+
+        assert result.added == ['other']
+        assert result.removed == ['vc_state_machine']
+        assert [d.header_id for d in result.changed] == ['rud_rod_request']
+        assert result.has_changes
+
+    def test_identical_datamodels(self, rud, vc):
+        """Test that equivalent headers are all unchanged."""
+        result = diff_datamodels([rud, vc], [copy.deepcopy(rud), copy.deepcopy(vc)])
+        assert result.unchanged == ['rud_rod_request', 'vc_state_machine']
+        assert not result.has_changes
+
+    def test_parse_tree_signatures_are_memoized(self, fixtures_dir, monkeypatch):
+        """Test that re-diffing parsed trees compares memoized signatures only."""
+        from utilities.ksy_parser import diff as diff_module
+        from utilities.ksy_parser.tree import parse_tree
+
+        old, new = parse_tree(fixtures_dir, workers=1), parse_tree(fixtures_dir, workers=1)
+        first = diff_datamodels(old, new)
+        assert set(old.signatures) == set(new.signatures) == set(old.headers)
+
+        def fail(header):
+            raise AssertionError("signature recomputed")
+        monkeypatch.setattr(diff_module, 'header_signature', fail)
+        assert diff_datamodels(old, new) == first
+
+    def test_sections(self, rud):
+        """Test report sections for a changed header."""
+        new = copy.deepcopy(rud)
+        new.enums['pds_type'][0x08] = 'cp'
+        sections = generate_diff_sections(diff_datamodels([rud], [new]), subtitle='1.0 -> 1.0.1')
+
+        assert sections[0] == {'type': 'section_header', 'title': 'Datamodel Changes',
+                               'subtitle': '1.0 -> 1.0.1'}
+        assert sections[1]['rows'][2] == ['Changed', '1']
+        table = sections[-1]
+        assert table['title'] == 'PDS RUD/ROD Request Header Changes'
+        assert table['rows'] == [['pds_type.0x8', 'enum', 'added', '-', 'cp']]
+
+    def test_cli_diff(self, fixtures_dir, tmp_path):
+        """Test the diff CLI command on two directories."""
+        from utilities.ksy_parser.cli import main
+
+        old, new = tmp_path / 'old', tmp_path / 'new'
+        old.mkdir()
+        new.mkdir()
+        shutil.copy(fixtures_dir / 'rud_rod_request.ksy', old)
+        shutil.copy(fixtures_dir / 'cf_update.ksy', old)
+        shutil.copy(fixtures_dir / 'rud_rod_request.ksy', new)
+        shutil.copy(fixtures_dir / 'vc_state_machine.ksy', new)
+        output = tmp_path / 'changes.yaml'
+
+        with pytest.raises(SystemExit) as exc:
+            main(['diff', str(old), str(new), '-o', str(output), '-j', '1', '--title', 'Changes'])
+
+        assert exc.value.code == 0
+        document = yaml.safe_load(output.read_text())
+        assert document['title'] == 'Changes'
+        lists = {s['title']: s['items'] for s in document['sections'] if s['type'] == 'item_list'}
+        assert lists == {'Added Headers': ['vc_state_machine'], 'Removed Headers': ['cbfc_cf_update']}
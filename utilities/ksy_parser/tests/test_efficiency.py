@@ -0,0 +1,127 @@
+"""Tests for ksy_parser.efficiency module."""
+import pytest
+from utilities.ksy_parser.efficiency import (
+    StackProfile, stack_profile, profiles_from_stack, efficiency_sweep,
+    generate_efficiency_table, generate_goodput_table, ETHERNET_WIRE_OVERHEAD,
+)
+from utilities.ksy_parser.stack import ProtocolStack
+from utilities.ksy_parser.tests.test_stack import make_header
+
+np = pytest.importorskip("numpy")
+
+
+TAXONOMY_STACKS = [
+    StackProfile('UE+ (small msg)', 20),
+    StackProfile('UE+ (standard)', 40),
+    StackProfile('RoCEv2 (IPv4)', 58),
+    StackProfile('RoCEv2 (IPv6)', 78),
+]
+
+
+class TestEfficiencySweep:
+    """Tests for efficiency_sweep."""
+
+    def test_matches_taxonomy_table(self):
+        """Test efficiency at 4KB reproduces the packet taxonomy figures."""
+        sweep = efficiency_sweep(TAXONOMY_STACKS, [4096])
+
+        assert np.round(sweep.efficiency[:, 0] * 100, 1).tolist() == [99.5, 99.0, 98.6, 98.1]
+
+    def test_shapes_and_goodput(self):
+        """Test broadcasting over payloads and link rates."""
+        payloads = np.arange(64, 9001)
+        sweep = efficiency_sweep(TAXONOMY_STACKS, payloads, link_rates_gbps=[100, 400, 800])
+
+        assert sweep.efficiency.shape == (4, payloads.size)
+        assert sweep.goodput_gbps.shape == (4, payloads.size, 3)
+        assert np.allclose(sweep.goodput_gbps[:, :, 1], sweep.efficiency * 400)
+
+    def test_packets_per_second(self):
+        """Test packet rate includes wire overhead."""
+        sweep = efficiency_sweep([StackProfile('eth', 14)], [46], link_rates_gbps=[100],
+                                 wire_overhead=ETHERNET_WIRE_OVERHEAD)
+
+        # 84-byte minimum Ethernet frame on the wire: 148.8 Mpps at 100G
+        assert sweep.packets_per_second[0, 0, 0] == pytest.approx(100e9 / 8 / 84)
+
+    def test_mtu_segmentation(self):
+        """Test messages above the MTU pay headers once per segment."""
+        sweep = efficiency_sweep([StackProfile('s', 40)], [4096, 8192, 8193], mtu=4096)
+
+        assert sweep.packets.tolist() == [1, 2, 3]
+        assert sweep.wire_bytes[0].tolist() == [4136, 8272, 8313]
+
+    def test_mtu_sweep_broadcasts(self):
+        """Test payload and MTU grids broadcast to one flat set of points."""
+        payloads = np.array([[1024], [65536]])
+        mtus = np.array([1024, 2048, 4096])
+        sweep = efficiency_sweep(TAXONOMY_STACKS, payloads, mtu=mtus)
+
+        assert sweep.efficiency.shape == (4, 6)
+        assert sweep.packets.tolist() == [1, 1, 1, 64, 32, 16]
+
+    def test_invalid_mtu(self):
+        """Test non-positive MTUs are rejected."""
+        with pytest.raises(ValueError):
+            efficiency_sweep(TAXONOMY_STACKS, [100], mtu=0)
+
+
+class TestProfiles:
+    """Tests for building profiles from headers."""
+
+    def test_stack_profile_sums_headers(self):
+        """Test header sizes are summed in wire order."""
+        eth = make_header('eth', ('dst', '', 48), ('src', '', 48), ('ethertype', 'u2', 16))
+        udp = make_header('udp', ('src_port', 'u2', 16), ('dst_port', 'u2', 16))
+
+        profile = stack_profile('eth/udp', [eth, udp])
+
+        assert profile.header_bytes == 18
+        assert profile.headers == ['eth', 'udp']
+
+    def test_profiles_from_protocol_stack(self):
+        """Test one profile per root-to-leaf path."""
+        headers = {
+            'eth': make_header('eth', ('ethertype', 'u2', 16)),
+            'v4': make_header('v4', ('x', 'u4', 32)),
+            'v6': make_header('v6', ('x', 'u4', 32), ('y', 'u4', 32)),
+        }
+        stack = ProtocolStack(headers, 'eth').link('eth', 'ethertype', {0x0800: 'v4', 0x86DD: 'v6'})
+
+        profiles = profiles_from_stack(stack)
+
+        assert [(p.name, p.header_bytes) for p in profiles] == [('eth / v4', 6), ('eth / v6', 10)]
+
+    def test_stack_profile_matches_stack_overhead(self):
+        """Test both builders size headers whose fields overrun size_bytes alike."""
+        eth = make_header('eth', ('ethertype', 'u2', 16))
+        short = make_header('short', ('x', 'u4', 32), ('y', 'u4', 32))
+        short.size_bytes = 4
+        stack = ProtocolStack({'eth': eth, 'short': short}, 'eth').link('eth', 'ethertype', {1: 'short'})
+
+        [from_stack] = profiles_from_stack(stack)
+
+        assert stack_profile('eth/short', [eth, short]).header_bytes == from_stack.header_bytes == 10
+
+
+class TestTables:
+    """Tests for table section generation."""
+
+    def test_efficiency_table(self):
+        """Test efficiency table format."""
+        sweep = efficiency_sweep(TAXONOMY_STACKS, np.arange(256, 8193, 256))
+        table = generate_efficiency_table(sweep, payloads=[4096, 300])
+
+        assert table['type'] == 'table'
+        assert table['headers'] == ['Protocol Stack', 'Total Headers',
+                                    'Efficiency (4KB payload)', 'Efficiency (256B payload)']
+        assert table['rows'][3][:3] == ['RoCEv2 (IPv6)', '78 bytes', '98.1%']
+
+    def test_goodput_table(self):
+        """Test goodput table has a goodput and Mpps column per rate."""
+        sweep = efficiency_sweep(TAXONOMY_STACKS, [4096], link_rates_gbps=[400, 800])
+        table = generate_goodput_table(sweep)
+
+        assert table['title'] == 'Goodput (4KB payload)'
+        assert len(table['headers']) == 5
+        assert table['rows'][0][1] == '398.1'
@@ -0,0 +1,111 @@
+"""Tests for ksy_parser.encoder module."""
+import pytest
+from utilities.ksy_parser.parser import KsyParser, KsyHeader, KsyField
+from utilities.ksy_parser.encoder import compile_encoder, compile_batch_encoder, enum_name_maps
+from utilities.ksy_parser.tests.test_decoder import RUD_PACKET
+
+
+RUD_RECORD = {
+    'type': 0x01, 'next_hdr': 0x3, 'retx': 1, 'ar': 1,
+    'clear_psn_offset': 0x0010, 'psn': 0x12345678, 'spdcid': 0x0102, 'dpdcid': 0x3004,
+}
+
+
+class TestCompileEncoder:
+    """Tests for compile_encoder function."""
+
+    def test_encode_matches_wire_format(self, rud_rod_request_ksy):
+        """Test that encoding produces the expected bytes with reserved fields omitted."""
+        header = KsyParser().parse(str(rud_rod_request_ksy))
+        encode = header.compile_encoder()
+
+        assert encode(RUD_RECORD) == RUD_PACKET
+
+    def test_round_trip(self, rud_rod_request_ksy):
+        """Test that decode(encode(record)) returns the record."""
+        header = KsyParser().parse(str(rud_rod_request_ksy))
+        record = header.compile_decoder()(RUD_PACKET)
+
+        assert header.compile_decoder()(header.compile_encoder()(record)) == record
+
+    def test_encode_enum_names(self, rud_rod_request_ksy):
+        """Test that enum ids are accepted in place of values."""
+        header = KsyParser().parse(str(rud_rod_request_ksy))
+        encode = compile_encoder(header)
+        named = dict(RUD_RECORD, type='rud_request', next_hdr='uet_hdr_request_std')
+
+        assert encode(named) == RUD_PACKET
+
+    def test_encode_overflow_raises(self, rud_rod_request_ksy):
+        """Test that out-of-range values are rejected."""
+        encode = KsyParser().parse(str(rud_rod_request_ksy)).compile_encoder()
+        with pytest.raises(ValueError):
+            encode(dict(RUD_RECORD, next_hdr=16))
+
+    def test_encode_little_endian_signed_bytes(self):
+        """Test little-endian, signed and raw byte fields."""
+        header = KsyHeader(
+            id='le_hdr', title='', size_bytes=6, doc='',
+            fields=[
+                KsyField('lo', 'b3', 3, 0, ''),
+                KsyField('hi', 'b5', 5, 3, ''),
+                KsyField('delta', 's2', 16, 8, ''),
+                KsyField('tag', '', 24, 24, ''),
+            ],
+            endian='le', bit_endian='le')
+        data = compile_encoder(header)({'lo': 5, 'hi': 0x1A, 'delta': -2, 'tag': b'ab'})
+
+        assert data == bytes([(0x1A << 3) | 0x5, 0xFE, 0xFF]) + b'ab\x00'
+        assert compile_encoder(header).size_bytes == 6
+
+    def test_enum_name_maps(self, cf_update_ksy):
+        """Test enum id lookup construction."""
+        header = KsyParser().parse(str(cf_update_ksy))
+        assert enum_name_maps(header) == {'cbfc_message_type': {'cf_update': 0x10}}
+
+
+class TestCompileBatchEncoder:
+    """Tests for compile_batch_encoder function."""
+
+    def test_batch_matches_scalar(self, rud_rod_request_ksy):
+        """Test that bulk packing matches the scalar encoder row by row."""
+        np = pytest.importorskip("numpy")
+        header = KsyParser().parse(str(rud_rod_request_ksy))
+        encode = header.compile_encoder()
+        psn = np.arange(50, dtype=np.uint32) * 0x01010101
+        columns = {
+            'type': np.array(['rud_request', 'rod_request'] * 25),
+            'next_hdr': np.arange(50) % 16,
+            'syn': np.arange(50) % 2,
+            'psn': psn,
+            'dpdcid': np.full(50, 0x3004),
+        }
+
+        packets = compile_batch_encoder(header)(columns)
+        assert packets.shape == (50, 12)
+        for i in (0, 1, 33, 49):
+            row = {name: values[i].item() for name, values in columns.items()}
+            assert packets[i].tobytes() == encode(row)
+
+    def test_batch_u1_fields_match_scalar(self, cf_update_ksy):
+        """Test that aligned u1 fields are packed, not masked to zero."""
+        np = pytest.importorskip("numpy")
+        header = KsyHeader(id='t', title='', size_bytes=2, doc='',
+                           fields=[KsyField('a', 'u1', 8, 0, ''), KsyField('b', 'u1', 8, 8, '')])
+        packets = compile_batch_encoder(header)({'a': np.array([0x5c]), 'b': np.array([0x10])})
+        assert packets[0].tobytes() == compile_encoder(header)({'a': 0x5c, 'b': 0x10}) == b'\x5c\x10'
+
+        cf = KsyParser().parse(str(cf_update_ksy))
+        encode = cf.compile_encoder()
+        rng = np.random.default_rng(0)
+        columns = {p.name: rng.integers(0, 256, 20) for p in compile_batch_encoder(cf).plans}
+        packets = compile_batch_encoder(cf)(columns)
+        for i in range(20):
+            assert packets[i].tobytes() == encode({name: int(v[i]) for name, v in columns.items()})
+
+    def test_batch_overflow_raises(self, rud_rod_request_ksy):
+        """Test that out-of-range columns are rejected."""
+        np = pytest.importorskip("numpy")
+        header = KsyParser().parse(str(rud_rod_request_ksy))
+        with pytest.raises(ValueError):
+            compile_batch_encoder(header)({'type': np.array([1, 32])})
@@ -1,6 +1,9 @@
 """Tests for ksy_parser.enums module."""
 import pytest
-from utilities.ksy_parser.enums import extract_enums, EnumDef, EnumValue, generate_enum_table
+from utilities.ksy_parser.enums import (
+    extract_enums, EnumDef, EnumValue, generate_enum_table,
+    EnumTable, build_enum_tables, decode_enum, decode_enum_columns,
+)
 
 
 class TestExtractEnums:
@@ -73,3 +76,80 @@ class TestGenerateEnumTable:
         table = generate_enum_table(enums[0], title_prefix="CBFC ")
         
         assert table['title'].startswith('CBFC ')
+
+
+SPARSE = EnumDef('ethertype', [EnumValue(0x0800, 'ipv4', ''), EnumValue(0x86DD, 'ipv6', ''),
+                               EnumValue(0x8915, 'roce', '')])
+
+
+class TestEnumTable:
+    """Tests for EnumTable lookups."""
+
+    def test_dense_lookup(self, rud_rod_request_ksy):
+        """Test compact enums use a dense array."""
+        from utilities.ksy_parser.parser import KsyParser
+        tables = build_enum_tables(KsyParser().parse(str(rud_rod_request_ksy)))
+        table = tables['pds_type']
+
+        assert table.is_dense
+        assert table.name_of(0x02) == 'rod_request'
+        assert table.name_of(0x03) is None
+        assert table.name_of(0x99, 'reserved') == 'reserved'
+        assert table.value_of('ack') == 0x07
+
+    def test_sparse_lookup(self):
+        """Test wide enums use a hash map."""
+        table = EnumTable(SPARSE)
+
+        assert not table.is_dense
+        assert table.name_of(0x86DD) == 'ipv6'
+        assert table.name_of(0x0801) is None
+        with pytest.raises(KeyError):
+            table.value_of('ipx')
+
+    def test_build_from_ksy_data(self, cf_update_data):
+        """Test tables built from raw KSY data."""
+        tables = build_enum_tables(cf_update_data)
+
+        assert tables['cbfc_message_type'].name_of(0x10) == 'cf_update'
+
+
+class TestDecodeEnum:
+    """Tests for vectorized enum decoding."""
+
+    @pytest.mark.parametrize("dense_span", [4096, 0])
+    def test_decode(self, dense_span):
+        """Test dense and sparse decoding agree with scalar lookups."""
+        np = pytest.importorskip("numpy")
+        table = EnumTable(SPARSE, dense_span=dense_span)
+        codes = np.array([0x0800, 0x8915, 0x1234, 0x86DD, -1], dtype=np.int64)
+
+        labels = decode_enum(table, codes)
+
+        assert labels.tolist() == ['ipv4', 'roce', 'unknown', 'ipv6', 'unknown']
+        assert labels.tolist() == [table.name_of(int(c), 'unknown') for c in codes]
+
+    def test_categorize(self):
+        """Test category indices for categorical columns."""
+        np = pytest.importorskip("numpy")
+        table = EnumTable(SPARSE)
+
+        indices, categories = table.categorize(np.array([[0x86DD, 0x0800], [7, 0x8915]], dtype=np.uint16))
+
+        assert categories == ['ipv4', 'ipv6', 'roce']
+        assert indices.tolist() == [[1, 0], [3, 2]]
+
+    def test_decode_columns(self, rud_rod_request_ksy):
+        """Test labelling enum columns of a batch decode."""
+        np = pytest.importorskip("numpy")
+        from utilities.ksy_parser.parser import KsyParser
+        header = KsyParser().parse(str(rud_rod_request_ksy))
+        columns = {'type': np.array([1, 2, 7, 5], dtype=np.uint8),
+                   'next_hdr': np.array([3, 0, 1, 9], dtype=np.uint8),
+                   'psn': np.array([1, 2, 3, 4], dtype=np.uint32)}
+
+        labels = decode_enum_columns(header, columns)
+
+        assert set(labels) == {'type', 'next_hdr'}
+        assert labels['type'].tolist() == ['rud_request', 'rod_request', 'ack', 'unknown']
+        assert labels['next_hdr'][0] == 'uet_hdr_request_std'
@@ -0,0 +1,159 @@
+"""Tests for ksy_parser.executor module."""
+import pytest
+from utilities.ksy_parser.state_machine import extract_state_machine, StateMachine, State, Transition
+from utilities.ksy_parser.executor import (
+    compile_state_machine, IllegalTransition, NO_TRANSITION, CONDITIONAL,
+)
+from utilities.ksy_parser.expressions import ExpressionError
+
+
+@pytest.fixture
+def vc_lifecycle():
+    """VC lifecycle with a conditional transition and a wildcard reset."""
+    return StateMachine(
+        name='VC Lifecycle',
+        initial_state='DISABLED',
+        states=[State('DISABLED', ''), State('INITIALIZING', ''), State('ACTIVE', ''),
+                State('REMOVING', '', is_terminal=True)],
+        transitions=[
+            Transition('DISABLED', 'INITIALIZING', 'start', condition='true'),
+            Transition('INITIALIZING', 'ACTIVE', 'ready', condition='credits > 0'),
+            Transition('INITIALIZING', 'DISABLED', 'ready', condition='credits == 0'),
+            Transition('ACTIVE', 'REMOVING', 'remove'),
+            Transition('*', 'DISABLED', 'reset', condition='link is down'),
+        ],
+    )
+
+
+class TestCompile:
+    """Tests for compile_state_machine function."""
+
+    def test_tables(self, vc_lifecycle):
+        """Test states, triggers and the flat next-state table."""
+        executor = compile_state_machine(vc_lifecycle)
+
+        assert executor.states == ['DISABLED', 'INITIALIZING', 'ACTIVE', 'REMOVING']
+        assert executor.triggers == ['start', 'ready', 'remove', 'reset']
+        assert executor.terminal == [False, False, False, True]
+        start = executor.trigger_index['start']
+        assert executor.next_state[0 * 4 + start] == 1
+        assert executor.next_state[1 * 4 + executor.trigger_index['ready']] == CONDITIONAL
+        assert executor.next_state[2 * 4 + start] == NO_TRANSITION
+
+    def test_opaque_conditions(self, vc_lifecycle):
+        """Test prose conditions are reported and rejected in strict mode."""
+        assert compile_state_machine(vc_lifecycle).opaque_conditions == ['link is down']
+        with pytest.raises(ExpressionError):
+            compile_state_machine(vc_lifecycle, strict=True)
+
+    def test_missing_condition_variable(self):
+        """Test conditions naming absent variables raise a clear error."""
+        sm = StateMachine(name='M', initial_state='A', states=[State('A', ''), State('B', '')],
+                          transitions=[Transition('A', 'B', 'go', condition='credits_available')])
+        executor = compile_state_machine(sm)
+
+        with pytest.raises(ExpressionError, match='credits_available'):
+            executor.run(['go'])
+        with pytest.raises(ExpressionError, match='credits_available'):
+            executor.step('A', 'go')
+        assert executor.step('A', 'go', {'credits_available': True}) == 'B'
+
+    @pytest.mark.parametrize('target', ['*', 'GHOST', ''])
+    def test_invalid_target(self, target):
+        """Test wildcard, undeclared and empty targets are rejected at compile time."""
+        sm = StateMachine(name='M', initial_state='A', states=[State('A', ''), State('B', '')],
+                          transitions=[Transition('A', 'B', 'go'), Transition('B', target, 'reset')])
+
+        with pytest.raises(ValueError, match=r"B --\[reset\]--> '"):
+            compile_state_machine(sm)
+
+    def test_from_ksy(self, vc_state_machine_data):
+        """Test compiling an extracted state machine."""
+        sm = extract_state_machine(vc_state_machine_data['meta']['x-protocol'])
+        executor = compile_state_machine(sm)
+
+        assert executor.step('DISABLED', 'start') == 'INITIALIZING'
+
+
+class TestStep:
+    """Tests for StateMachineExecutor.step."""
+
+    def test_conditions(self, vc_lifecycle):
+        """Test conditions select among candidate transitions."""
+        executor = compile_state_machine(vc_lifecycle)
+
+        assert executor.step('INITIALIZING', 'ready', {'credits': 4}) == 'ACTIVE'
+        assert executor.step('INITIALIZING', 'ready', {'credits': 0}) == 'DISABLED'
+
+    def test_wildcard(self, vc_lifecycle):
+        """Test '*' transitions apply from every state."""
+        executor = compile_state_machine(vc_lifecycle)
+
+        assert executor.step('ACTIVE', 'reset') == 'DISABLED'
+        assert executor.step('REMOVING', 'reset') == 'DISABLED'
+
+    def test_illegal(self, vc_lifecycle):
+        """Test illegal and unknown events raise IllegalTransition."""
+        executor = compile_state_machine(vc_lifecycle)
+
+        with pytest.raises(IllegalTransition) as exc:
+            executor.step('DISABLED', 'remove')
+        assert (exc.value.state, exc.value.trigger) == ('DISABLED', 'remove')
+        with pytest.raises(IllegalTransition):
+            executor.step('DISABLED', 'bogus')
+
+
+class TestRun:
+    """Tests for StateMachineExecutor.run."""
+
+    def test_replay(self, vc_lifecycle):
+        """Test replaying a stream with per-event contexts."""
+        executor = compile_state_machine(vc_lifecycle)
+        events = ['start', ('ready', {'credits': 8}), 'remove']
+
+        result = executor.run(events)
+
+        assert result.ok
+        assert (result.final_state, result.steps) == ('REMOVING', 3)
+
+    def test_illegal_events_recorded(self, vc_lifecycle):
+        """Test illegal events are recorded and leave the state unchanged."""
+        executor = compile_state_machine(vc_lifecycle)
+
+        result = executor.run(['remove', 'start', 'start', 'ready'], context={'credits': 1})
+
+        assert result.illegal == [(0, 'DISABLED', 'remove'), (2, 'INITIALIZING', 'start')]
+        assert result.final_state == 'ACTIVE'
+
+    def test_strict(self, vc_lifecycle):
+        """Test strict replay stops at the first illegal event."""
+        with pytest.raises(IllegalTransition):
+            compile_state_machine(vc_lifecycle).run(['start', 'start'], strict=True)
+
+    def test_transitions_from(self, vc_lifecycle):
+        """Test looking up the source transitions of a pair."""
+        executor = compile_state_machine(vc_lifecycle)
+
+        assert [t.to_state for t in executor.transitions_from('INITIALIZING', 'ready')] == \
+            ['ACTIVE', 'DISABLED']
+        assert [t.to_state for t in executor.transitions_from('ACTIVE', 'remove')] == ['REMOVING']
+        assert executor.transitions_from('ACTIVE', 'start') == []
+
+    def test_as_array(self, vc_lifecycle):
+        """Test the NumPy view of the transition table."""
+        pytest.importorskip("numpy")
+        table = compile_state_machine(vc_lifecycle).as_array()
+
+        assert table.shape == (4, 4)
+        assert table[0, 0] == 1
+
+    def test_run_codes(self, vc_lifecycle):
+        """Test the encoded fast path matches run()."""
+        executor = compile_state_machine(vc_lifecycle)
+        events = ['remove', 'start', 'ready', 'bogus', 'remove']
+
+        final, illegal = executor.run_codes(executor.encode_triggers(events), context={'credits': 1})
+        result = executor.run(events, context={'credits': 1})
+
+        assert executor.states[final] == result.final_state == 'REMOVING'
+        assert illegal == [i for i, _, _ in result.illegal] == [0, 3]
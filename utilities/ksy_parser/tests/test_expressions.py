@@ -0,0 +1,136 @@
+"""Tests for ksy_parser.expressions module."""
+import pytest
+from utilities.ksy_parser.parser import KsyParser, KsyHeader, KsyInstance
+from utilities.ksy_parser.expressions import compile_expression, compile_instances, tokenize, ExpressionError
+from utilities.ksy_parser.tests.test_decoder import RUD_PACKET
+
+
+class TestCompileExpression:
+    """Tests for compile_expression function."""
+
+    @pytest.mark.parametrize("expr, expected", [
+        ("(a >> 3) & 0x1F", (0xAB >> 3) & 0x1F),
+        ("a + b * 2 - 1", 0xAB + 7 * 2 - 1),
+        ("a / b", 0xAB // 7),
+        ("a % b", 0xAB % 7),
+        ("~b & 0xFF", 0xF8),
+        ("-b", -7),
+        ("a | b << 8 ^ 1", 0xAB | ((7 << 8) ^ 1)),
+        ("a > b and b != 0", True),
+        ("not a == 0xAB or false", False),
+        ("b == 7 ? 10 : 20", 10),
+        ("b == 8 ? 10 : b == 7 ? 30 : 20", 30),
+        ("0b1010_0000 >> 4", 10),
+    ])
+    def test_scalar_operators(self, expr, expected):
+        """Test arithmetic, bit, logical and ternary operators."""
+        assert compile_expression(expr)({'a': 0xAB, 'b': 7}) == expected
+
+    def test_enum_reference(self):
+        """Test that enum_name::id resolves at compile time."""
+        func = compile_expression("kind == msg_type::ack", {'msg_type': {'ack': 7}})
+        assert func({'kind': 7}) is True
+        assert func.names == ('kind',)
+
+    def test_unknown_enum_raises(self):
+        """Test that an undefined enum value is rejected."""
+        with pytest.raises(ExpressionError):
+            compile_expression("kind == msg_type::nack", {'msg_type': {'ack': 7}})
+
+    @pytest.mark.parametrize("expr", ["a +", "(a", "_root.a", "a.length", "'str'"])
+    def test_unsupported_syntax_raises(self, expr):
+        """Test that malformed or unsupported expressions are rejected."""
+        with pytest.raises(ExpressionError):
+            compile_expression(expr)
+
+    def test_vectorized(self):
+        """Test NumPy mode with logical ops, ternary and narrow dtypes."""
+        np = pytest.importorskip("numpy")
+        func = compile_expression("a > 1 and not b == 0 ? (a & 0x07) << 12 : 0", vectorized=True)
+        a = np.array([7, 1, 3], dtype=np.uint8)
+        b = np.array([1, 1, 0], dtype=np.uint8)
+
+        assert list(func({'a': a, 'b': b})) == [7 << 12, 0, 0]
+
+
+class TestTokenize:
+    """Tests for tokenize function."""
+
+    def test_tokens(self):
+        """Test token kinds, enum references and the end marker."""
+        assert tokenize("value >= 0x10 and t == pds_type::ack") == [
+            ('name', 'value'), ('op', '>='), ('num', '0x10'), ('name', 'and'),
+            ('name', 't'), ('op', '=='), ('name', 'pds_type::ack'), ('end', ''),
+        ]
+
+    def test_unsupported_syntax(self):
+        """Test that unsupported characters raise ExpressionError."""
+        with pytest.raises(ExpressionError):
+            tokenize("a @ b")
+
+
+class TestCompileInstances:
+    """Tests for compile_instances function."""
+
+    def test_cf_update_instances(self, cf_update_ksy):
+        """Test evaluating multi-line instance expressions on a decoded record."""
+        header = KsyParser().parse(str(cf_update_ksy))
+        record = header.compile_decoder()(bytes([0x5C, 0x10, 0xAD, 0x12, 0x36, 0x00, 0x00, 0x00]))
+
+        values = header.compile_instances()(record)
+        assert values['cf1_vc_index'] == 0xAD >> 3
+        assert values['cf1_count'] == ((0xAD & 0x07) << 12) | (0x12 << 4) | ((0x36 >> 4) & 0x0E)
+        assert values['ocode'] == 0x6
+
+    def test_ternary_and_enum_instances(self, rud_rod_request_ksy):
+        """Test ternary and enum-comparison instances."""
+        header = KsyParser().parse(str(rud_rod_request_ksy))
+        record = header.compile_decoder()(RUD_PACKET)
+
+        values = compile_instances(header)(record)
+        assert values == {
+            'clear_psn': 0x12345678 - 0x10,
+            'pdc_info': 0,
+            'is_rod': False,
+        }
+
+    def test_instance_dependencies(self):
+        """Test that instances referencing instances are ordered."""
+        header = KsyHeader(
+            id='deps', title='', size_bytes=0, fields=[], doc='',
+            instances=[
+                KsyInstance('doubled', 'base * 2', ''),
+                KsyInstance('base', 'x + 1', ''),
+            ])
+        evaluate = compile_instances(header)
+
+        assert evaluate.order == ['base', 'doubled']
+        assert evaluate({'x': 4}) == {'base': 5, 'doubled': 10}
+
+    def test_cycle_raises(self):
+        """Test that cyclic instances are rejected."""
+        header = KsyHeader(
+            id='cycle', title='', size_bytes=0, fields=[], doc='',
+            instances=[KsyInstance('a', 'b + 1', ''), KsyInstance('b', 'a + 1', '')])
+        with pytest.raises(ExpressionError):
+            compile_instances(header)
+
+    def test_non_strict_skips_unsupported(self):
+        """Test that strict=False records unsupported instances."""
+        header = KsyHeader(
+            id='loose', title='', size_bytes=0, fields=[], doc='',
+            instances=[KsyInstance('ok', 'x + 1', ''), KsyInstance('bad', '_io.pos', '')])
+        evaluate = compile_instances(header, strict=False)
+
+        assert evaluate({'x': 1}) == {'ok': 2}
+        assert 'bad' in evaluate.errors
+
+    def test_vectorized_matches_scalar(self, rud_rod_request_ksy):
+        """Test batch evaluation over decoded columns."""
+        pytest.importorskip("numpy")
+        header = KsyParser().parse(str(rud_rod_request_ksy))
+        columns = header.compile_batch_decoder()(RUD_PACKET * 3)
+
+        values = header.compile_instances(vectorized=True)(columns)
+        assert list(values['clear_psn']) == [0x12345678 - 0x10] * 3
+        assert list(values['is_rod']) == [False] * 3
@@ -0,0 +1,69 @@
+"""Tests for ksy_parser.index module."""
+import pytest
+from utilities.ksy_parser.parser import KsyParser
+from utilities.ksy_parser.index import DatamodelIndex, normalize_citation
+
+
+@pytest.fixture
+def index(cf_update_ksy, vc_state_machine_ksy, rud_rod_request_ksy):
+    """Index over all fixture headers."""
+    parser = KsyParser()
+    headers = [parser.parse(str(p)) for p in (cf_update_ksy, vc_state_machine_ksy, rud_rod_request_ksy)]
+    return DatamodelIndex(headers)
+
+
+class TestNormalizeCitation:
+    """Tests for normalize_citation function."""
+
+    def test_multiple_citations(self):
+        """Test splitting compound references."""
+        assert normalize_citation("Table 5-20, Lane 1; Table 5-21, Type field") == ['table 5-20', 'table 5-21']
+
+    def test_plural_lists(self):
+        """Test expanding 'Tables a, b, c'."""
+        assert normalize_citation("Tables 5-23, 5-24, 5-25") == ['table 5-23', 'table 5-24', 'table 5-25']
+
+    def test_unrecognized_text(self):
+        """Test fallback to the lower-cased text."""
+        assert normalize_citation("Lane 0") == ['lane 0']
+
+
+class TestDatamodelIndex:
+    """Tests for DatamodelIndex lookups."""
+
+    def test_headers_with_field(self, index):
+        """Test field-name lookup."""
+        assert index.headers_with_field('psn') == ['rud_rod_request']
+        assert index.headers_with_field('missing') == []
+
+    def test_headers_using_enum(self, index):
+        """Test enum usage and definition lookups."""
+        assert index.headers_using_enum('cbfc_message_type') == ['cbfc_cf_update']
+        assert index.headers_using_enum('pds_type') == ['rud_rod_request']
+        assert index.headers_defining_enum('next_hdr_type') == ['rud_rod_request']
+
+    def test_fields_citing(self, index):
+        """Test exact citation lookup."""
+        refs = index.fields_citing('Table 5-21')
+        names = {r.field.name for r in refs}
+
+        assert 'message_type' in names
+        assert 'cf2_count_mid' in names
+        assert 'control_char' not in names
+        assert all(r.header_id == 'cbfc_cf_update' for r in refs)
+
+    def test_fields_citing_prefix(self, index):
+        """Test sub-section prefix lookup."""
+        assert [r.field.name for r in index.fields_citing('Section 3.5', prefix=True)] == ['psn']
+        assert index.fields_citing('Section 3.5') == []
+        assert index.fields_citing('Table 5-2', prefix=True) == []
+
+    def test_headers_citing(self, index):
+        """Test header-level x-spec citations."""
+        assert index.headers_citing('Section 5.2.6.1') == ['cbfc_cf_update']
+        assert index.headers_citing('Table 3-30') == ['rud_rod_request']
+
+    def test_headers_related_to(self, index):
+        """Test related_messages lookup is case-insensitive."""
+        assert index.headers_related_to('cc_update') == ['cbfc_cf_update']
+        assert index.headers_related_to('ACK') == ['rud_rod_request']
@@ -0,0 +1,130 @@
+"""Tests for ksy_parser.lint module."""
+import json
+import shutil
+import textwrap
+
+import pytest
+from utilities.ksy_parser.parser import KsyParser
+from utilities.ksy_parser.lint import lint_header, lint_tree
+
+
+BROKEN_KSY = textwrap.dedent("""\
+    meta:
+      id: broken
+      title: Broken Header
+    x-packet:
+      size_bytes: 8
+      size_bits: 64
+    seq:
+      - id: kind
+        type: u1
+        enum: missing_enum
+      - id: opaque
+        type: mystery_t
+      - id: length
+        type: u2
+      - id: length
+        type: u1
+      - id: payload
+        size: length
+    x-protocol:
+      state_machine:
+        initial_state: IDLE
+        states:
+          - name: IDLE
+          - name: DONE
+            is_terminal: true
+        transitions:
+          - from: IDLE
+            to: BUSY
+            trigger: go
+          - from: BUSY
+            to: DONE
+            trigger: finish
+    """)
+
+
+@pytest.fixture
+def broken_ksy(tmp_path):
+    path = tmp_path / 'broken.ksy'
+    path.write_text(BROKEN_KSY)
+    return path
+
+
+def rules(issues):
+    return sorted((i.rule, i.field_name, i.severity) for i in issues)
+
+
+class TestLintHeader:
+    """Tests for lint_header function."""
+
+    def test_clean_fixtures(self, rud_rod_request_ksy, cf_update_ksy, vc_state_machine_ksy):
+        """Test that the reference fixtures lint clean."""
+        for path in (rud_rod_request_ksy, cf_update_ksy, vc_state_machine_ksy):
+            assert lint_header(KsyParser().parse(str(path))) == []
+
+    def test_every_rule(self, broken_ksy):
+        """Test each per-header rule on a deliberately broken header."""
+        issues = lint_header(KsyParser().parse(str(broken_ksy)))
+
+        assert rules(issues) == [
+            ('duplicate-field', 'length', 'error'),
+            ('size-mismatch', None, 'error'),
+            ('size-mismatch', None, 'error'),
+            ('undefined-enum', 'kind', 'error'),
+            ('undefined-state', None, 'error'),
+            ('zero-size-field', 'opaque', 'error'),
+            ('zero-size-field', 'payload', 'warning'),
+        ]
+        by_field = {i.field_name: i for i in issues}
+        assert "unknown type 'mystery_t'" in by_field['opaque'].message
+        assert "3 later fields" in by_field['opaque'].message
+        assert "'length' is not a constant" in by_field['payload'].message
+        assert "'BUSY'" in next(i for i in issues if i.rule == 'undefined-state').message
+
+    def test_raw_data_dropped(self, broken_ksy):
+        """Test that zero-size reasons reload raw data from the source file."""
+        header = KsyParser().parse(str(broken_ksy))
+        header.drop_raw_data()
+        issues = [i for i in lint_header(header) if i.rule == 'zero-size-field']
+        assert "mystery_t" in issues[0].message
+
+
+class TestLintTree:
+    """Tests for lint_tree and the lint CLI command."""
+
+    @pytest.fixture
+    def datamodel(self, tmp_path, fixtures_dir, broken_ksy):
+        root = tmp_path / 'datamodel'
+        (root / 'a').mkdir(parents=True)
+        shutil.copy(fixtures_dir / 'rud_rod_request.ksy', root / 'a')
+        shutil.copy(fixtures_dir / 'rud_rod_request.ksy', root / 'copy.ksy')
+        shutil.copy(broken_ksy, root / 'a')
+        (root / 'bad.ksy').write_text("meta: [unclosed\n")
+        return root
+
+    @pytest.mark.parametrize('workers', [1, 2])
+    def test_tree(self, datamodel, workers):
+        """Test serial and pooled runs report the same issues."""
+        result = lint_tree(datamodel, workers=workers)
+
+        assert result.files == 4
+        assert not result.ok
+        found = {i.rule for i in result.issues}
+        assert {'parse-error', 'duplicate-id', 'undefined-enum'} <= found
+        duplicate = next(i for i in result.issues if i.rule == 'duplicate-id')
+        assert duplicate.path.endswith('copy.ksy')
+
+    def test_cli_json(self, datamodel, capsys):
+        """Test machine-readable output and exit status."""
+        from utilities.ksy_parser.cli import main
+
+        with pytest.raises(SystemExit) as exc:
+            main(['lint', str(datamodel), '-j', '1', '--json'])
+
+        assert exc.value.code == 1
+        output = json.loads(capsys.readouterr().out)
+        assert output['files'] == 4
+        assert output['rules']['zero-size-field'] == 2
+        assert output['warnings'] == 1
+        assert {'rule', 'severity', 'message', 'path', 'header_id', 'field_name'} <= set(output['issues'][0])
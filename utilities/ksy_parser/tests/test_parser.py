@@ -86,3 +86,48 @@ class TestKsyParser:
         # x-protocol is in meta for this file
         assert header.x_protocol is not None
         assert 'state_machine' in header.x_protocol
+
+
+class TestCompactHeaders:
+    """Tests for the memory-lean header representation."""
+    
+    def test_fields_are_slotted(self, cf_update_ksy):
+        """Test that fields and instances carry no per-instance __dict__."""
+        header = KsyParser().parse(str(cf_update_ksy))
+        
+        assert not hasattr(header.fields[0], '__dict__')
+        assert not hasattr(header.instances[0], '__dict__')
+    
+    def test_type_strings_interned(self, cf_update_ksy):
+        """Test that identical type strings share one object across headers."""
+        first = KsyParser().parse(str(cf_update_ksy))
+        second = KsyParser().parse(str(cf_update_ksy))
+        
+        assert first.fields[0].type_str is second.fields[0].type_str
+    
+    def test_drop_and_reload_raw_data(self, cf_update_ksy):
+        """Test keep_raw_data=False and lazy reloading."""
+        header = KsyParser(keep_raw_data=False).parse(str(cf_update_ksy))
+        
+        assert header.raw_data is None
+        data = header.load_raw_data()
+        assert data['meta']['id'] == 'cbfc_cf_update'
+        assert header.raw_data is None
+        
+        header.load_raw_data(retain=True)
+        assert header.raw_data is not None
+    
+    def test_parse_explicit_endian_types(self, tmp_path):
+        """Test that u2le/b12be style types are sized correctly."""
+        path = tmp_path / "endian.ksy"
+        path.write_text(
+            "meta: {id: endian_test}\n"
+            "seq:\n"
+            "  - {id: a, type: u2le}\n"
+            "  - {id: b, type: b12be}\n"
+            "  - {id: c, type: b4}\n"
+        )
+        header = KsyParser().parse(str(path))
+        
+        assert [f.size_bits for f in header.fields] == [16, 12, 4]
+        assert header.size_bytes == 4
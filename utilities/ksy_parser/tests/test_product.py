@@ -0,0 +1,111 @@
+"""Tests for ksy_parser.product module."""
+import pytest
+from utilities.ksy_parser.state_machine import StateMachine, State, Transition
+from utilities.ksy_parser.product import ProductMachine, compose_state_machines
+from utilities.ksy_parser.state_graph import analyze_state_machine
+
+
+@pytest.fixture
+def vc():
+    """Link VC lifecycle; 'teardown' is shared with the PDC machine."""
+    return StateMachine('VC', 'DOWN', [State('DOWN', ''), State('UP', ''), State('GONE', '', True)], [
+        Transition('DOWN', 'UP', 'link_up'),
+        Transition('UP', 'GONE', 'teardown'),
+        Transition('UP', 'DOWN', 'link_down'),
+    ])
+
+
+@pytest.fixture
+def pdc():
+    """PDS connection states; 'teardown' is shared with the VC machine."""
+    return StateMachine('PDC', 'CLOSED', [State('CLOSED', ''), State('OPEN', ''), State('DONE', '', True)], [
+        Transition('CLOSED', 'OPEN', 'open'),
+        Transition('OPEN', 'DONE', 'teardown'),
+    ])
+
+
+class TestProductMachine:
+    """Tests for ProductMachine."""
+
+    def test_sync_alphabet(self, vc, pdc):
+        """Test shared triggers are synchronized by default."""
+        product = compose_state_machines(vc, pdc)
+
+        assert product.sync == ['teardown']
+        assert product.size == 9
+        assert product.decode(product.initial) == ('DOWN', 'CLOSED')
+        assert product.decode(product.encode(('UP', 'OPEN'))) == ('UP', 'OPEN')
+
+    def test_successors(self, vc, pdc):
+        """Test interleaved local moves and synchronized shared moves."""
+        product = ProductMachine([vc, pdc])
+        names = lambda code: {(product.triggers[t], product.decode(s)) for t, s in product.successors(code)}
+
+        assert names(product.initial) == {('link_up', ('UP', 'CLOSED')), ('open', ('DOWN', 'OPEN'))}
+        assert ('teardown', ('GONE', 'DONE')) in names(product.encode(('UP', 'OPEN')))
+        assert 'teardown' not in {t for t, _ in names(product.encode(('UP', 'CLOSED')))}
+
+    def test_explore(self, vc, pdc):
+        """Test reachable states and deadlocks."""
+        result = ProductMachine([vc, pdc]).explore()
+
+        assert result.states == 5
+        assert result.transitions == 7
+        assert not result.truncated
+        assert result.deadlocks == []
+
+    def test_deadlock(self, vc, pdc):
+        """Test a state where the shared trigger can never fire is a deadlock."""
+        vc.transitions.pop()  # no link_down
+        pdc.transitions.append(Transition('OPEN', 'STALLED', 'stall'))
+        result = ProductMachine([vc, pdc]).explore()
+
+        assert result.deadlocks == [('UP', 'STALLED')]
+
+    def test_max_states(self, vc, pdc):
+        """Test exploration can be bounded."""
+        result = ProductMachine([vc, pdc]).explore(max_states=3)
+
+        assert (result.states, result.truncated) == (3, True)
+
+    def test_find(self, vc, pdc):
+        """Test shortest trace to a property violation."""
+        product = ProductMachine([vc, pdc])
+
+        trace = product.find(lambda s: s == ('GONE', 'DONE'))
+
+        assert [t for t, _ in trace] == ['', 'link_up', 'open', 'teardown']
+        assert product.find(lambda s: s == ('GONE', 'CLOSED')) is None
+
+    def test_explicit_sync(self, vc, pdc):
+        """Test unsynchronized composition interleaves every trigger."""
+        product = ProductMachine([vc, pdc], sync=[])
+
+        assert product.find(lambda s: s == ('GONE', 'CLOSED')) is not None
+
+    def test_three_machines_lazy(self):
+        """Test a large product explores only reachable states."""
+        counter = lambda name, n: StateMachine(name, 'S0', [State(f"S{i}", '', i == n - 1) for i in range(n)],
+                                               [Transition(f"S{i}", f"S{i + 1}", 'tick') for i in range(n - 1)])
+        product = ProductMachine([counter('A', 200), counter('B', 200), counter('C', 200)])
+
+        result = product.explore()
+
+        assert product.size == 8_000_000
+        assert result.states == 200
+        assert result.deadlocks == []
+
+    def test_to_state_machine(self, vc, pdc):
+        """Test materializing the reachable product for analysis."""
+        sm = ProductMachine([vc, pdc]).to_state_machine()
+
+        assert sm.name == 'VC x PDC'
+        assert sm.initial_state == 'DOWN|CLOSED'
+        assert len(sm.states) == 5
+        assert [s.name for s in sm.states if s.is_terminal] == ['GONE|DONE']
+        assert analyze_state_machine(sm).unreachable == []
+
+    def test_requires_two_machines(self, vc):
+        """Test single machines are rejected."""
+        with pytest.raises(ValueError):
+            ProductMachine([vc])
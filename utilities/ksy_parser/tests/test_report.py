@@ -52,6 +52,15 @@ class TestGenerateEnumSection:
         assert len(sections) == 1
         assert sections[0]['type'] == 'table'
         assert 'Values' in sections[0]['title']
+    
+    def test_generate_enum_section_without_raw_data(self, cf_update_ksy):
+        """Test that enum sections do not depend on retained raw_data."""
+        header = KsyParser(keep_raw_data=False).parse(str(cf_update_ksy))
+        
+        sections = generate_enum_section(header)
+        
+        assert len(sections) == 1
+        assert sections[0]['rows'][0][1] == 'cf_update'
 
 
 class TestGenerateStateMachineSection:
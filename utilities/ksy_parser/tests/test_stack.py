@@ -0,0 +1,120 @@
+"""Tests for ksy_parser.stack module."""
+import struct
+import pytest
+from utilities.ksy_parser.parser import KsyParser, KsyHeader, KsyField
+from utilities.ksy_parser.stack import ProtocolStack
+from utilities.ksy_parser.capture import decode_capture
+from utilities.ksy_parser.tests.test_decoder import RUD_PACKET
+from utilities.ksy_parser.tests.test_capture import write_pcap, CF_UPDATE
+
+
+def make_header(header_id, *fields):
+    """Build a byte-aligned header from (name, type, bits) triples."""
+    offset, ksy_fields = 0, []
+    for name, type_str, bits in fields:
+        ksy_fields.append(KsyField(name, type_str, bits, offset, ''))
+        offset += bits
+    return KsyHeader(id=header_id, title=header_id, size_bytes=offset // 8, fields=ksy_fields, doc='')
+
+
+@pytest.fixture
+def headers(rud_rod_request_ksy, cf_update_ksy):
+    """Ethernet -> UDP-like -> PDS -> CF_Update test headers."""
+    parser = KsyParser()
+    return {
+        'eth': make_header('eth', ('dst', '', 48), ('src', '', 48), ('ethertype', 'u2', 16)),
+        'udp': make_header('udp', ('src_port', 'u2', 16), ('dst_port', 'u2', 16),
+                           ('length', 'u2', 16), ('checksum', 'u2', 16)),
+        'pds': parser.parse(str(rud_rod_request_ksy)),
+        'ses': parser.parse(str(cf_update_ksy)),
+    }
+
+
+@pytest.fixture
+def stack(headers):
+    """Configured protocol stack."""
+    return ProtocolStack.from_config(headers, {
+        'root': 'eth',
+        'links': {
+            'eth': {'field': 'ethertype', 'next': {0x0800: 'udp'}},
+            'udp': {'field': 'dst_port', 'next': {'4793': 'pds'}},
+            'pds': {'field': 'next_hdr', 'next': {'uet_hdr_request_std': 'ses'}},
+        },
+    })
+
+
+def frame_bytes(ethertype=0x0800, port=4793):
+    return (b'\x02' * 6 + b'\x04' * 6 + struct.pack('>H', ethertype) +
+            struct.pack('>HHHH', 1000, port, 0, 0) + RUD_PACKET + CF_UPDATE + b'data')
+
+
+class TestProtocolStack:
+    """Tests for ProtocolStack."""
+
+    def test_decode_full_frame(self, stack):
+        """Test one-pass decoding with cumulative offsets."""
+        decoded = stack.decode(frame_bytes())
+
+        assert decoded.path == ['eth', 'udp', 'pds', 'ses']
+        assert [layer.offset for layer in decoded.layers] == [0, 14, 22, 34]
+        assert decoded['pds']['psn'] == 0x12345678
+        assert decoded['ses']['control_char'] == 0x5C
+        assert decoded.payload_offset == 42
+
+    def test_unlisted_selector_ends_frame(self, stack):
+        """Test that an unknown selector value stops dispatch."""
+        decoded = stack.decode(frame_bytes(port=53))
+
+        assert decoded.path == ['eth', 'udp']
+        assert 'pds' not in decoded
+
+    def test_default_link(self, headers):
+        """Test default next headers."""
+        stack = ProtocolStack(headers, 'eth').link('eth', 'ethertype', {}, default='udp')
+        assert stack.decode(frame_bytes(ethertype=0x1234)).path == ['eth', 'udp']
+
+    def test_invalid_links_raise(self, headers):
+        """Test validation of fields, headers and enum ids."""
+        stack = ProtocolStack(headers, 'eth')
+        with pytest.raises(ValueError):
+            stack.link('eth', 'missing', {})
+        with pytest.raises(ValueError):
+            stack.link('eth', 'ethertype', {0x0800: 'nope'})
+        with pytest.raises(ValueError):
+            stack.link('pds', 'next_hdr', {'not_an_enum': 'ses'})
+
+    def test_paths_and_overhead(self, stack):
+        """Test path enumeration and overhead sums."""
+        paths = list(stack.paths())
+
+        assert paths == [['eth', 'udp', 'pds', 'ses']]
+        assert stack.overhead_bytes(paths[0]) == 14 + 8 + 12 + 8
+
+    def test_compile_only_reachable_headers(self, headers):
+        """Test that headers no link reaches are neither compiled nor sized."""
+        headers = dict(headers, broken=make_header('broken', ('x', 'u1', 8)))
+        stack = ProtocolStack(headers, 'eth').link('eth', 'ethertype', {0x0800: 'udp'})
+
+        assert stack.reachable() == ['eth', 'udp']
+        assert set(stack.compile()) == {'eth', 'udp'}
+        assert stack.overhead_bytes(['eth', 'udp']) == stack.decode(frame_bytes()).payload_offset
+        with pytest.raises(ValueError):
+            stack.overhead_bytes(['eth', 'broken'])
+
+    def test_overhead_uses_decoder_size(self, headers):
+        """Test that overhead matches decode() when size_bytes understates the layout."""
+        short = make_header('short', ('a', 'u2', 16), ('b', 'u2', 16))
+        short.size_bytes = 2
+        stack = ProtocolStack(dict(headers, short=short), 'short')
+
+        assert stack.overhead_bytes(['short']) == stack.decode(bytes(8)).payload_offset == 4
+
+    def test_decode_capture_with_stack(self, stack, tmp_path):
+        """Test streaming capture decode through a ProtocolStack."""
+        path = tmp_path / "cap.pcap"
+        write_pcap(path, [(0, 0, frame_bytes()), (0, 1, frame_bytes(port=53)), (0, 2, b'\x00')])
+
+        records = list(decode_capture(path, stack))
+        assert len(records) == 2
+        assert records[0]['pds']['psn'] == 0x12345678
+        assert 'pds' not in records[1]
@@ -0,0 +1,139 @@
+"""Tests for ksy_parser.state_graph module."""
+import pytest
+from utilities.ksy_parser.state_machine import extract_state_machine, StateMachine, State, Transition
+from utilities.ksy_parser.state_graph import (
+    build_state_graph, reachable_states, unreachable_states, dead_states,
+    strongly_connected_components, nondeterministic_pairs, undefined_states,
+    analyze_state_machine, generate_analysis_table,
+)
+
+
+@pytest.fixture
+def pdc():
+    """PDC-like machine with a cycle, a dead loop and an orphan state."""
+    return StateMachine(
+        name='PDC',
+        initial_state='CLOSED',
+        states=[State('CLOSED', ''), State('SYN', ''), State('OPEN', ''), State('QUIESCE', ''),
+                State('DONE', '', is_terminal=True), State('STUCK', ''), State('ORPHAN', '')],
+        transitions=[
+            Transition('CLOSED', 'SYN', 'open'),
+            Transition('SYN', 'OPEN', 'ack', condition='credits > 0'),
+            Transition('SYN', 'CLOSED', 'ack', condition='credits == 0'),
+            Transition('OPEN', 'QUIESCE', 'close'),
+            Transition('QUIESCE', 'OPEN', 'resume'),
+            Transition('QUIESCE', 'DONE', 'drained'),
+            Transition('OPEN', 'STUCK', 'error'),
+            Transition('OPEN', 'CLOSED', 'error'),
+            Transition('STUCK', 'STUCK', 'retry'),
+            Transition('ORPHAN', 'GHOST', 'noop'),
+        ],
+    )
+
+
+class TestStateGraph:
+    """Tests for build_state_graph function."""
+
+    def test_adjacency(self, pdc):
+        """Test integer adjacency and undeclared states."""
+        graph = build_state_graph(pdc)
+
+        assert graph.states[-1] == 'GHOST'
+        assert graph.successors[graph.index['OPEN']] == [3, 5, 0]
+        assert graph.initial == 0
+
+    def test_wildcard(self):
+        """Test '*' transitions add an edge from every state."""
+        sm = StateMachine('W', 'A', [State('A', ''), State('B', ''), State('Z', '', True)],
+                          [Transition('A', 'B', 'go'), Transition('*', 'Z', 'kill')])
+
+        assert dead_states(sm) == []
+        assert build_state_graph(sm).successors[1] == [2]
+
+    def test_no_terminal_states(self):
+        """Test cyclic machines without terminal states report no dead states."""
+        sm = StateMachine('Cycle', 'A', [State('A', ''), State('B', '')],
+                          [Transition('A', 'B', 'go'), Transition('B', 'A', 'back')])
+
+        assert dead_states(sm) == []
+        assert analyze_state_machine(sm).ok
+
+
+class TestAnalyses:
+    """Tests for individual analyses."""
+
+    def test_reachability(self, pdc):
+        """Test reachability from the initial state."""
+        assert reachable_states(pdc) == ['CLOSED', 'SYN', 'OPEN', 'QUIESCE', 'DONE', 'STUCK']
+        assert unreachable_states(pdc) == ['ORPHAN', 'GHOST']
+        assert reachable_states(pdc, 'STUCK') == ['STUCK']
+
+    def test_dead_states(self, pdc):
+        """Test states that cannot reach a terminal state."""
+        assert dead_states(pdc) == ['STUCK', 'ORPHAN', 'GHOST']
+
+    def test_scc(self, pdc):
+        """Test strongly connected components."""
+        components = [sorted(c) for c in strongly_connected_components(pdc)]
+
+        assert sorted(['CLOSED', 'OPEN', 'QUIESCE', 'SYN']) in components
+        assert ['STUCK'] in components
+        assert len(components) == 5
+
+    def test_nondeterministic(self, pdc):
+        """Test guarded and unguarded nondeterministic pairs."""
+        pairs = {(p.state, p.trigger): p for p in nondeterministic_pairs(pdc)}
+
+        assert set(pairs) == {('SYN', 'ack'), ('OPEN', 'error')}
+        assert pairs[('SYN', 'ack')].guarded
+        assert not pairs[('OPEN', 'error')].guarded
+        assert pairs[('OPEN', 'error')].targets == ['STUCK', 'CLOSED']
+
+    def test_undefined(self, pdc):
+        """Test undeclared state references."""
+        assert undefined_states(pdc) == ['GHOST']
+
+    def test_large_chain_is_linear(self):
+        """Test a 50k-state chain without recursion limits."""
+        n = 50000
+        sm = StateMachine('chain', 'S0', [State(f"S{i}", '', i == n - 1) for i in range(n)],
+                          [Transition(f"S{i}", f"S{i + 1}", 'next') for i in range(n - 1)] +
+                          [Transition(f"S{n - 2}", 'S0', 'loop')])
+
+        analysis = analyze_state_machine(sm)
+
+        assert analysis.unreachable == [] and analysis.dead == []
+        assert max(len(c) for c in analysis.components) == n - 1
+
+
+class TestAnalyzeStateMachine:
+    """Tests for analyze_state_machine and table generation."""
+
+    def test_fixture_machine(self, vc_state_machine_data):
+        """Test the VC lifecycle fixture."""
+        sm = extract_state_machine(vc_state_machine_data['meta']['x-protocol'])
+        analysis = analyze_state_machine(sm)
+
+        assert analysis.unreachable == ['ACTIVE', 'REMOVING']
+        assert not analysis.ok
+
+    def test_builds_one_graph(self, pdc, monkeypatch):
+        """Test every analysis shares a single adjacency index."""
+        from utilities.ksy_parser import state_graph
+        calls = []
+        build = state_graph.build_state_graph
+        monkeypatch.setattr(state_graph, 'build_state_graph', lambda sm: calls.append(sm) or build(sm))
+
+        analysis = analyze_state_machine(pdc)
+
+        assert len(calls) == 1
+        assert analysis.undefined == ['GHOST']
+        assert analysis.nondeterministic == nondeterministic_pairs(pdc)
+
+    def test_table(self, pdc):
+        """Test the lint table."""
+        table = generate_analysis_table(analyze_state_machine(pdc))
+
+        assert table['title'] == 'PDC Analysis'
+        assert table['rows'][0] == ['Unreachable states', 'ORPHAN, GHOST']
+        assert 'SYN --[ack]--> OPEN | CLOSED (guarded)' in table['rows'][3][1]
@@ -0,0 +1,60 @@
+"""Tests for ksy_parser.tree module."""
+import json
+import shutil
+import pytest
+from utilities.ksy_parser.parser import KsyParser
+from utilities.ksy_parser.tree import parse_tree, discover_ksy_files
+from utilities.ksy_parser.cli import main
+
+
+@pytest.fixture
+def datamodel_dir(fixtures_dir, tmp_path):
+    """Build a small datamodel tree with one broken file."""
+    root = tmp_path / "datamodel"
+    (root / "link").mkdir(parents=True)
+    (root / "transport").mkdir()
+    shutil.copy(fixtures_dir / "cf_update.ksy", root / "link")
+    shutil.copy(fixtures_dir / "vc_state_machine.ksy", root / "link")
+    shutil.copy(fixtures_dir / "rud_rod_request.ksy", root / "transport")
+    (root / "transport" / "broken.ksy").write_text("meta: [unclosed\n")
+    return root
+
+
+class TestParseTree:
+    """Tests for parse_tree function."""
+
+    def test_discover_sorted(self, datamodel_dir):
+        """Test that discovery finds all .ksy files in path order."""
+        names = [p.name for p in discover_ksy_files(datamodel_dir)]
+        assert names == ['cf_update.ksy', 'vc_state_machine.ksy', 'broken.ksy', 'rud_rod_request.ksy']
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_parse_tree_collects_errors(self, datamodel_dir, workers):
+        """Test that headers are keyed by id and errors do not abort the load."""
+        result = KsyParser().parse_tree(str(datamodel_dir), workers=workers)
+
+        assert list(result.headers) == ['cbfc_cf_update', 'vc_state_machine', 'rud_rod_request']
+        assert len(result.errors) == 1
+        assert next(iter(result.errors)).endswith('broken.ksy')
+        assert result.paths['rud_rod_request'].endswith('rud_rod_request.ksy')
+
+    def test_duplicate_ids_reported(self, datamodel_dir, fixtures_dir):
+        """Test that a second file with the same id is reported as an error."""
+        shutil.copy(fixtures_dir / "cf_update.ksy", datamodel_dir / "transport" / "copy.ksy")
+        result = parse_tree(datamodel_dir, workers=1)
+
+        assert any('Duplicate id' in e for e in result.errors.values())
+
+
+class TestCli:
+    """Tests for the parse-tree CLI command."""
+
+    def test_parse_tree_json(self, datamodel_dir, capsys):
+        """Test JSON output and non-zero exit on errors."""
+        with pytest.raises(SystemExit) as exc:
+            main(['parse-tree', str(datamodel_dir), '--workers', '1', '--json'])
+
+        assert exc.value.code == 1
+        output = json.loads(capsys.readouterr().out)
+        assert output['headers']['rud_rod_request']['size_bytes'] == 12
+        assert len(output['errors']) == 1
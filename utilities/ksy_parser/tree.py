@@ -0,0 +1,140 @@
+"""
+KSY Tree Loader - Discover and parse a whole KSY datamodel directory.
+
+Provides utilities for:
+- Discovering every .ksy file under a directory
+- Mapping a worker function over files across a process pool
+- Parsing them across a process pool
+- Collecting per-file errors instead of aborting the whole load
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from utilities.ksy_parser.parser import KsyHeader
+
+
+@dataclass
+class ParseTreeResult:
+    """Result of parsing a KSY directory tree.
+
+    headers maps header id to KsyHeader in sorted path order, paths maps the
+    same ids to their source files, and errors maps source file to the error
+    message for files that failed to parse. signatures memoizes header id to
+    diff.header_signature, filled in the first time the result is diffed.
+    """
+    headers: Dict[str, "KsyHeader"] = field(default_factory=dict)
+    paths: Dict[str, str] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    signatures: Dict[str, str] = field(default_factory=dict)
+
+
+def discover_ksy_files(root: Union[str, Path]) -> List[Path]:
+    """
+    Find every .ksy file under a directory, sorted by path.
+
+    Args:
+        root: Directory to search (a single .ksy file is also accepted)
+
+    Returns:
+        Sorted list of .ksy file paths
+    """
+    root = Path(root)
+    if root.is_file():
+        return [root]
+    return sorted(p for p in root.rglob('*.ksy') if p.is_file())
+
+
+def map_files(func: Callable[[Any], Any], jobs: Sequence[Any],
+              workers: Optional[int] = None) -> List[Any]:
+    """
+    Apply a worker function to per-file jobs, optionally across processes.
+
+    Args:
+        func: Picklable module-level function taking one job
+        jobs: Job arguments, one per file
+        workers: Worker processes; None uses os.cpu_count(), 1 runs serially
+            in the calling process
+
+    Returns:
+        Results in job order
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(jobs)))
+
+    if workers == 1:
+        return [func(job) for job in jobs]
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(func, jobs, chunksize=chunksize))
+
+
+def _parse_one(args: Tuple[str, Optional[str], bool]):
+    """Worker: parse one file, returning (path, header, error)."""
+    path, cache_dir, keep_raw_data = args
+    from utilities.ksy_parser.parser import KsyParser
+    try:
+        parser = KsyParser(cache_dir=cache_dir, keep_raw_data=keep_raw_data)
+        return path, parser.parse(path), None
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+
+
+def parse_files(paths: Sequence[Union[str, Path]], workers: Optional[int] = None,
+                cache_dir: Optional[str] = None, keep_raw_data: bool = True
+                ) -> List[Tuple[str, Optional["KsyHeader"], Optional[str]]]:
+    """
+    Parse a list of .ksy files, optionally in parallel.
+
+    Args:
+        paths: Files to parse
+        workers: Worker processes; None uses os.cpu_count(), 1 parses serially
+        cache_dir: Optional parse cache directory shared by all workers
+        keep_raw_data: Keep raw_data on returned headers
+
+    Returns:
+        (path, header, error) per file in input order; exactly one of
+        header and error is None
+    """
+    return map_files(_parse_one, [(str(p), cache_dir, keep_raw_data) for p in paths], workers)
+
+
+def parse_tree(root: Union[str, Path], workers: Optional[int] = None,
+               cache_dir: Optional[str] = None, keep_raw_data: bool = True) -> ParseTreeResult:
+    """
+    Parse every .ksy file under a directory, optionally in parallel.
+
+    Files are keyed by meta.id (falling back to the file stem). A file whose
+    id duplicates an earlier file is reported as an error rather than
+    overwriting it.
+
+    Args:
+        root: Directory containing .ksy files
+        workers: Worker processes; None uses os.cpu_count(), 1 parses serially
+            in the calling process
+        cache_dir: Optional parse cache directory shared by all workers
+        keep_raw_data: Keep raw_data on returned headers; False also avoids
+            shipping it back from worker processes
+
+    Returns:
+        ParseTreeResult with headers, source paths and per-file errors
+    """
+    outcomes = parse_files(discover_ksy_files(root), workers, cache_dir, keep_raw_data)
+
+    result = ParseTreeResult()
+    for path, header, error in outcomes:
+        if error is not None:
+            result.errors[path] = error
+            continue
+        header_id = header.id or Path(path).stem
+        if header_id in result.headers:
+            result.errors[path] = f"Duplicate id '{header_id}' (also in {result.paths[header_id]})"
+            continue
+        result.headers[header_id] = header
+        result.paths[header_id] = path
+    return result
@@ -4,6 +4,7 @@ Command-line interface for Cornelis PowerPoint generation.
 Usage:
     python -m utilities.pptx_helper --type progress --data data.yaml --output report.pptx
     python -m utilities.pptx_helper --type technical --data data.yaml --output tech.pptx
+    python -m utilities.pptx_helper --type technical --data data.yaml --output tech.pptx --watch
     python -m utilities.pptx_helper --help
 
 Design:
@@ -18,8 +19,6 @@ import sys
 from pathlib import Path
 from typing import Any, Dict
 
-import yaml
-
 from utilities.pptx_helper import create_presentation, save_presentation
 from utilities.pptx_helper.progress_report import (
     add_title_slide as add_progress_title,
@@ -42,14 +41,14 @@ from utilities.pptx_helper.navigation import (
     add_section,
     insert_slides_at_position,
 )
+from utilities.yaml_loader import load_yaml_file
 
 logger = logging.getLogger(__name__)
 
 
 def load_yaml_data(data_path: Path) -> Dict[str, Any]:
     """Load and parse YAML data file."""
-    with open(data_path, 'r', encoding='utf-8') as f:
-        return yaml.safe_load(f)
+    return load_yaml_file(data_path)
 
 
 def generate_progress_report(data: Dict[str, Any], output_path: Path, dry_run: bool = False) -> None:
@@ -313,6 +312,7 @@ Examples:
   %(prog)s --type progress --data report.yaml --output report.pptx
   %(prog)s --type technical --data tech.yaml --output presentation.pptx
   %(prog)s --type progress --data report.yaml --dry-run
+  %(prog)s --type technical --data tech.yaml --output presentation.pptx --watch
 
 See examples/ directory for sample YAML files.
         '''
@@ -364,6 +364,12 @@ See examples/ directory for sample YAML files.
         help='Generate Table of Contents with hyperlinks and PowerPoint sections'
     )
     
+    parser.add_argument(
+        '--watch', '-w',
+        action='store_true',
+        help='Keep running and regenerate whenever the data file (or template) changes'
+    )
+    
     parsed_args = parser.parse_args(args)
     
     # Configure logging
@@ -378,12 +384,42 @@ See examples/ directory for sample YAML files.
         logger.error(f"Data file not found: {parsed_args.data}")
         sys.exit(1)
     
+    status = run_generation(parsed_args)
+    if not parsed_args.watch:
+        if status:
+            sys.exit(status)
+        return
+    
+    from utilities.file_watcher import watch_paths
+    from utilities.pptx_helper.core import _find_template_path
+    watched = [parsed_args.data]
+    try:
+        # Resolves the default template too, so edits to it trigger rebuilds
+        watched.append(_find_template_path(str(parsed_args.template) if parsed_args.template else None))
+    except FileNotFoundError:
+        pass
+    watch_paths(watched, lambda changed: run_generation(parsed_args))
+
+
+def run_generation(parsed_args: argparse.Namespace) -> int:
+    """
+    Load the data file and generate the presentation once.
+    
+    Used for single runs and for each rebuild in --watch mode, where the
+    interpreter, python-pptx and the converted template stay loaded.
+    
+    Args:
+        parsed_args: Parsed command-line arguments
+        
+    Returns:
+        0 on success, 1 on failure (errors are logged)
+    """
     # Load data
     try:
         data = load_yaml_data(parsed_args.data)
     except Exception as e:
         logger.error(f"Failed to load YAML data: {e}")
-        sys.exit(1)
+        return 1
     
     # Generate presentation
     try:
@@ -396,10 +432,11 @@ See examples/ directory for sample YAML files.
         if parsed_args.verbose:
             import traceback
             traceback.print_exc()
-        sys.exit(1)
+        return 1
     
     if not parsed_args.dry_run:
         print(f"Presentation generated: {parsed_args.output}")
+    return 0
 
 
 if __name__ == '__main__':
@@ -22,6 +22,7 @@ Traceability:
     Spec: templates/template-spec.md
 """
 
+import io
 import logging
 import os
 import shutil
@@ -40,6 +41,10 @@ DEFAULT_TEMPLATE = "templates/Standard PPT Template_Light.potx"
 # Expected number of layouts in the template (for validation)
 EXPECTED_LAYOUT_COUNT = 39
 
+# Template package bytes (after .potx conversion) keyed by path and stat data,
+# so long-running processes (--watch) convert each template only once
+_template_cache = {}
+
 
 def _find_template_path(template_path: Optional[str] = None) -> Path:
     """
@@ -161,32 +166,56 @@ def load_template(template_path: Optional[str] = None) -> Presentation:
     path = _find_template_path(template_path)
     logger.info(f"Loading template from: {path}")
     
+    prs = Presentation(io.BytesIO(_template_bytes(path)))
+    
+    # Validate template
+    layout_count = len(prs.slide_layouts)
+    if layout_count != EXPECTED_LAYOUT_COUNT:
+        logger.warning(
+            f"Template has {layout_count} layouts, expected {EXPECTED_LAYOUT_COUNT}. "
+            f"Layout indices may not match documentation."
+        )
+    else:
+        logger.debug(f"Template validated: {layout_count} layouts")
+    
+    return prs
+
+
+def _template_bytes(path: Path) -> bytes:
+    """
+    Return the template as .pptx package bytes, converting .potx once.
+    
+    Results are cached in memory and reused until the file's mtime or size
+    changes.
+    
+    Args:
+        path: Path to the .potx/.pptx template
+        
+    Returns:
+        Package bytes loadable by python-pptx
+    """
+    st = path.stat()
+    key = str(path.resolve())
+    cached = _template_cache.get(key)
+    if cached and cached[0] == (st.st_mtime_ns, st.st_size):
+        return cached[1]
+    
     temp_pptx = None
     try:
         # Check if it's a .potx file that needs conversion
         if path.suffix.lower() == '.potx':
             logger.debug("Converting .potx to .pptx format")
             temp_pptx = _convert_potx_to_pptx(path)
-            prs = Presentation(temp_pptx)
+            data = Path(temp_pptx).read_bytes()
         else:
-            prs = Presentation(str(path))
-        
-        # Validate template
-        layout_count = len(prs.slide_layouts)
-        if layout_count != EXPECTED_LAYOUT_COUNT:
-            logger.warning(
-                f"Template has {layout_count} layouts, expected {EXPECTED_LAYOUT_COUNT}. "
-                f"Layout indices may not match documentation."
-            )
-        else:
-            logger.debug(f"Template validated: {layout_count} layouts")
-        
-        return prs
-        
+            data = path.read_bytes()
     finally:
         # Clean up temp file
         if temp_pptx and os.path.exists(temp_pptx):
             os.remove(temp_pptx)
+    
+    _template_cache[key] = ((st.st_mtime_ns, st.st_size), data)
+    return data
 
 
 def create_presentation(template_path: Optional[str] = None) -> Presentation:
@@ -0,0 +1,35 @@
+"""
+Shared YAML loading for the utilities packages.
+
+Uses PyYAML's libyaml-backed CSafeLoader when PyYAML was built with
+libyaml, and falls back to the pure-Python SafeLoader otherwise. Both
+loaders only construct plain Python types, so results are identical;
+only speed differs.
+
+Usage:
+    >>> from utilities.yaml_loader import safe_load, load_yaml_file
+    >>> data = load_yaml_file("reports/packet_taxonomy/technical_report/technical_report.yaml")
+"""
+
+from pathlib import Path
+from typing import Any, IO, Union
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader
+
+HAS_LIBYAML = SafeLoader is not yaml.SafeLoader
+
+
+def safe_load(stream: Union[str, bytes, IO]) -> Any:
+    """Parse a YAML document with the fastest available safe loader."""
+    return yaml.load(stream, Loader=SafeLoader)
+
+
+def load_yaml_file(path: Union[str, Path]) -> Any:
+    """Read and parse a UTF-8 YAML file with the fastest available safe loader."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return safe_load(f)